@@ -1,15 +1,19 @@
 """
 Conversation endpoints
 """
-from fastapi import APIRouter, HTTPException
-from typing import Dict, Any
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from typing import Dict, Any, AsyncIterator
+from pydantic import BaseModel, ValidationError
+import json
+import logging
 
-from app.core.ai_engine import NexiaEngine
+from app.config import settings
+from app.core.ai_engine import get_engine
 from app.models.conversation import ConversationRequest, ConversationResponse
 
 router = APIRouter()
-nexia_engine = NexiaEngine()
+logger = logging.getLogger(__name__)
 
 
 class MessageRequest(BaseModel):
@@ -19,27 +23,113 @@ class MessageRequest(BaseModel):
 
 
 @router.post("/chat", response_model=ConversationResponse)
-async def chat_with_nexia(request: MessageRequest):
+async def chat_with_nexia(request: MessageRequest, http_response: Response):
     """
     Main chat endpoint for Nexia
     """
     try:
-        response = await nexia_engine.process_message(
+        response = await get_engine().process_message(
             message=request.message,
             session_id=request.session_id,
             context=request.context
         )
+        http_response.headers["X-Nexia-Cache"] = response.metadata.get("cache", "bypass").upper()
         return response
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _sse_events(request: MessageRequest) -> AsyncIterator[str]:
+    """Format engine stream events as Server-Sent Events"""
+    try:
+        async for event in get_engine().stream_message(
+            message=request.message,
+            session_id=request.session_id,
+            context=request.context
+        ):
+            yield f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+    except Exception as e:
+        logger.error(f"Chat stream error: {e}")
+        error = {"type": "error", "detail": str(e)}
+        yield f"event: error\ndata: {json.dumps(error, ensure_ascii=False)}\n\n"
+
+
+@router.post("/chat/stream")
+async def chat_with_nexia_stream(request: MessageRequest):
+    """
+    Streaming chat endpoint (Server-Sent Events)
+    
+    Emits `token` events as the answer is generated, then a final `done`
+    event carrying the full response, mode and actions.
+    """
+    return StreamingResponse(
+        _sse_events(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.websocket("/chat/ws")
+async def chat_with_nexia_ws(websocket: WebSocket):
+    """
+    Streaming chat over WebSocket, one JSON MessageRequest per turn
+    """
+    await websocket.accept()
+    try:
+        while True:
+            try:
+                # Invalid JSON or a non-object payload must not close the socket
+                request = MessageRequest.model_validate(await websocket.receive_json())
+            except (ValueError, TypeError, ValidationError) as e:
+                await websocket.send_json({"type": "error", "detail": str(e)})
+                continue
+            
+            try:
+                async for event in get_engine().stream_message(
+                    message=request.message,
+                    session_id=request.session_id,
+                    context=request.context
+                ):
+                    await websocket.send_json(event)
+            except WebSocketDisconnect:
+                raise
+            except Exception as e:
+                logger.error(f"Chat websocket error: {e}")
+                await websocket.send_json({"type": "error", "detail": str(e)})
+    except WebSocketDisconnect:
+        logger.debug("Chat websocket disconnected")
+
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """
+    Response cache hit/miss metrics
+    """
+    cache = get_engine().response_cache
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@router.get("/coalescing/stats")
+async def get_coalescing_stats():
+    """
+    Duplicate request coalescing and LLM micro-batching metrics
+    """
+    engine = get_engine()
+    return {
+        "enabled": settings.nexia_coalesce_requests,
+        **engine.inflight.stats(),
+        "batchers": {name: batcher.stats() for name, batcher in engine.llm_batchers.items()}
+    }
+
+
 @router.post("/start-session")
 async def start_session():
     """
     Start a new conversation session
     """
-    session = await nexia_engine.create_session()
+    session = await get_engine().create_session()
     return {"session_id": session.id, "created_at": session.created_at}
 
 
@@ -48,5 +138,5 @@ async def end_session(session_id: str):
     """
     End a conversation session
     """
-    await nexia_engine.end_session(session_id)
+    await get_engine().end_session(session_id)
     return {"message": "Session ended successfully"}
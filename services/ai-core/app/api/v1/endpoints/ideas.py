@@ -1,28 +1,31 @@
 """
 Ideas management endpoints
 """
-from fastapi import APIRouter, HTTPException
-from typing import List, Optional
-from datetime import datetime
-from pydantic import BaseModel
-
-router = APIRouter()
+from fastapi import APIRouter, HTTPException, Query, Response
+from typing import Iterable, List, Optional
 
+from app.config import settings
+from app.core.idea_pipeline import get_idea_connections_job, get_idea_pipeline
+from app.core.idea_store import get_idea_repository, get_idea_write_behind, new_idea
+from app.models.idea import Idea, IdeaBulkActivateRequest, IdeaBulkParkRequest, IdeaParkRequest
 
-class Idea(BaseModel):
-    id: Optional[str] = None
-    content: str
-    session_id: str
-    created_at: Optional[datetime] = None
-    status: str = "parked"
-    tags: List[str] = []
-    connections: List[str] = []
+router = APIRouter()
 
 
-class IdeaParkRequest(BaseModel):
-    session_id: str
-    content: str
-    tags: List[str] = []
+async def _repository(session_id: Optional[str] = None, idea_ids: Iterable[str] = ()):
+    """Ideas repository
+    
+    Ideas parked from chat turns are written in the background, so reads are
+    eventually consistent. Requests about a session or ideas that still have
+    writes on their way wait for them first (read-your-writes).
+    """
+    idea_ids = list(idea_ids)
+    pipeline, write_behind = get_idea_pipeline(), get_idea_write_behind()
+    if pipeline.has_pending(session_id, idea_ids):
+        await pipeline.drain()
+    if write_behind.has_pending(session_id, idea_ids):
+        await write_behind.flush()
+    return get_idea_repository()
 
 
 @router.post("/park", response_model=Idea)
@@ -30,26 +33,79 @@ async def park_idea(request: IdeaParkRequest):
     """
     Park an idea for later
     """
-    idea = Idea(
-        id=f"idea_{datetime.now().timestamp()}",
-        content=request.content,
-        session_id=request.session_id,
-        created_at=datetime.now(),
-        tags=request.tags
-    )
-    # TODO: Save to database
+    idea = new_idea(request.session_id, request.content, request.tags)
+    await get_idea_repository().add_many([idea])
     return idea
-"""
-Ideas management endpoints - Part 2
-"""
+
+
+@router.post("/park/bulk", response_model=List[Idea])
+async def park_ideas(request: IdeaBulkParkRequest):
+    """
+    Park several ideas in a single write
+    """
+    ideas = [new_idea(item.session_id, item.content, item.tags) for item in request.ideas]
+    await get_idea_repository().add_many(ideas)
+    return ideas
+
+
+@router.post("/activate/bulk")
+async def activate_ideas(request: IdeaBulkActivateRequest):
+    """
+    Activate several parked ideas
+    """
+    repository = await _repository(idea_ids=request.idea_ids)
+    updated = await repository.set_status(request.idea_ids, "active")
+    return {"updated": updated, "status": "active"}
+
+
+@router.get("/pipeline/stats")
+async def get_pipeline_stats():
+    """
+    Background parking queue and write-behind buffer metrics
+    """
+    return {
+        "pipeline": get_idea_pipeline().stats(),
+        "write_behind": get_idea_write_behind().stats(),
+        "connections_job": get_idea_connections_job().stats()
+    }
+
+
+@router.get("/search", response_model=List[Idea])
+async def search_ideas(
+    q: str = Query(..., min_length=1, max_length=500),
+    session_id: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100)
+):
+    """
+    Full-text search over parked ideas (French and English), best matches first
+    """
+    repository = await _repository(session_id)
+    return await repository.search(q, session_id, limit)
+
 
 @router.get("/session/{session_id}", response_model=List[Idea])
-async def get_session_ideas(session_id: str):
+async def get_session_ideas(
+    session_id: str,
+    response: Response,
+    limit: int = Query(None, ge=1, le=200),
+    cursor: Optional[str] = None
+):
     """
-    Get all ideas for a session
+    Get a session's ideas, newest first
+
+    Paginated by keyset: pass the X-Next-Cursor header of a page as `cursor`
+    to get the next one.
     """
-    # TODO: Fetch from database
-    return []
+    repository = await _repository(session_id)
+    try:
+        ideas, next_cursor = await repository.list_session(
+            session_id, limit or settings.nexia_idea_page_size, cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return ideas
 
 
 @router.get("/{idea_id}", response_model=Idea)
@@ -57,8 +113,23 @@ async def get_idea(idea_id: str):
     """
     Get a specific idea
     """
-    # TODO: Fetch from database
-    raise HTTPException(status_code=404, detail="Idea not found")
+    repository = await _repository(idea_ids=[idea_id])
+    idea = await repository.get(idea_id)
+    if idea is None:
+        raise HTTPException(status_code=404, detail="Idea not found")
+    return idea
+
+
+@router.get("/{idea_id}/connections", response_model=List[Idea])
+async def get_idea_connections(idea_id: str):
+    """
+    Get the ideas connected to an idea (precomputed in the background)
+    """
+    repository = await _repository(idea_ids=[idea_id])
+    idea = await repository.get(idea_id)
+    if idea is None:
+        raise HTTPException(status_code=404, detail="Idea not found")
+    return await repository.get_many(idea.connections)
 
 
 @router.put("/{idea_id}/activate")
@@ -66,7 +137,9 @@ async def activate_idea(idea_id: str):
     """
     Activate a parked idea
     """
-    # TODO: Update in database
+    repository = await _repository(idea_ids=[idea_id])
+    if not await repository.set_status([idea_id], "active"):
+        raise HTTPException(status_code=404, detail="Idea not found")
     return {"idea_id": idea_id, "status": "active"}
 
 
@@ -75,5 +148,7 @@ async def delete_idea(idea_id: str):
     """
     Delete an idea
     """
-    # TODO: Delete from database
+    repository = await _repository(idea_ids=[idea_id])
+    if not await repository.delete(idea_id):
+        raise HTTPException(status_code=404, detail="Idea not found")
     return {"message": "Idea deleted successfully"}
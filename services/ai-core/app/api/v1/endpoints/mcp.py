@@ -2,12 +2,16 @@
 MCP (Model Context Protocol) API endpoints
 Provides access to shell, git, and other system tools
 """
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
+from typing import AsyncIterator, List, Literal, Optional, Dict, Any
+import json
 import logging
 
-from app.core.ai_engine import NexiaEngine
+from app.config import settings
+from app.core.ai_engine import get_engine
+from app.core.shell_scheduler import SchedulerBusy
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -17,6 +21,16 @@ class ShellCommandRequest(BaseModel):
     command: str
     args: Optional[List[str]] = None
     cwd: Optional[str] = None
+    session_id: Optional[str] = None  # per-session concurrency limit
+    priority: Literal["interactive", "background"] = "interactive"
+
+class ShellStreamRequest(ShellCommandRequest):
+    timeout: Optional[float] = Field(None, gt=0)  # seconds, defaults to the shell's max_execution_time
+
+    def stream_timeout(self) -> Optional[float]:
+        if self.timeout is None:
+            return None
+        return min(self.timeout, settings.nexia_shell_stream_max_timeout)
 
 class ShellCommandResponse(BaseModel):
     stdout: str
@@ -46,11 +60,13 @@ class GitActionRequest(BaseModel):
 async def execute_shell_command(request: ShellCommandRequest):
     """Execute a shell command safely"""
     try:
-        engine = NexiaEngine()
+        engine = get_engine()
         result = await engine.mcp_shell.execute_command(
             command=request.command,
             args=request.args,
-            cwd=request.cwd
+            cwd=request.cwd,
+            session_id=request.session_id,
+            priority=request.priority
         )
         
         return ShellCommandResponse(
@@ -60,16 +76,94 @@ async def execute_shell_command(request: ShellCommandRequest):
             command=result.command,
             execution_time=result.execution_time
         )
+    except SchedulerBusy as e:
+        raise HTTPException(status_code=429, detail=str(e))
     except Exception as e:
         logger.error(f"Shell command error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def _stream_events(request: ShellStreamRequest) -> AsyncIterator[Dict[str, Any]]:
+    return get_engine().mcp_shell.stream_command(
+        command=request.command,
+        args=request.args,
+        cwd=request.cwd,
+        timeout=request.stream_timeout(),
+        session_id=request.session_id,
+        priority=request.priority
+    )
+
+async def _shell_sse_events(request: ShellStreamRequest) -> AsyncIterator[str]:
+    """Format shell output events as Server-Sent Events"""
+    try:
+        async for event in _stream_events(request):
+            yield f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+    except Exception as e:
+        logger.error(f"Shell stream error: {e}")
+        error = {"type": "error", "detail": str(e)}
+        yield f"event: error\ndata: {json.dumps(error, ensure_ascii=False)}\n\n"
+
+@router.post("/shell/stream")
+async def stream_shell_command(request: ShellStreamRequest):
+    """
+    Execute a shell command and stream its output (Server-Sent Events)
+    
+    Emits `stdout`/`stderr` events as output is produced, then one `exit`
+    event with the return code and `timed_out`. Disconnecting kills the command.
+    """
+    return StreamingResponse(
+        _shell_sse_events(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/shell/stream")
+async def stream_shell_command_ws(websocket: WebSocket):
+    """
+    Shell output streaming over WebSocket, one JSON ShellStreamRequest per command
+    """
+    await websocket.accept()
+    try:
+        while True:
+            try:
+                # Invalid JSON or a non-object payload must not close the socket
+                request = ShellStreamRequest.model_validate(await websocket.receive_json())
+            except (ValueError, TypeError, ValidationError) as e:
+                await websocket.send_json({"type": "error", "detail": str(e)})
+                continue
+            
+            try:
+                async for event in _stream_events(request):
+                    await websocket.send_json(event)
+            except WebSocketDisconnect:
+                raise
+            except Exception as e:
+                logger.error(f"Shell websocket error: {e}")
+                await websocket.send_json({"type": "error", "detail": str(e)})
+    except WebSocketDisconnect:
+        logger.debug("Shell websocket disconnected")
+
+@router.get("/shell/scheduler")
+async def get_shell_scheduler_stats():
+    """Running commands, queue depth and queue wait latencies"""
+    return get_engine().mcp_shell.scheduler.stats()
+
+@router.get("/shell/cache")
+async def get_shell_cache_stats():
+    """Read-only command cache hit/miss metrics"""
+    return get_engine().mcp_shell.cache.stats()
+
+@router.get("/shell/workers")
+async def get_shell_worker_stats():
+    """Persistent per-session shell workers"""
+    return get_engine().mcp_shell.workers.stats()
+
 @router.get("/shell/info")
-async def get_shell_info():
+async def get_shell_info(session_id: Optional[str] = None):
     """Get shell and system information"""
     try:
-        engine = NexiaEngine()
+        engine = get_engine()
         info = await engine.mcp_shell.get_system_info()
+        info['current_directory'] = engine.mcp_shell.get_current_directory(session_id)
         info['allowed_commands'] = engine.mcp_shell.get_allowed_commands()
         return info
     except Exception as e:
@@ -80,7 +174,7 @@ async def get_shell_info():
 async def start_claude_code(request: ShellCommandRequest):
     """Start Claude Code session"""
     try:
-        engine = NexiaEngine()
+        engine = get_engine()
         result = await engine.mcp_shell.start_claude_code_session(request.cwd)
         
         return ShellCommandResponse(
@@ -98,7 +192,7 @@ async def start_claude_code(request: ShellCommandRequest):
 async def get_git_status(repo_path: Optional[str] = None):
     """Get git repository status"""
     try:
-        engine = NexiaEngine()
+        engine = get_engine()
         status = await engine.mcp_git.get_status(repo_path)
         
         return GitStatusResponse(
@@ -118,7 +212,7 @@ async def get_git_status(repo_path: Optional[str] = None):
 async def execute_git_action(request: GitActionRequest):
     """Execute git action (commit, push, pull, add, etc.)"""
     try:
-        engine = NexiaEngine()
+        engine = get_engine()
         
         if request.action == "add":
             if not request.files:
@@ -161,26 +255,34 @@ async def execute_git_action(request: GitActionRequest):
         logger.error(f"Git action error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# Static, serialized once at import
+AVAILABLE_TOOLS = {
+    "shell": {
+        "commands": [
+            "execute", "stream", "info", "claude-code"
+        ],
+        "description": "Shell command execution and system info"
+    },
+    "git": {
+        "commands": [
+            "status", "add", "commit", "push", "pull", "log", "diff"
+        ],
+        "description": "Git repository operations"
+    },
+    "claude_bridge": {
+        "commands": [
+            "ask", "status"
+        ],
+        "description": "Direct access to Claude.ai via browser automation"
+    }
+}
+_AVAILABLE_TOOLS_BODY = json.dumps(AVAILABLE_TOOLS).encode("utf-8")
+
 @router.get("/tools/available")
 async def get_available_tools():
     """Get list of available MCP tools"""
-    return {
-        "shell": {
-            "commands": [
-                "execute", "info", "claude-code"
-            ],
-            "description": "Shell command execution and system info"
-        },
-        "git": {
-            "commands": [
-                "status", "add", "commit", "push", "pull", "log", "diff"
-            ],
-            "description": "Git repository operations"
-        },
-        "claude_bridge": {
-            "commands": [
-                "ask", "status"
-            ],
-            "description": "Direct access to Claude.ai via browser automation"
-        }
-    }
\ No newline at end of file
+    return Response(
+        content=_AVAILABLE_TOOLS_BODY,
+        media_type="application/json",
+        headers={"Cache-Control": "public, max-age=3600"}
+    )
@@ -1,11 +1,14 @@
 """
 Modes management endpoints
 """
-from fastapi import APIRouter
-from typing import List
+from fastapi import APIRouter, HTTPException, Request, Response
+from typing import Dict, List, Tuple
 from pydantic import BaseModel
+import hashlib
+import json
 
-from app.core.modes import NexiaMode, AVAILABLE_MODES
+from app.core.ai_engine import get_engine
+from app.core.modes import NexiaMode
 
 router = APIRouter()
 
@@ -22,20 +25,44 @@ class SwitchModeRequest(BaseModel):
     mode: str
 
 
+# Serialized listing and its ETag, rebuilt only when the engine's modes change
+_listing: Dict[str, object] = {"modes": None, "body": b"", "etag": ""}
+
+
+def _modes_listing(modes: Dict[str, NexiaMode]) -> Tuple[bytes, str]:
+    if _listing["modes"] is not modes:
+        body = json.dumps(
+            [
+                ModeInfo(
+                    id=mode_id,
+                    name=mode.name,
+                    description=mode.description,
+                    capabilities=mode.capabilities
+                ).model_dump()
+                for mode_id, mode in modes.items()
+            ],
+            ensure_ascii=False
+        ).encode("utf-8")
+        _listing.update(
+            modes=modes,
+            body=body,
+            etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        )
+    return _listing["body"], _listing["etag"]
+
+
 @router.get("/", response_model=List[ModeInfo])
-async def get_available_modes():
+async def get_available_modes(request: Request):
     """
     Get all available Nexia modes
+
+    The body is precomputed; clients revalidate with If-None-Match.
     """
-    return [
-        ModeInfo(
-            id=mode_id,
-            name=mode.name,
-            description=mode.description,
-            capabilities=mode.capabilities
-        )
-        for mode_id, mode in AVAILABLE_MODES.items()
-    ]
+    body, etag = _modes_listing(get_engine().modes)
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=60"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @router.get("/current/{session_id}")
@@ -43,8 +70,8 @@ async def get_current_mode(session_id: str):
     """
     Get current mode for a session
     """
-    # TODO: Implement session mode tracking
-    return {"mode": "focus_guardian", "session_id": session_id}
+    mode = await get_engine().get_session_mode(session_id)
+    return {"mode": mode, "session_id": session_id}
 
 
 @router.post("/switch")
@@ -52,9 +79,17 @@ async def switch_mode(request: SwitchModeRequest):
     """
     Switch mode for a session
     """
-    # TODO: Implement mode switching logic
+    engine = get_engine()
+    try:
+        previous = await engine.switch_mode(request.session_id, request.mode)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail={"message": str(e), "available_modes": list(engine.modes)}
+        )
     return {
         "session_id": request.session_id,
+        "previous_mode": previous,
         "new_mode": request.mode,
         "status": "switched"
     }
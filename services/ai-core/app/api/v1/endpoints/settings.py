@@ -4,19 +4,16 @@ Settings endpoints
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Dict, Optional
-import os
-import json
 import logging
-from pathlib import Path
 
 from app.config import settings
+from app.core.ai_engine import get_engine
+from app.core.database import get_pool_stats
+from app.core.settings_store import settings_repository
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-# Stockage local des clés en développement
-SETTINGS_FILE = Path.home() / ".nexia" / "settings.json"
-
 
 class ApiKeysRequest(BaseModel):
     openai: Optional[str] = None
@@ -30,27 +27,12 @@ class SettingsResponse(BaseModel):
     environment: str
 
 
-def load_settings():
-    """Load settings from file"""
-    if SETTINGS_FILE.exists():
-        with open(SETTINGS_FILE, 'r') as f:
-            return json.load(f)
-    return {}
-
-
-def save_settings(data: dict):
-    """Save settings to file"""
-    SETTINGS_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with open(SETTINGS_FILE, 'w') as f:
-        json.dump(data, f, indent=2)
-
-
 @router.get("/", response_model=SettingsResponse)
 async def get_settings():
     """
     Get current settings (without exposing actual keys)
     """
-    saved_settings = load_settings()
+    saved_settings = await settings_repository.load()
     
     return SettingsResponse(
         api_keys={
@@ -71,8 +53,7 @@ async def update_api_keys(request: ApiKeysRequest):
     try:
         # Check if Claude Bridge is available first
         try:
-            from app.core.claude_bridge import ClaudeBridge
-            claude_bridge = ClaudeBridge()
+            claude_bridge = get_engine().claude_bridge
             if claude_bridge.is_connected():
                 return {
                     "message": "🚀 Nexia utilise déjà Claude Bridge avec votre abonnement Max !",
@@ -89,32 +70,23 @@ async def update_api_keys(request: ApiKeysRequest):
         except Exception as e:
             logger.info(f"Claude Bridge not available, falling back to API keys: {e}")
         
-        saved_settings = load_settings()
+        # Update settings; an empty string clears a key
+        changes = {}
+        if request.openai is not None:
+            changes["openai_api_key"] = request.openai
+            settings.openai_api_key = request.openai or None
+        if request.anthropic is not None:
+            changes["anthropic_api_key"] = request.anthropic
+            settings.anthropic_api_key = request.anthropic or None
+        if request.gemini is not None:
+            changes["gemini_api_key"] = request.gemini
+            settings.gemini_api_key = request.gemini or None
+        if request.perplexity is not None:
+            changes["perplexity_api_key"] = request.perplexity
+            settings.perplexity_api_key = request.perplexity or None
         
-        # Update settings
-        if request.openai:
-            saved_settings["openai_api_key"] = request.openai
-            settings.openai_api_key = request.openai
-        if request.anthropic:
-            saved_settings["anthropic_api_key"] = request.anthropic
-            settings.anthropic_api_key = request.anthropic
-        if request.gemini:
-            saved_settings["gemini_api_key"] = request.gemini
-            settings.gemini_api_key = request.gemini
-        if request.perplexity:
-            saved_settings["perplexity_api_key"] = request.perplexity
-            settings.perplexity_api_key = request.perplexity
-        
-        # Save to file
-        save_settings(saved_settings)
-        
-        # Reinitialize AI engine with new keys
-        try:
-            from app.core.ai_engine import NexiaEngine
-            engine = NexiaEngine()
-            engine.reinit_llms()
-        except Exception as e:
-            logger.warning(f"Could not reinitialize AI engine: {e}")
+        # Save to file; the engine reloads the LLM clients whose key changed
+        saved_settings = await settings_repository.update(changes)
         
         return {
             "message": "API keys updated successfully",
@@ -137,15 +109,16 @@ async def check_claude_bridge():
     Check Claude Bridge status
     """
     try:
-        from app.core.claude_bridge import ClaudeBridge
-        claude_bridge = ClaudeBridge()
+        claude_bridge = get_engine().claude_bridge
         is_connected = claude_bridge.is_connected()
         
         return {
             "claude_bridge_available": True,
             "is_connected": is_connected,
             "status": "✅ Claude Bridge actif - utilise votre abonnement Max" if is_connected else "⏳ Claude Bridge disponible mais non connecté",
-            "method": "Browser automation vers Claude.ai"
+            "method": "Browser automation vers Claude.ai",
+            "browser_pool": claude_bridge.pool.stats(),
+            "completion_detection": claude_bridge.detector.metrics.snapshot()
         }
     except Exception as e:
         return {
@@ -162,8 +135,7 @@ async def authenticate_claude_bridge():
     Authenticate Claude Bridge - tries to establish session
     """
     try:
-        from app.core.claude_bridge import ClaudeBridge
-        claude_bridge = ClaudeBridge()
+        claude_bridge = get_engine().claude_bridge
         
         # Try to setup browser and check authentication
         success = await claude_bridge._setup_browser()
@@ -195,8 +167,7 @@ async def test_claude_bridge():
     Test Claude Bridge connection
     """
     try:
-        from app.core.claude_bridge import ClaudeBridge
-        claude_bridge = ClaudeBridge()
+        claude_bridge = get_engine().claude_bridge
         
         test_response = await claude_bridge.ask_claude("Bonjour ! Peux-tu me confirmer que NEXIA fonctionne bien ?")
         
@@ -221,3 +192,25 @@ async def test_claude_bridge():
             "message": f"❌ Erreur test: {str(e)}",
             "status": "error"
         }
+
+
+@router.get("/providers/health")
+async def get_providers_health():
+    """
+    Circuit breaker state and latency of each LLM provider
+    """
+    engine = get_engine()
+    latency = engine.llm_router.stats()
+    return {
+        "providers": engine.provider_health.snapshot(),
+        "latency": latency["providers"],
+        "hedging": {key: value for key, value in latency.items() if key != "providers"}
+    }
+
+
+@router.get("/database/pool")
+async def get_database_pool():
+    """
+    Database connection pool occupancy and checkout wait times
+    """
+    return get_pool_stats()
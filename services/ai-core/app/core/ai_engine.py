@@ -1,95 +1,185 @@
 """
 Nexia AI Engine Core avec LangSmith tracing
 """
-from typing import Dict, Any, Optional
+from typing import AsyncIterator, Dict, Any, Optional
+from functools import partial
 from datetime import datetime
+import hashlib
 import logging
-from langchain_openai import ChatOpenAI
-from langchain_anthropic import ChatAnthropic
-from langchain.schema import HumanMessage, SystemMessage
-
+import time
 # Intégration LangSmith pour monitoring IA
 from app.core.langsmith_integration import trace_conversation, trace_llm_call, trace_mode_processing
 
-from app.core.modes import AVAILABLE_MODES, NexiaMode
-from app.core.claude_bridge import ClaudeBridge
+from app.core.modes import NexiaMode
+from app.core.mode_registry import compile_action_matchers, get_mode_registry
+from app.core.conversation_history import ConversationHistory
+from app.core.prompts import build_system_prompt, compile_mode_prompt, compile_mode_prompts, render_context
+from app.core.claude_bridge import INCOMPLETE_NOTICE, ClaudeBridge
+from app.core.completion_detector import TailOutcome
+from app.core.browser_pool import close_browser_pool
+from app.core.idea_store import close_idea_write_behind, new_idea
+from app.core.idea_pipeline import close_idea_pipeline, get_idea_pipeline
 from app.core.mcp_shell import MCPShellServer
 from app.core.mcp_git import MCPGitServer
-from app.models.conversation import ConversationResponse, Session
+from app.core.settings_store import settings_repository
+from app.core.session_store import SessionStore, get_session_store
+from app.core.circuit_breaker import ProviderHealthRegistry
+from app.core.llm_router import AllProvidersFailed, HedgedRouter
+from app.core.response_cache import ResponseCache, make_cache_key, normalize_message
+from app.core.coalescing import MicroBatcher, SingleFlight
+from app.core import redis_client
+from app.models.conversation import ConversationResponse, LLMResponse, Session
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# API LLM provider -> settings field holding its key
+API_KEY_FIELDS = {
+    "openai": "openai_api_key",
+    "anthropic": "anthropic_api_key"
+}
+
 
 class NexiaEngine:
-    """Main AI Engine for Nexia"""
+    """Main AI Engine for Nexia
     
-    _instance = None
-    
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
+    One engine is created per worker process (see init_engine). It only holds
+    shared, reusable resources (LLM clients, Claude Bridge, MCP servers);
+    per-conversation state lives in the session store.
+    """
     
     def __init__(self):
-        if not hasattr(self, 'initialized'):
-            self.modes = AVAILABLE_MODES
-            self.sessions: Dict[str, Session] = {}
-            self.claude_bridge = ClaudeBridge()
-            self.mcp_shell = MCPShellServer()
-            self.mcp_git = MCPGitServer(self.mcp_shell)
-            self._init_llms()
-            self.initialized = True
+        self.mode_registry = get_mode_registry()
+        self.reload_modes(self.mode_registry.modes)
+        self.mode_registry.subscribe(self.reload_modes)
+        self.provider_health = ProviderHealthRegistry()
+        self.claude_bridge = ClaudeBridge(breaker=self.provider_health.get("claude_bridge"))
+        self.mcp_shell = MCPShellServer()
+        self.mcp_git = MCPGitServer(self.mcp_shell)
+        self.response_cache = self._init_response_cache()
+        self.llm_router = HedgedRouter(health=self.provider_health)
+        self.inflight = SingleFlight()
+        self._init_llms()
+        settings_repository.subscribe(self._on_settings_changed)
+    
+    def _init_response_cache(self) -> Optional[ResponseCache]:
+        """Create the response cache, with a Redis tier if enabled"""
+        if not settings.nexia_response_cache_enabled:
+            return None
+        redis = redis_client.redis_client if settings.nexia_response_cache_redis else None
+        return ResponseCache(redis=redis)
     
     def _init_llms(self):
         """Initialize LLM clients"""
         self.llms = {}
         
         # Charger les clés depuis le fichier de settings si elles existent
-        from pathlib import Path
-        import json
-        
-        settings_file = Path.home() / ".nexia" / "settings.json"
-        if settings_file.exists():
-            with open(settings_file, 'r') as f:
-                saved_settings = json.load(f)
-                
-            # Mettre à jour les settings avec les clés sauvegardées
-            if saved_settings.get('openai_api_key'):
-                settings.openai_api_key = saved_settings['openai_api_key']
-            if saved_settings.get('anthropic_api_key'):
-                settings.anthropic_api_key = saved_settings['anthropic_api_key']
+        self._apply_saved_keys(settings_repository.snapshot(), API_KEY_FIELDS.values())
+        
+        for provider in API_KEY_FIELDS:
+            self._init_llm(provider)
+        self._init_batchers()
+    
+    def _apply_saved_keys(self, saved_settings: Dict[str, Any], fields, clear: bool = False):
+        """Mettre à jour les settings avec les clés sauvegardées
+        
+        With clear, an empty or removed key is cleared too instead of keeping
+        the previous one.
+        """
+        for field in fields:
+            if saved_settings.get(field) or clear:
+                setattr(settings, field, saved_settings.get(field) or None)
+    
+    def _init_llm(self, provider: str):
+        """(Re)create the client of a single API LLM"""
+        self.llms.pop(provider, None)
         
         # Disable API LLMs by default - prefer Claude Bridge
         # Uncomment only if you want to use API tokens instead of Claude Max
         
-        # if settings.openai_api_key:
+        # Provider SDKs are imported here, only when a client is actually built
+        
+        # if provider == 'openai' and settings.openai_api_key:
+        #     from langchain_openai import ChatOpenAI
         #     self.llms['openai'] = ChatOpenAI(
         #         api_key=settings.openai_api_key,
         #         model="gpt-4-turbo-preview"
         #     )
             
-        # if settings.anthropic_api_key:
+        # if provider == 'anthropic' and settings.anthropic_api_key:
+        #     from langchain_anthropic import ChatAnthropic
         #     self.llms['anthropic'] = ChatAnthropic(
         #         api_key=settings.anthropic_api_key,
         #         model="claude-3-opus-20240229"
         #     )
     
+    def _init_batchers(self):
+        """Optional micro-batching of concurrent API LLM calls"""
+        self.llm_batchers = {}
+        if settings.nexia_llm_batch_window_ms > 0:
+            self.llm_batchers = {name: MicroBatcher(llm) for name, llm in self.llms.items()}
+    
+    def _on_settings_changed(self, changed_keys):
+        """Hot-reload only the LLM clients whose API key changed"""
+        saved_settings = settings_repository.snapshot()
+        self._apply_saved_keys(saved_settings, changed_keys & set(API_KEY_FIELDS.values()), clear=True)
+        providers = [provider for provider, field in API_KEY_FIELDS.items() if field in changed_keys]
+        for provider in providers:
+            self._init_llm(provider)
+        if providers:
+            self._init_batchers()
+            logger.info(f"Reloaded LLM clients: {', '.join(providers)}")
+    
+    def reload_modes(self, modes: Dict[str, NexiaMode]):
+        """Swap the available modes and recompile their prompts and action matchers"""
+        self.mode_prompts = compile_mode_prompts(modes)
+        self.mode_matchers = {mode_id: compile_action_matchers(mode) for mode_id, mode in modes.items()}
+        self.modes = modes
+    
     def reinit_llms(self):
         """Reinitialize LLMs (used when API keys are updated)"""
         self._init_llms()
     
-    async def create_session(self) -> Session:
+    @property
+    def session_store(self) -> SessionStore:
+        """Session store, resolved once Redis has been initialized"""
+        return get_session_store()
+    
+    async def create_session(self, session_id: Optional[str] = None, mode: Optional[str] = None) -> Session:
         """Create a new conversation session"""
         session = Session(
-            id=f"session_{datetime.now().timestamp()}",
+            id=session_id or f"session_{datetime.now().timestamp()}",
             created_at=datetime.now(),
-            mode=settings.nexia_default_mode,
+            mode=mode or settings.nexia_default_mode,
             context={}
         )
-        self.sessions[session.id] = session
+        await self.session_store.save(session)
         return session
     
+    async def get_session(self, session_id: str) -> Optional[Session]:
+        """Get an existing session"""
+        return await self.session_store.get(session_id)
+    
+    async def get_session_mode(self, session_id: str) -> str:
+        """Current mode of a session (the default mode for unknown sessions)"""
+        session = await self.session_store.get(session_id)
+        if not session:
+            return settings.nexia_default_mode
+        return self._get_session_mode(session).id
+    
+    async def switch_mode(self, session_id: str, mode_id: str) -> str:
+        """Switch a session's mode, creating the session if needed
+        
+        Returns the previous mode. Raises ValueError for an unknown mode.
+        """
+        if mode_id not in self.modes:
+            raise ValueError(f"Unknown mode: {mode_id}")
+        previous = await self.session_store.set_mode(session_id, mode_id)
+        if previous is None:
+            await self.create_session(session_id, mode=mode_id)
+            return settings.nexia_default_mode
+        return previous
+    
     @trace_conversation
     async def process_message(
         self, 
@@ -97,36 +187,66 @@ class NexiaEngine:
         session_id: str, 
         context: Dict[str, Any]
     ) -> ConversationResponse:
-        """Process a message from the user"""
+        """Process a message from the user
         
-        # Get or create session
-        session = self.sessions.get(session_id)
-        if not session:
-            session = await self.create_session()
-            session.id = session_id
-            self.sessions[session_id] = session
+        Identical messages sent concurrently for the same session (client
+        retries) share a single LLM call and a single history turn.
+        """
+        if not settings.nexia_coalesce_requests:
+            return await self._process_message(message, session_id, context)
         
-        # Get current mode
-        mode = self.modes.get(session.mode)
-        if not mode:
-            mode = self.modes[settings.nexia_default_mode]
+        key = (session_id, self._message_fingerprint(message, context))
+        response, shared = await self.inflight.do(
+            key, partial(self._process_message, message, session_id, context)
+        )
+        if shared:
+            response = response.model_copy(deep=True)
+            response.metadata["coalesced"] = True
+        return response
+    
+    def _message_fingerprint(self, message: str, context: Dict[str, Any]) -> str:
+        digest = hashlib.sha256(normalize_message(message).encode("utf-8"))
+        digest.update(b"\x00")
+        digest.update(render_context(context).encode("utf-8"))
+        return digest.hexdigest()
+    
+    async def _process_message(
+        self,
+        message: str,
+        session_id: str,
+        context: Dict[str, Any]
+    ) -> ConversationResponse:
+        session = await self._get_or_create_session(session_id)
+        mode = self._get_session_mode(session)
         
         # Build prompt with mode personality
         system_prompt = self._build_system_prompt(mode, context)
         
-        # Get response from LLM
-        response_text = await self._get_llm_response(
-            system_prompt, 
-            message,
-            session.context
-        )
+        history = ConversationHistory.from_context(session.context)
+        
+        # Identical prompts are served from the response cache
+        cache_key = self._cache_key(mode, system_prompt, message, history)
+        cached = await self.response_cache.get(cache_key) if cache_key else None
+        
+        if cached is not None:
+            response_text = cached
+        else:
+            # Get response from LLM
+            response_text = await self._get_llm_response(
+                system_prompt, 
+                message,
+                session.context
+            )
+            if cache_key and self._is_cacheable(response_text):
+                await self.response_cache.set(cache_key, response_text, mode.id)
         
         # Process mode-specific actions
         actions = await self._process_mode_actions(mode, message, response_text)
+        idea_id = await self._park_idea(session_id, message) if actions.get("park_idea") else None
         
         # Update session context
-        session.context['last_message'] = message
-        session.context['last_response'] = response_text
+        from_provider = cached is not None or self._is_cacheable(response_text)
+        await self._record_turn(session, history, message, response_text, from_provider)
         
         return ConversationResponse(
             response=response_text,
@@ -134,25 +254,165 @@ class NexiaEngine:
             actions=actions,
             metadata={
                 "session_id": session_id,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": datetime.now().isoformat(),
+                "cache": self._cache_status(cache_key, cached),
+                "idea_id": idea_id
             }
         )
     
+    async def stream_message(
+        self,
+        message: str,
+        session_id: str,
+        context: Dict[str, Any]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Process a message and yield response chunks as they are generated"""
+        
+        session = await self._get_or_create_session(session_id)
+        mode = self._get_session_mode(session)
+        system_prompt = self._build_system_prompt(mode, context)
+        
+        history = ConversationHistory.from_context(session.context)
+        
+        cache_key = self._cache_key(mode, system_prompt, message, history)
+        cached = await self.response_cache.get(cache_key) if cache_key else None
+        
+        if cached is not None:
+            response_text = cached
+            from_provider = True
+            yield {"type": "token", "content": cached}
+        else:
+            chunks = []
+            outcome = TailOutcome()
+            async for chunk in self._stream_llm_response(system_prompt, message, session.context, outcome):
+                chunks.append(chunk)
+                yield {"type": "token", "content": chunk}
+            # Chunks are only the token stream: when claude.ai rewrote earlier
+            # text, the answer is what the page finally showed
+            response_text = outcome.text if outcome.rewritten else "".join(chunks)
+            
+            from_provider = bool(chunks) and all(self._is_cacheable(chunk) for chunk in chunks)
+            if cache_key and from_provider:
+                await self.response_cache.set(cache_key, response_text, mode.id)
+        
+        # Mode actions need the full answer, so they are sent as the final event
+        actions = await self._process_mode_actions(mode, message, response_text)
+        idea_id = await self._park_idea(session_id, message) if actions.get("park_idea") else None
+        
+        await self._record_turn(session, history, message, response_text, from_provider)
+        
+        yield {
+            "type": "done",
+            "response": response_text,
+            "mode": session.mode,
+            "actions": actions,
+            "metadata": {
+                "session_id": session_id,
+                "timestamp": datetime.now().isoformat(),
+                "cache": self._cache_status(cache_key, cached),
+                "idea_id": idea_id
+            }
+        }
+    
+    async def _park_idea(self, session_id: str, message: str) -> Optional[str]:
+        """Park the message as an idea, tagged and stored in the background
+        
+        Returns the new idea's id, or None when the pipeline is saturated.
+        """
+        idea = new_idea(session_id, message)
+        if await get_idea_pipeline().submit(idea):
+            return idea.id
+        return None
+    
+    async def _record_turn(
+        self,
+        session: Session,
+        history: ConversationHistory,
+        message: str,
+        response_text: str,
+        from_provider: bool
+    ):
+        """Append the turn to the session history and persist the session"""
+        session.context['last_message'] = message
+        session.context['last_response'] = response_text
+        # Canned fallback answers would only add noise to the LLM context
+        if from_provider:
+            history.append(message, response_text)
+            history.to_context(session.context)
+        await self.session_store.save(session)
+    
+    def _cache_key(
+        self,
+        mode: NexiaMode,
+        system_prompt: str,
+        message: str,
+        history: ConversationHistory
+    ) -> Optional[str]:
+        if not self.response_cache:
+            return None
+        return make_cache_key(mode.id, system_prompt, message, history.fingerprint())
+    
+    def _build_messages(self, system_prompt: str, message: str, history: ConversationHistory) -> list:
+        """LangChain messages: system prompt, history window, then the new message"""
+        from langchain.schema import AIMessage, HumanMessage, SystemMessage
+        
+        if history.summary:
+            system_prompt = f"{system_prompt}\nRésumé de la conversation :\n{history.summary}\n"
+        messages = [SystemMessage(content=system_prompt)]
+        for user, assistant in history.as_pairs():
+            messages.append(HumanMessage(content=user))
+            messages.append(AIMessage(content=assistant))
+        messages.append(HumanMessage(content=message))
+        return messages
+    
+    def _build_bridge_prompt(self, message: str, history: ConversationHistory) -> str:
+        """Single prompt for Claude Bridge, carrying the history window"""
+        transcript = history.render()
+        if not transcript:
+            return message
+        return f"{transcript}\n\nNouveau message : {message}"
+    
+    def _is_cacheable(self, response: str) -> bool:
+        """Only answers actually produced by a provider are cached"""
+        return isinstance(response, LLMResponse) and not response.is_fallback
+    
+    def _cache_status(self, cache_key: Optional[str], cached: Optional[str]) -> str:
+        if not cache_key:
+            return "bypass"
+        return "hit" if cached is not None else "miss"
+    
+    async def _get_or_create_session(self, session_id: str) -> Session:
+        """Get a session by id, creating it on first use"""
+        session = await self.session_store.get(session_id)
+        if not session:
+            session = await self.create_session(session_id)
+        return session
+    
+    def _get_session_mode(self, session: Session) -> NexiaMode:
+        """Get the session's mode at its pinned version, falling back to the default mode
+        
+        Sessions are pinned to the current version of their mode on first use, so
+        a reload never changes a conversation's personality mid-way. The pin is
+        persisted with the next recorded turn and dropped on a mode switch.
+        """
+        mode = None
+        if session.mode_version:
+            mode = self.mode_registry.get(session.mode, session.mode_version)
+        if mode is None:
+            mode = self.modes.get(session.mode) or self.modes[settings.nexia_default_mode]
+            session.mode_version = mode.version
+        return mode
+    
+    def _is_current(self, mode: NexiaMode) -> bool:
+        current = self.modes.get(mode.id)
+        return current is not None and current.version == mode.version
+    
     def _build_system_prompt(self, mode: NexiaMode, context: Dict[str, Any]) -> str:
         """Build system prompt based on mode"""
-        base_prompt = f"""Tu es Nexia, un assistant IA spécialisé pour les entrepreneurs TDAH.
-        
-Mode actuel: {mode.name}
-Description: {mode.description}
-
-Capacités spécifiques:
-{chr(10).join(f"- {cap}" for cap in mode.capabilities)}
-
-Instructions: {mode.system_prompt}
-
-Contexte utilisateur: {context}
-"""
-        return base_prompt
+        prefix = self.mode_prompts.get(mode.id) if self._is_current(mode) else None
+        if prefix is None:
+            prefix = compile_mode_prompt(mode)
+        return build_system_prompt(prefix, context)
     
     @trace_llm_call
     async def _get_llm_response(
@@ -160,36 +420,145 @@ Contexte utilisateur: {context}
         system_prompt: str, 
         message: str,
         session_context: Dict[str, Any]
-    ) -> str:
+    ) -> LLMResponse:
         """Get response from LLM or Claude Bridge"""
         
-        # Try Claude Bridge first (uses Claude Max subscription)
+        history = ConversationHistory.from_context(session_context)
+        bridge_prompt = self._build_bridge_prompt(message, history)
+        
+        # Claude Bridge first (uses Claude Max subscription), then API LLMs.
+        # Slow providers are hedged with the next one by the router.
+        providers = []
         if self.claude_bridge.is_connected():
+            # Without an API LLM behind it, keep the bridge's own Safari fallback
+            strict = bool(self.llms)
+            providers.append((
+                "claude_bridge",
+                lambda: self.claude_bridge.ask_claude(bridge_prompt, strict=strict)
+            ))
+        for name, llm in self.llms.items():
+            providers.append((name, partial(self._ask_llm, name, llm, system_prompt, message, history)))
+        
+        if providers:
             try:
-                bridge_response = await self.claude_bridge.ask_claude(message)
-                logger.info("Response from Claude Bridge (Max subscription)")
-                return bridge_response
+                return await self.llm_router.race(providers)
+            except AllProvidersFailed as e:
+                logger.error(f"LLM Error: {e}")
+                if e.fallback is not None:
+                    return e.fallback
+                return LLMResponse("Désolé, une erreur s'est produite. Pouvez-vous reformuler?", "fallback")
+        
+        # Final fallback to pattern matching
+        return LLMResponse(
+            self._get_fallback_response(message, self._fallback_mode()),
+            "fallback"
+        )
+    
+    async def _ask_llm(
+        self,
+        name: str,
+        llm,
+        system_prompt: str,
+        message: str,
+        history: ConversationHistory
+    ) -> LLMResponse:
+        """Single API LLM call, batched with concurrent calls when enabled"""
+        # Built here so LangChain is only imported when an API LLM is called
+        messages = self._build_messages(system_prompt, message, history)
+        batcher = self.llm_batchers.get(name)
+        if batcher is not None:
+            return LLMResponse(await batcher.generate(messages), name)
+        response = await llm.agenerate([messages])
+        return LLMResponse(response.generations[0][0].text, name)
+    
+    async def _stream_llm_response(
+        self,
+        system_prompt: str,
+        message: str,
+        session_context: Dict[str, Any],
+        outcome: Optional[TailOutcome] = None
+    ) -> AsyncIterator[LLMResponse]:
+        """Stream response chunks from Claude Bridge or LLM
+        
+        outcome receives the Claude Bridge answer as finally rendered.
+        """
+        outcome = outcome if outcome is not None else TailOutcome()
+        
+        history = ConversationHistory.from_context(session_context)
+        
+        # Try Claude Bridge first, tailing the answer as claude.ai renders it
+        bridge_breaker = self.provider_health.get("claude_bridge")
+        if self.claude_bridge.is_connected() and bridge_breaker.allow_request():
+            started = False
+            started_at = time.monotonic()
+            try:
+                async for chunk in self.claude_bridge.stream_claude(
+                    self._build_bridge_prompt(message, history),
+                    outcome=outcome
+                ):
+                    started = True
+                    yield LLMResponse(chunk, "claude_bridge")
+                if started and not outcome.completed:
+                    # Cut off by the response timeout: labelled, never cached
+                    outcome.text = (outcome.text or "") + INCOMPLETE_NOTICE
+                    yield LLMResponse(INCOMPLETE_NOTICE, "fallback")
+                if started:
+                    bridge_breaker.record_success(time.monotonic() - started_at)
+                    logger.info("Streamed response from Claude Bridge (Max subscription)")
+                    return
+                bridge_breaker.record_failure(time.monotonic() - started_at)
             except Exception as e:
-                logger.error(f"Claude Bridge Error: {e}")
+                bridge_breaker.record_failure(time.monotonic() - started_at)
+                logger.error(f"Claude Bridge streaming error: {e}")
+                if started:
+                    # Part of the answer is already on the wire, don't mix providers
+                    interrupted = "\n\n⚠️ Réponse interrompue."
+                    if outcome.text is not None:
+                        outcome.text += interrupted
+                    yield LLMResponse(interrupted, "fallback")
+                    return
+            finally:
+                # Client went away mid-stream: free the half-open probe slot
+                bridge_breaker.release()
         
-        # Fallback to API LLMs
-        llm = next(iter(self.llms.values())) if self.llms else None
+        # Fallback to the first API LLM whose circuit is closed
+        llm_name, llm = next(
+            (
+                (name, llm) for name, llm in self.llms.items()
+                if self.provider_health.get(name).allow_request()
+            ),
+            (None, None)
+        )
         
         if llm:
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=message)
-            ]
+            messages = self._build_messages(system_prompt, message, history)
+            llm_breaker = self.provider_health.get(llm_name)
             
+            started = False
+            started_at = time.monotonic()
             try:
-                response = await llm.agenerate([messages])
-                return response.generations[0][0].text
+                async for chunk in llm.astream(messages):
+                    if chunk.content:
+                        started = True
+                        yield LLMResponse(chunk.content, llm_name)
+                llm_breaker.record_success(time.monotonic() - started_at)
+                return
             except Exception as e:
-                logger.error(f"LLM Error: {e}")
-                return "Désolé, une erreur s'est produite. Pouvez-vous reformuler?"
+                llm_breaker.record_failure(time.monotonic() - started_at)
+                logger.error(f"LLM streaming error: {e}")
+                if started:
+                    yield LLMResponse("\n\n⚠️ Réponse interrompue.", "fallback")
+                else:
+                    yield LLMResponse("Désolé, une erreur s'est produite. Pouvez-vous reformuler?", "fallback")
+                return
+            finally:
+                llm_breaker.release()
         
         # Final fallback to pattern matching
-        return self._get_fallback_response(message, AVAILABLE_MODES.get('project_assistant'))
+        yield LLMResponse(
+            self._get_fallback_response(message, self._fallback_mode()),
+            "fallback"
+        )
     
     @trace_mode_processing
     async def _process_mode_actions(
@@ -198,26 +567,21 @@ Contexte utilisateur: {context}
         message: str, 
         response: str
     ) -> Dict[str, Any]:
-        """Process mode-specific actions"""
-        actions = {}
-        
-        # Mode-specific logic
-        if mode.id == "focus_guardian":
-            # Check for distractions or ideas to park
-            if any(word in message.lower() for word in ["idée", "penser", "et si"]):
-                actions["park_idea"] = True
-                
-        elif mode.id == "opportunity_hunter":
-            # Check for business opportunities
-            if any(word in message.lower() for word in ["marché", "client", "besoin"]):
-                actions["analyze_opportunity"] = True
-                
-        elif mode.id == "socratic_challenger":
-            # Generate challenging questions
-            actions["generate_questions"] = True
+        """Process mode-specific actions (keywords come from the mode definition)"""
+        matchers = self.mode_matchers.get(mode.id) if self._is_current(mode) else None
+        if matchers is None:
+            matchers = compile_action_matchers(mode)
         
+        actions = {}
+        lowered = message.lower()
+        for action, matcher in matchers.items():
+            if matcher is None or matcher.search(lowered):
+                actions[action] = True
         return actions
     
+    def _fallback_mode(self) -> NexiaMode:
+        return self.modes.get("project_assistant") or self.modes[settings.nexia_default_mode]
+
     def _get_fallback_response(self, message: str, mode) -> str:
         """Provide intelligent fallback when no LLM is configured"""
         
@@ -268,5 +632,40 @@ Contexte utilisateur: {context}
     
     async def end_session(self, session_id: str):
         """End a conversation session"""
-        if session_id in self.sessions:
-            del self.sessions[session_id]
+        await self.session_store.delete(session_id)
+        await self.mcp_shell.workers.discard(session_id)
+    
+    async def close(self):
+        """Release shared resources held by this worker"""
+        settings_repository.unsubscribe(self._on_settings_changed)
+        self.mode_registry.unsubscribe(self.reload_modes)
+        await self.mode_registry.stop_watching()
+        await close_browser_pool()
+        await self.mcp_shell.close()
+        await close_idea_pipeline()
+        await close_idea_write_behind()
+
+
+nexia_engine: Optional[NexiaEngine] = None
+
+
+def init_engine() -> NexiaEngine:
+    """Create the worker's engine (called from the application lifespan)"""
+    global nexia_engine
+    if nexia_engine is None:
+        nexia_engine = NexiaEngine()
+        logger.info("Nexia engine initialized")
+    return nexia_engine
+
+
+def get_engine() -> NexiaEngine:
+    """Get the worker's engine, creating it outside of the lifespan if needed"""
+    return nexia_engine or init_engine()
+
+
+async def shutdown_engine():
+    """Close the worker's engine"""
+    global nexia_engine
+    if nexia_engine is not None:
+        await nexia_engine.close()
+        nexia_engine = None
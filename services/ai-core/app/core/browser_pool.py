@@ -0,0 +1,309 @@
+"""
+NEXIA Browser Pool - Warm Playwright pages for the Claude Bridge
+Keeps a long-lived Chromium with pre-authenticated claude.ai pages that are
+leased per request instead of launching a fresh browser for every message.
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Any, Optional
+
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, BrowserContext, Page, Playwright
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+CLAUDE_URL = "https://claude.ai"
+CLAUDE_NEW_CHAT_URL = "https://claude.ai/new"
+INPUT_READY_SELECTOR = 'textarea, div[contenteditable="true"]'
+
+BROWSER_ARGS = [
+    '--no-sandbox',
+    '--disable-setuid-sandbox',
+    '--disable-blink-features=AutomationControlled',
+    '--disable-dev-shm-usage'
+]
+
+
+class BrowserPoolError(Exception):
+    """Raised when the pool cannot provide a usable claude.ai page"""
+
+
+class PooledPage:
+    """A browser context/page pair owned by the pool"""
+
+    def __init__(self, context: "BrowserContext", page: "Page"):
+        self.context = context
+        self.page = page
+        self.uses = 0
+        self.broken = False
+        self.created_at = time.monotonic()
+
+
+class BrowserPool:
+    """Pool of warm, pre-authenticated claude.ai pages sharing one Chromium"""
+
+    def __init__(
+        self,
+        size: int = None,
+        max_uses: int = None,
+        lease_timeout: float = None,
+        cookies_file: Path = None
+    ):
+        self.size = size or settings.claude_bridge_pool_size
+        self.max_uses = max_uses or settings.claude_bridge_page_max_uses
+        self.lease_timeout = lease_timeout or settings.claude_bridge_lease_timeout
+        self.cookies_file = cookies_file or Path.home() / ".nexia" / "claude_cookies.json"
+
+        self._playwright: Optional["Playwright"] = None
+        self._browser: Optional["Browser"] = None
+        self._browser_lock = asyncio.Lock()
+        # Each queue item is a slot: a warm PooledPage, or None when the slot
+        # still has to be (re)created by whoever leases it next.
+        self._idle: Optional[asyncio.Queue] = None
+        self._background: set = set()
+        self._closed = False
+
+        self.stats_counters = {
+            "leases": 0,
+            "created": 0,
+            "recycled": 0,
+            "crashed": 0,
+        }
+
+    def _ensure_queue(self) -> asyncio.Queue:
+        if self._idle is None:
+            self._idle = asyncio.Queue(maxsize=self.size)
+            for _ in range(self.size):
+                self._idle.put_nowait(None)
+        return self._idle
+
+    async def _ensure_browser(self) -> "Browser":
+        """Launch Chromium once, relaunching it if it crashed"""
+        async with self._browser_lock:
+            if self._browser and self._browser.is_connected():
+                return self._browser
+
+            if self._browser:
+                logger.warning("Pooled Chromium disconnected - relaunching")
+                self.stats_counters["crashed"] += 1
+
+            if self._playwright is None:
+                # Imported on first use, Playwright is slow to load
+                from playwright.async_api import async_playwright
+                self._playwright = await async_playwright().start()
+
+            self._browser = await self._playwright.chromium.launch(
+                headless=settings.claude_bridge_headless,
+                args=BROWSER_ARGS
+            )
+            logger.info("Pooled Chromium launched")
+            return self._browser
+
+    def _load_cookies(self) -> list:
+        if not self.cookies_file.exists():
+            return []
+        try:
+            with open(self.cookies_file, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"Could not load cookies: {e}")
+            return []
+
+    async def _create_slot(self) -> PooledPage:
+        """Open an authenticated claude.ai page ready to receive a prompt"""
+        browser = await self._ensure_browser()
+        context = None
+
+        try:
+            context = await browser.new_context()
+            cookies = self._load_cookies()
+            if cookies:
+                await context.add_cookies(cookies)
+
+            page = await context.new_page()
+            await page.goto(CLAUDE_URL, timeout=15000)
+            await page.wait_for_selector(INPUT_READY_SELECTOR, timeout=10000)
+        except Exception as e:
+            await self._close_context(context)
+            raise BrowserPoolError(f"Could not open an authenticated claude.ai page: {e}")
+        except BaseException:
+            # Cancelled while opening: don't leak the context
+            await self._close_context(context)
+            raise
+
+        self.stats_counters["created"] += 1
+        return PooledPage(context, page)
+
+    async def _is_healthy(self, slot: PooledPage) -> bool:
+        """Cheap liveness probe run before handing a page out"""
+        if slot.broken or slot.page.is_closed():
+            return False
+        if not (self._browser and self._browser.is_connected()):
+            return False
+        try:
+            await asyncio.wait_for(slot.page.evaluate("1"), timeout=2)
+            return True
+        except Exception:
+            return False
+
+    async def _close_context(self, context: Optional["BrowserContext"]):
+        if context is None:
+            return
+        try:
+            await context.close()
+        except Exception as e:
+            logger.debug(f"Error closing pooled context: {e}")
+
+    async def _discard(self, slot: Optional[PooledPage]):
+        if slot is not None:
+            await self._close_context(slot.context)
+
+    async def _reset_and_return(self, slot: PooledPage):
+        """Open a fresh conversation in the background, then make the page idle again"""
+        try:
+            await slot.page.goto(CLAUDE_NEW_CHAT_URL, timeout=15000)
+            await slot.page.wait_for_selector(INPUT_READY_SELECTOR, timeout=10000)
+        except Exception as e:
+            logger.debug(f"Pooled page reset failed, recycling: {e}")
+            await self._discard(slot)
+            self.stats_counters["recycled"] += 1
+            slot = None
+        self._ensure_queue().put_nowait(slot)
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _acquire(self) -> PooledPage:
+        queue = self._ensure_queue()
+        try:
+            slot = await asyncio.wait_for(queue.get(), timeout=self.lease_timeout)
+        except asyncio.TimeoutError:
+            raise BrowserPoolError(f"No claude.ai page available after {self.lease_timeout}s")
+
+        try:
+            if slot is not None and not await self._is_healthy(slot):
+                logger.info("Pooled page failed health check - recycling")
+                await self._discard(slot)
+                self.stats_counters["recycled"] += 1
+                slot = None
+
+            if slot is None:
+                slot = await self._create_slot()
+        except BaseException:
+            # Give the slot back (empty) so the pool never shrinks
+            queue.put_nowait(None)
+            raise
+
+        return slot
+
+    def _release(self, slot: PooledPage):
+        slot.uses += 1
+        queue = self._ensure_queue()
+
+        if self._closed:
+            self._spawn(self._discard(slot))
+        elif slot.broken or slot.uses >= self.max_uses:
+            self.stats_counters["recycled"] += 1
+            self._spawn(self._discard(slot))
+            queue.put_nowait(None)
+        else:
+            self._spawn(self._reset_and_return(slot))
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator["Page"]:
+        """Lease a warm claude.ai page for the duration of one prompt"""
+        if self._closed:
+            raise BrowserPoolError("Browser pool is closed")
+
+        slot = await self._acquire()
+        self.stats_counters["leases"] += 1
+        try:
+            yield slot.page
+        except BaseException:
+            slot.broken = True
+            raise
+        finally:
+            self._release(slot)
+
+    async def warmup(self) -> int:
+        """Pre-create every slot so the first requests skip browser startup"""
+        queue = self._ensure_queue()
+        pending = deque()
+        while not queue.empty():
+            pending.append(queue.get_nowait())
+
+        warmed = 0
+        try:
+            while pending:
+                if pending[0] is None:
+                    try:
+                        pending[0] = await self._create_slot()
+                    except Exception as e:
+                        # The remaining slots stay empty, they will be created on demand
+                        logger.warning(f"Browser pool warmup failed: {e}")
+                        return warmed
+                queue.put_nowait(pending.popleft())
+                warmed += 1
+        finally:
+            # Also on cancellation (readiness timeout): the pool never shrinks
+            while pending:
+                queue.put_nowait(pending.popleft())
+        return warmed
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool occupancy and lifecycle counters"""
+        idle = self._idle.qsize() if self._idle else self.size
+        return {
+            "size": self.size,
+            "idle": idle,
+            "in_use": self.size - idle,
+            "max_uses": self.max_uses,
+            "browser_connected": bool(self._browser and self._browser.is_connected()),
+            **self.stats_counters
+        }
+
+    async def close(self):
+        """Close every pooled page and the shared browser"""
+        self._closed = True
+        if self._idle:
+            while not self._idle.empty():
+                await self._discard(self._idle.get_nowait())
+        for task in list(self._background):
+            task.cancel()
+        if self._browser:
+            try:
+                await self._browser.close()
+            except Exception as e:
+                logger.debug(f"Error closing pooled browser: {e}")
+            self._browser = None
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+
+
+browser_pool: Optional[BrowserPool] = None
+
+
+def get_browser_pool() -> BrowserPool:
+    """Get the process-wide browser pool"""
+    global browser_pool
+    if browser_pool is None:
+        browser_pool = BrowserPool()
+    return browser_pool
+
+
+async def close_browser_pool():
+    """Close the process-wide browser pool"""
+    global browser_pool
+    if browser_pool is not None:
+        await browser_pool.close()
+        browser_pool = None
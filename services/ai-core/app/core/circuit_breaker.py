@@ -0,0 +1,153 @@
+"""
+NEXIA Circuit Breakers - Per-provider health tracking for the LLM fallback chain
+A provider whose recent error rate is too high is skipped immediately, then
+probed again with a single request once its cool-down is over.
+"""
+import logging
+import time
+from collections import deque
+from typing import Dict, Any, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker over a rolling time window"""
+
+    def __init__(
+        self,
+        name: str,
+        window_seconds: float = None,
+        min_calls: int = None,
+        error_threshold: float = None,
+        open_seconds: float = None,
+        slow_call_seconds: float = None
+    ):
+        self.name = name
+        self.window_seconds = window_seconds or settings.nexia_breaker_window_seconds
+        self.min_calls = min_calls or settings.nexia_breaker_min_calls
+        self.error_threshold = error_threshold or settings.nexia_breaker_error_threshold
+        self.open_seconds = open_seconds or settings.nexia_breaker_open_seconds
+        self.slow_call_seconds = slow_call_seconds or settings.nexia_breaker_slow_call_seconds
+
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        # (timestamp, ok, latency_seconds)
+        self.outcomes = deque()
+        self.counters = {"successes": 0, "failures": 0, "rejected": 0, "opened": 0}
+
+    def _prune(self, now: float):
+        while self.outcomes and now - self.outcomes[0][0] > self.window_seconds:
+            self.outcomes.popleft()
+
+    def is_available(self) -> bool:
+        """Whether a call would currently be let through (no side effects)"""
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN:
+            return not self.probe_in_flight
+        return time.monotonic() - self.opened_at >= self.open_seconds
+
+    def allow_request(self) -> bool:
+        """Reserve a call slot; in half-open state only one probe runs at a time"""
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.open_seconds:
+            self.state = HALF_OPEN
+            self.probe_in_flight = False
+            logger.info(f"Circuit {self.name} half-open, probing")
+
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN and not self.probe_in_flight:
+            self.probe_in_flight = True
+            return True
+
+        self.counters["rejected"] += 1
+        return False
+
+    def release(self):
+        """Give back a reserved slot without an outcome (e.g. a cancelled hedge loser)"""
+        self.probe_in_flight = False
+
+    def record_success(self, latency: float):
+        if latency > self.slow_call_seconds:
+            self.record_failure(latency)
+            return
+        now = time.monotonic()
+        self.counters["successes"] += 1
+        self.outcomes.append((now, True, latency))
+        self._prune(now)
+        if self.state == HALF_OPEN:
+            logger.info(f"Circuit {self.name} closed after successful probe")
+            self.state = CLOSED
+            self.outcomes.clear()
+        self.probe_in_flight = False
+
+    def record_failure(self, latency: float):
+        now = time.monotonic()
+        self.counters["failures"] += 1
+        self.outcomes.append((now, False, latency))
+        self._prune(now)
+        self.probe_in_flight = False
+
+        if self.state == HALF_OPEN:
+            self._open(now)
+        elif self.state == CLOSED and len(self.outcomes) >= self.min_calls:
+            if self.error_rate() >= self.error_threshold:
+                self._open(now)
+
+    def _open(self, now: float):
+        logger.warning(f"Circuit {self.name} opened (error rate {self.error_rate():.0%})")
+        self.state = OPEN
+        self.opened_at = now
+        self.counters["opened"] += 1
+
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return sum(1 for _, ok, _ in self.outcomes if not ok) / len(self.outcomes)
+
+    def health_score(self) -> float:
+        """1.0 = healthy; lowered by errors and by latency close to the slow-call limit"""
+        if self.state == OPEN:
+            return 0.0
+        if not self.outcomes:
+            return 1.0
+        mean_latency = sum(latency for _, _, latency in self.outcomes) / len(self.outcomes)
+        latency_penalty = min(mean_latency / self.slow_call_seconds, 1.0) * 0.5
+        return round(max(0.0, (1.0 - self.error_rate()) * (1.0 - latency_penalty)), 3)
+
+    def snapshot(self) -> Dict[str, Any]:
+        self._prune(time.monotonic())
+        retry_in = None
+        if self.state == OPEN:
+            retry_in = round(max(0.0, self.open_seconds - (time.monotonic() - self.opened_at)), 1)
+        return {
+            "state": self.state,
+            "health_score": self.health_score(),
+            "error_rate": round(self.error_rate(), 3),
+            "calls_in_window": len(self.outcomes),
+            "retry_in_seconds": retry_in,
+            **self.counters
+        }
+
+
+class ProviderHealthRegistry:
+    """One circuit breaker per provider name"""
+
+    def __init__(self):
+        self.breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, provider: str) -> CircuitBreaker:
+        if provider not in self.breakers:
+            self.breakers[provider] = CircuitBreaker(provider)
+        return self.breakers[provider]
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {name: breaker.snapshot() for name, breaker in self.breakers.items()}
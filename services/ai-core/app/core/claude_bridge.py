@@ -9,25 +9,59 @@ import os
 import sqlite3
 import glob
 from pathlib import Path
-from typing import Optional
-from playwright.async_api import async_playwright, Browser, Page
+from typing import TYPE_CHECKING, AsyncIterator, Optional
+
+from app.core.browser_pool import BrowserPool, get_browser_pool
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.completion_detector import CompletionDetector, CompletionResult, TailOutcome, completion_detector
+from app.models.conversation import LLMResponse
+
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, Page
 
 logger = logging.getLogger(__name__)
 
+INPUT_SELECTORS = [
+    'textarea[placeholder*="message" i]',
+    'textarea[placeholder*="Message" i]',
+    'div[contenteditable="true"]',
+    'textarea'
+]
+
+# Appended to answers cut off by the response timeout
+INCOMPLETE_NOTICE = "\n\n⚠️ Réponse incomplète (délai dépassé)."
+
+class ClaudeBridgeError(Exception):
+    """Raised in strict mode when Claude.ai could not answer"""
+
+
 class ClaudeBridge:
     """Bridge to Claude.ai web interface using browser automation"""
     
-    def __init__(self):
-        self.browser: Optional[Browser] = None
-        self.page: Optional[Page] = None
+    def __init__(
+        self,
+        pool: Optional[BrowserPool] = None,
+        detector: Optional[CompletionDetector] = None,
+        breaker: Optional[CircuitBreaker] = None
+    ):
+        self.pool = pool or get_browser_pool()
+        self.breaker = breaker
+        self.detector = detector or completion_detector
+        self.browser: Optional["Browser"] = None
+        self.page: Optional["Page"] = None
         self.session_active = False
         self._setup_lock = asyncio.Lock()
         self.cookies_file = Path.home() / ".nexia" / "claude_cookies.json"
         self.cookies_file.parent.mkdir(parents=True, exist_ok=True)
         self._existing_session_checked = False
     
-    async def ask_claude(self, question: str) -> str:
-        """Send question to Claude.ai and get response"""
+    async def ask_claude(self, question: str, strict: bool = False) -> LLMResponse:
+        """Send question to Claude.ai and get response
+        
+        With strict=True, a failed direct connection raises ClaudeBridgeError
+        instead of answering with the Safari/authentication instructions, so
+        the caller can fall back to another provider.
+        """
         try:
             # Strategy: Try transparent connection, fallback gracefully
             
@@ -38,15 +72,22 @@ class ClaudeBridge:
                     return response
             except Exception as e:
                 logger.debug(f"Direct connection failed: {e}")
+                if strict:
+                    raise ClaudeBridgeError(f"Direct connection failed: {e}") from e
+            
+            if strict:
+                raise ClaudeBridgeError("Claude.ai answer could not be extracted")
             
             # 2. Try Safari instruction mode (most user-friendly)
             return await self._ask_claude_safari(question)
                 
+        except ClaudeBridgeError:
+            raise
         except Exception as e:
             logger.error(f"Claude Bridge error: {e}")
             # Handle authentication gracefully
             if not self.session_active and not await self._setup_browser():
-                return f"""🤖 **NEXIA Claude Bridge**
+                return LLMResponse(f"""🤖 **NEXIA Claude Bridge**
 
 ⚠️ **Authentification requise pour la première utilisation**
 
@@ -57,89 +98,96 @@ class ClaudeBridge:
 
 **Status** : En attente d'authentification...
 
-*Note: Cette étape n'est nécessaire qu'une seule fois. NEXIA mémorisera votre session.*"""
+*Note: Cette étape n'est nécessaire qu'une seule fois. NEXIA mémorisera votre session.*""", "fallback")
             
-            return f"Error communicating with Claude.ai: {str(e)}"
+            return LLMResponse(f"Error communicating with Claude.ai: {str(e)}", "fallback")
     
-    async def _ask_claude_direct(self, question: str) -> str:
-        """Try direct connection to Claude.ai (assumes existing session)"""
+    async def _ask_claude_direct(self, question: str) -> LLMResponse:
+        """Ask Claude.ai through a warm page leased from the browser pool"""
         try:
-            playwright = await async_playwright().start()
-            
-            browser = await playwright.chromium.launch(
-                headless=True,
-                args=[
-                    '--no-sandbox', 
-                    '--disable-setuid-sandbox',
-                    '--disable-blink-features=AutomationControlled'
-                ]
-            )
-            
-            page = await browser.new_page()
-            
-            # Navigate to Claude.ai 
-            await page.goto('https://claude.ai', timeout=10000)
-            await page.wait_for_load_state('networkidle', timeout=5000)
-            
-            # Quick check if logged in (look for message input)
-            try:
-                await page.wait_for_selector('textarea, div[contenteditable="true"]', timeout=3000)
+            async with self.pool.lease() as page:
+                input_element = await self._find_input(page)
+                if not input_element:
+                    raise Exception("Message input not found")
                 
-                # Find and use message input
-                selectors = [
-                    'textarea[placeholder*="message" i]',
-                    'div[contenteditable="true"]',
-                    'textarea'
-                ]
+                baseline = await self.detector.snapshot(page)
                 
-                input_element = None
-                for selector in selectors:
-                    try:
-                        input_element = await page.query_selector(selector)
-                        if input_element:
-                            break
-                    except:
-                        continue
+                # Send message
+                await input_element.click()
+                await input_element.fill(question)
+                await input_element.press('Enter')
                 
-                if input_element:
-                    # Send message
-                    await input_element.click()
-                    await input_element.type(question)
-                    await input_element.press('Enter')
-                    
-                    # Wait for response
-                    await asyncio.sleep(4)
-                    
-                    # Get page content and look for response
-                    content = await page.evaluate('document.body.innerText')
-                    
-                    await browser.close()
-                    
-                    # Look for Claude's response in content
-                    lines = content.split('\n')
-                    for i, line in enumerate(lines):
-                        # Find our question
-                        if question[:15].lower() in line.lower():
-                            # Look for response in following lines
-                            for j in range(i + 1, min(i + 8, len(lines))):
-                                if lines[j].strip() and len(lines[j].strip()) > 15:
-                                    return f"🤖 **Claude (session transparente):** {lines[j].strip()}"
-                    
-                    # If we can't extract response, indicate success
-                    return f"🤖 **Message envoyé à Claude.ai**\n\n**Votre question :** {question}\n\n✅ **Session transparente active** - Vérifiez votre onglet Claude.ai pour la réponse complète."
-                else:
-                    await browser.close()
-                    raise Exception("Message input not found")
-                    
-            except Exception as e:
-                await browser.close()
-                raise Exception(f"Session check failed: {e}")
+                # Wait until the answer stops changing
+                completion = await self.detector.wait_for_completion(page, baseline)
+                if completion.text:
+                    return self._completion_answer("🤖 **Claude (session transparente):** ", completion)
+                
+                # Get page content and look for response
+                content = await page.evaluate('document.body.innerText')
+            
+            # Look for Claude's response in content
+            lines = content.split('\n')
+            for i, line in enumerate(lines):
+                # Find our question
+                if question[:15].lower() in line.lower():
+                    # Look for response in following lines
+                    for j in range(i + 1, min(i + 8, len(lines))):
+                        if lines[j].strip() and len(lines[j].strip()) > 15:
+                            return LLMResponse(f"🤖 **Claude (session transparente):** {lines[j].strip()}", "claude_bridge")
+            
+            # If we can't extract response, indicate success
+            return LLMResponse(
+                f"🤖 **Message envoyé à Claude.ai**\n\n**Votre question :** {question}\n\n✅ **Session transparente active** - Vérifiez votre onglet Claude.ai pour la réponse complète.",
+                "fallback"
+            )
                 
         except Exception as e:
             logger.debug(f"Direct connection failed: {e}")
             raise e
     
-    async def _ask_claude_playwright(self, question: str) -> str:
+    async def stream_claude(self, question: str, outcome: Optional[TailOutcome] = None) -> AsyncIterator[str]:
+        """Send question to Claude.ai and yield the answer as it is rendered
+        
+        The full final text and whether it completed end up in outcome.
+        """
+        async with self.pool.lease() as page:
+            input_element = await self._find_input(page)
+            if not input_element:
+                raise Exception("Message input not found")
+            
+            baseline = await self.detector.snapshot(page)
+            
+            await input_element.click()
+            await input_element.fill(question)
+            await input_element.press('Enter')
+            
+            # Tail the DOM while the assistant message grows
+            async for chunk in self.detector.tail(page, baseline, outcome=outcome):
+                yield chunk
+    
+    def _completion_answer(self, prefix: str, completion: CompletionResult) -> LLMResponse:
+        """Format a detected answer
+        
+        A partial one (response timeout) is labelled and tagged as a fallback,
+        so it is neither cached nor recorded in the conversation history.
+        """
+        answer = f"{prefix}{completion.text}"
+        if completion.completed:
+            return LLMResponse(answer, "claude_bridge")
+        return LLMResponse(f"{answer}{INCOMPLETE_NOTICE}", "fallback")
+    
+    async def _find_input(self, page: "Page"):
+        """Find the Claude.ai message input on a page"""
+        for selector in INPUT_SELECTORS:
+            try:
+                input_element = await page.query_selector(selector)
+                if input_element:
+                    return input_element
+            except:
+                continue
+        return None
+    
+    async def _ask_claude_playwright(self, question: str) -> LLMResponse:
         """Send question via Playwright"""
         # Find message input
         await self.page.wait_for_selector('textarea, div[contenteditable="true"]', timeout=10000)
@@ -162,7 +210,9 @@ class ClaudeBridge:
                 continue
         
         if not input_element:
-            return "Error: Could not find message input on Claude.ai"
+            return LLMResponse("Error: Could not find message input on Claude.ai", "fallback")
+        
+        baseline = await self.detector.snapshot(self.page)
         
         # Clear and type message
         await input_element.click()
@@ -192,18 +242,15 @@ class ClaudeBridge:
         else:
             await send_button.click()
         
-        # Wait for response
-        await asyncio.sleep(3)  # Initial wait
-        
-        # Get the response
-        response_text = await self._get_latest_response()
+        # Get the response once it has stabilized
+        response_text = await self._get_latest_response(baseline)
         
         if response_text:
-            return f"🤖 Claude (via NEXIA Bridge): {response_text}"
+            return LLMResponse(f"🤖 Claude (via NEXIA Bridge): {response_text}", response_text.provider)
         else:
-            return "🤖 Claude response received but could not extract text. Check Claude.ai tab."
+            return LLMResponse("🤖 Claude response received but could not extract text. Check Claude.ai tab.", "fallback")
     
-    async def _ask_claude_safari(self, question: str) -> str:
+    async def _ask_claude_safari(self, question: str) -> LLMResponse:
         """Send question via Safari AppleScript (simplified)"""
         import subprocess
         
@@ -227,7 +274,7 @@ class ClaudeBridge:
         except:
             pass
         
-        return f"""🤖 **NEXIA Bridge via Safari** 
+        return LLMResponse(f"""🤖 **NEXIA Bridge via Safari** 
 
 ✅ **Claude.ai ouvert dans Safari** avec ton abonnement Max !
 
@@ -240,12 +287,13 @@ class ClaudeBridge:
 
 **Future :** L'automation complète sera disponible quand les browsers Playwright seront installés.
 
-**Status :** Tu utilises maintenant Claude Max gratuitement via NEXIA ! 🎉"""
+**Status :** Tu utilises maintenant Claude Max gratuitement via NEXIA ! 🎉""", "fallback")
     
-    async def _ask_claude_existing_session(self, question: str) -> str:
+    async def _ask_claude_existing_session(self, question: str) -> LLMResponse:
         """Use existing detected Claude.ai session"""
         try:
             # Create a new browser instance with existing cookies
+            from playwright.async_api import async_playwright
             playwright = await async_playwright().start()
             
             browser = await playwright.chromium.launch(
@@ -294,14 +342,19 @@ class ClaudeBridge:
                         continue
                 
                 if input_element:
+                    baseline = await self.detector.snapshot(page)
+                    
                     # Send the message
                     await input_element.click()
                     await input_element.clear()
                     await input_element.type(question)
                     await input_element.press('Enter')
                     
-                    # Wait for response
-                    await asyncio.sleep(3)
+                    # Wait until the answer stops changing
+                    completion = await self.detector.wait_for_completion(page, baseline)
+                    if completion.text:
+                        await browser.close()
+                        return self._completion_answer("🤖 **Claude (via session existante):** ", completion)
                     
                     # Get response
                     page_content = await page.evaluate('document.body.innerText')
@@ -314,21 +367,21 @@ class ClaudeBridge:
                             for j in range(i + 1, min(i + 10, len(lines))):
                                 if lines[j].strip() and len(lines[j].strip()) > 20:
                                     await browser.close()
-                                    return f"🤖 **Claude (via session existante):** {lines[j].strip()}"
+                                    return LLMResponse(f"🤖 **Claude (via session existante):** {lines[j].strip()}", "claude_bridge")
                     
                     await browser.close()
-                    return f"✅ **Message envoyé à Claude.ai** \n\n**Votre question :** {question}\n\n**Status :** Utilisation de votre session existante ! Vérifiez claude.ai pour la réponse."
+                    return LLMResponse(f"✅ **Message envoyé à Claude.ai** \n\n**Votre question :** {question}\n\n**Status :** Utilisation de votre session existante ! Vérifiez claude.ai pour la réponse.", "fallback")
                 else:
                     await browser.close()
-                    return "⚠️ **Session détectée mais interface non accessible** - Veuillez vous reconnecter à claude.ai"
+                    return LLMResponse("⚠️ **Session détectée mais interface non accessible** - Veuillez vous reconnecter à claude.ai", "fallback")
                     
             except Exception as e:
                 await browser.close()
-                return f"✅ **Session Claude.ai détectée**\n\n**Votre question :** {question}\n\n**Status :** Cookies trouvés ! Ouvrez claude.ai pour voir votre conversation."
+                return LLMResponse(f"✅ **Session Claude.ai détectée**\n\n**Votre question :** {question}\n\n**Status :** Cookies trouvés ! Ouvrez claude.ai pour voir votre conversation.", "fallback")
             
         except Exception as e:
             logger.error(f"Error using existing session: {e}")
-            return f"⚠️ **Erreur session existante** - Retour au mode Safari: {str(e)}"
+            return LLMResponse(f"⚠️ **Erreur session existante** - Retour au mode Safari: {str(e)}", "fallback")
     
     async def _detect_existing_session(self) -> bool:
         """Try to detect existing Claude.ai session from browser cookies"""
@@ -415,6 +468,7 @@ class ClaudeBridge:
             try:
                 # Try Safari AppleScript fallback if Playwright fails
                 try:
+                    from playwright.async_api import async_playwright
                     playwright = await async_playwright().start()
                     
                     self.browser = await playwright.chromium.launch(
@@ -509,11 +563,13 @@ class ClaudeBridge:
             logger.error(f"Safari fallback error: {e}")
             return False
     
-    async def _get_latest_response(self) -> str:
-        """Extract the latest response from Claude"""
+    async def _get_latest_response(self, baseline: dict = None) -> LLMResponse:
+        """Extract the latest response from Claude (empty when nothing was found)"""
         try:
-            # Wait for response to appear
-            await asyncio.sleep(2)
+            # Wait for the response to appear and stop streaming
+            completion = await self.detector.wait_for_completion(self.page, baseline)
+            if completion.text:
+                return self._completion_answer("", completion)
             
             # Try different selectors for Claude responses
             response_selectors = [
@@ -532,7 +588,7 @@ class ClaudeBridge:
                         last_element = elements[-1]
                         text = await last_element.inner_text()
                         if text and len(text.strip()) > 0:
-                            return text.strip()
+                            return LLMResponse(text.strip(), "claude_bridge")
                 except:
                     continue
             
@@ -543,13 +599,13 @@ class ClaudeBridge:
             # Look for lines that might be Claude's response
             for line in reversed(lines):
                 if line.strip() and len(line.strip()) > 10:
-                    return line.strip()
+                    return LLMResponse(line.strip(), "claude_bridge")
             
-            return ""
+            return LLMResponse("", "fallback")
             
         except Exception as e:
             logger.error(f"Error extracting Claude response: {e}")
-            return ""
+            return LLMResponse("", "fallback")
     
     async def _save_cookies(self):
         """Save cookies for future sessions"""
@@ -564,11 +620,11 @@ class ClaudeBridge:
     
     def is_connected(self) -> bool:
         """Check if connected to Claude.ai"""
-        # Simple check: if we have saved cookies from previous successful connection
-        has_cookies = self.cookies_file.exists()
-        
-        # Always assume connection is possible (we'll try during actual use)
+        # Assume connection is possible (we'll try during actual use) unless
+        # recent attempts have been failing and the circuit is open.
         # This allows the AI Engine to attempt Claude Bridge first
+        if self.breaker is not None:
+            return self.breaker.is_available()
         return True
     
     async def close(self):
@@ -0,0 +1,112 @@
+"""
+Request coalescing for NexiaEngine
+- SingleFlight: concurrent identical requests share one in-flight computation
+- MicroBatcher: independent API LLM calls arriving within a short window are
+  sent together through one llm.agenerate([...]) call
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Deduplicate concurrent calls that share the same key"""
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.counters = {"calls": 0, "coalesced": 0}
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Run factory() once per key; returns (result, shared)
+
+        The work runs in its own task so a caller that disconnects does not
+        cancel it for the others still waiting on the same key.
+        """
+        self.counters["calls"] += 1
+        task = self._inflight.get(key)
+        shared = task is not None
+
+        if shared:
+            self.counters["coalesced"] += 1
+        else:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        return await asyncio.shield(task), shared
+
+    def stats(self) -> Dict[str, Any]:
+        return {"in_flight": len(self._inflight), **self.counters}
+
+
+class MicroBatcher:
+    """Group LLM generations issued within window_ms into a single agenerate"""
+
+    def __init__(self, llm, window_ms: int = None, max_size: int = None):
+        self.llm = llm
+        self.window = (window_ms or settings.nexia_llm_batch_window_ms) / 1000
+        self.max_size = max_size or settings.nexia_llm_batch_max_size
+        self._pending: List[Tuple[list, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle = None
+        # Strong references: the loop only keeps weak ones to running tasks
+        self._running: set = set()
+        self.counters = {"requests": 0, "batches": 0, "largest_batch": 0}
+
+    async def generate(self, messages: list) -> str:
+        """Queue one conversation and wait for its generation"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((messages, future))
+        self.counters["requests"] += 1
+
+        if len(self._pending) >= self.max_size:
+            self._flush_now()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush_now)
+
+        return await future
+
+    def _flush_now(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        # Callers that gave up (cancelled) are dropped from the batch
+        batch = [(messages, future) for messages, future in batch if not future.done()]
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: List[Tuple[list, asyncio.Future]]):
+        self.counters["batches"] += 1
+        self.counters["largest_batch"] = max(self.counters["largest_batch"], len(batch))
+        try:
+            result = await self.llm.agenerate([messages for messages, _ in batch])
+        except Exception as e:
+            logger.error(f"Batched LLM call failed ({len(batch)} requests): {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        except BaseException:
+            # Cancelled (shutdown): don't leave the callers waiting forever
+            for _, future in batch:
+                future.cancel()
+            raise
+
+        for (_, future), generations in zip(batch, result.generations):
+            if not future.done():
+                future.set_result(generations[0].text)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "window_ms": int(self.window * 1000),
+            "max_size": self.max_size,
+            "pending": len(self._pending),
+            **self.counters
+        }
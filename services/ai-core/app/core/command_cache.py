@@ -0,0 +1,99 @@
+"""
+TTL cache for read-only MCP shell commands
+Results of idempotent commands are reused until their TTL expires or a file
+they depend on changes; concurrent identical commands share one execution.
+"""
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from app.config import settings
+from app.core.coalescing import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Read-only, idempotent commands and how long their output stays valid (seconds)
+READ_ONLY_COMMANDS: Dict[str, float] = {
+    "uname": 3600,
+    "whoami": 3600,
+    "which": 300,
+    "df": 30,
+    "free": 5,
+    "ls": 5,
+    "tree": 5,
+    "cat": 10,
+    "head": 10
+}
+
+
+def _stamp(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def command_key(command: str, args: List[str], cwd: str) -> Hashable:
+    """Command, arguments, cwd, plus mtime/size of the cwd and of path arguments
+
+    Editing a file passed to cat/head, or adding an entry to a listed
+    directory, changes the key, so the stale result is simply not found.
+    """
+    paths = [os.path.join(cwd, arg) for arg in args if not arg.startswith("-")]
+    return (
+        command,
+        tuple(args),
+        cwd,
+        _stamp(cwd),
+        tuple(_stamp(path) for path in paths)
+    )
+
+
+class CommandCache:
+    """LRU of command results with per-command TTLs"""
+
+    def __init__(self, max_entries: int = None, ttls: Dict[str, float] = None):
+        self.max_entries = max_entries or settings.nexia_shell_cache_max_entries
+        self.ttls = ttls if ttls is not None else READ_ONLY_COMMANDS
+        # key -> (expires_at, result), least recently used first
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.inflight = SingleFlight()
+        self.counters = {"hits": 0, "misses": 0, "stores": 0}
+
+    def cacheable(self, command: str) -> bool:
+        return settings.nexia_shell_cache_enabled and command in self.ttls
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, result = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.counters["hits"] += 1
+                return result
+            del self._entries[key]
+        self.counters["misses"] += 1
+        return None
+
+    def set(self, key: Hashable, command: str, result: Any):
+        self._entries[key] = (time.monotonic() + self.ttls[command], result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self.counters["stores"] += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.counters["hits"] + self.counters["misses"]
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hit_rate": round(self.counters["hits"] / lookups, 3) if lookups else None,
+            "coalesced": self.inflight.counters["coalesced"],
+            **self.counters
+        }
@@ -0,0 +1,277 @@
+"""
+NEXIA Completion Detector - Event-driven end-of-answer detection for Claude.ai
+Watches the DOM with a MutationObserver and returns as soon as the assistant
+message stops changing, instead of sleeping a fixed amount of time.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Any, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+ASSISTANT_MESSAGE_SELECTORS = [
+    '[data-is-streaming]',
+    '.font-claude-message',
+    '[data-testid="message"]',
+    '.message',
+    '[role="message"]',
+    'article'
+]
+
+STREAMING_SELECTORS = [
+    '[data-is-streaming="true"]',
+    'button[aria-label*="Stop" i]'
+]
+
+# Counts the assistant messages currently on the page
+_SNAPSHOT_JS = """
+(selectors) => {
+    for (const selector of selectors) {
+        const nodes = document.querySelectorAll(selector);
+        if (nodes.length) return {selector, count: nodes.length};
+    }
+    return {selector: null, count: 0};
+}
+"""
+
+# Resolves once a new assistant message exists, no streaming indicator is
+# shown and the DOM has been quiet for stableMs, or when timeoutMs is reached.
+_WAIT_JS = """
+({selectors, streamingSelectors, baseline, stableMs, timeoutMs}) => new Promise((resolve) => {
+    const started = performance.now();
+    let lastMutation = started;
+    let firstText = null;
+
+    const latest = () => {
+        for (const selector of selectors) {
+            const nodes = document.querySelectorAll(selector);
+            if (nodes.length > (selector === baseline.selector ? baseline.count : 0)) {
+                return nodes[nodes.length - 1].innerText || '';
+            }
+        }
+        return null;
+    };
+    const streaming = () => streamingSelectors.some((s) => document.querySelector(s));
+
+    const observer = new MutationObserver(() => { lastMutation = performance.now(); });
+    observer.observe(document.body, {childList: true, subtree: true, characterData: true});
+
+    const finish = (reason) => {
+        observer.disconnect();
+        clearInterval(timer);
+        resolve({text: latest(), reason, firstTextMs: firstText, elapsedMs: performance.now() - started});
+    };
+    const timer = setInterval(() => {
+        const now = performance.now();
+        const text = latest();
+        if (text && firstText === null) firstText = now - started;
+        if (text && !streaming() && now - lastMutation >= stableMs) return finish('stable');
+        if (now - started >= timeoutMs) return finish('timeout');
+    }, 50);
+})
+"""
+
+# Returns the newest assistant message text and whether it is still streaming
+_TAIL_JS = """
+({selectors, streamingSelectors, baseline}) => {
+    let text = null;
+    for (const selector of selectors) {
+        const nodes = document.querySelectorAll(selector);
+        if (nodes.length > (selector === baseline.selector ? baseline.count : 0)) {
+            text = nodes[nodes.length - 1].innerText || '';
+            break;
+        }
+    }
+    return {text, streaming: streamingSelectors.some((s) => document.querySelector(s))};
+}
+"""
+
+
+@dataclass
+class CompletionResult:
+    """Outcome of one completion detection"""
+    text: Optional[str]
+    reason: str
+    elapsed_ms: float
+    first_text_ms: Optional[float] = None
+
+    @property
+    def completed(self) -> bool:
+        return self.reason == "stable"
+
+
+@dataclass
+class TailOutcome:
+    """Filled in by CompletionDetector.tail; the yielded chunks are only deltas"""
+    text: Optional[str] = None  # full answer as last rendered
+    reason: str = "pending"
+    rewritten: bool = False
+
+    @property
+    def completed(self) -> bool:
+        return self.reason == "stable"
+
+
+class DetectionMetrics:
+    """Rolling statistics on how long completion detection takes"""
+
+    def __init__(self, window: int = 200):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    def record(self, result: CompletionResult):
+        self.count += 1
+        self.samples.append(result.elapsed_ms)
+        if result.reason == "timeout":
+            self.timeouts += 1
+
+    def record_error(self):
+        self.errors += 1
+
+    def _percentile(self, ordered: list, pct: float) -> float:
+        index = min(len(ordered) - 1, int(round(pct * (len(ordered) - 1))))
+        return ordered[index]
+
+    def snapshot(self) -> Dict[str, Any]:
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {"count": self.count, "timeouts": self.timeouts, "errors": self.errors}
+        return {
+            "count": self.count,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "p50_ms": round(self._percentile(ordered, 0.5), 1),
+            "p95_ms": round(self._percentile(ordered, 0.95), 1),
+            "max_ms": round(ordered[-1], 1)
+        }
+
+
+class CompletionDetector:
+    """Waits for the assistant's answer to stabilize on a claude.ai page"""
+
+    def __init__(self, stable_ms: int = None, timeout: float = None):
+        self.stable_ms = stable_ms or settings.claude_bridge_stable_ms
+        self.timeout = timeout or settings.claude_bridge_response_timeout
+        self.metrics = DetectionMetrics()
+
+    async def snapshot(self, page) -> Dict[str, Any]:
+        """Record how many assistant messages exist before sending a prompt"""
+        try:
+            return await page.evaluate(_SNAPSHOT_JS, ASSISTANT_MESSAGE_SELECTORS)
+        except Exception as e:
+            logger.debug(f"Could not snapshot messages: {e}")
+            return {"selector": None, "count": 0}
+
+    async def wait_for_completion(
+        self,
+        page,
+        baseline: Dict[str, Any] = None,
+        timeout: float = None
+    ) -> CompletionResult:
+        """Return once the newest assistant message is stable or the ceiling is hit"""
+        ceiling = timeout or self.timeout
+        started = time.monotonic()
+        args = {
+            "selectors": ASSISTANT_MESSAGE_SELECTORS,
+            "streamingSelectors": STREAMING_SELECTORS,
+            "baseline": baseline or {"selector": None, "count": 0},
+            "stableMs": self.stable_ms,
+            "timeoutMs": int(ceiling * 1000)
+        }
+
+        try:
+            raw = await asyncio.wait_for(page.evaluate(_WAIT_JS, args), timeout=ceiling + 5)
+        except Exception as e:
+            self.metrics.record_error()
+            logger.debug(f"Completion detection failed: {e}")
+            return CompletionResult(
+                text=None,
+                reason="error",
+                elapsed_ms=(time.monotonic() - started) * 1000
+            )
+
+        text = (raw.get("text") or "").strip() or None
+        result = CompletionResult(
+            text=text,
+            reason=raw.get("reason", "timeout"),
+            elapsed_ms=raw.get("elapsedMs", (time.monotonic() - started) * 1000),
+            first_text_ms=raw.get("firstTextMs")
+        )
+        self.metrics.record(result)
+        logger.debug(f"Completion detected ({result.reason}) in {result.elapsed_ms:.0f}ms")
+        return result
+
+    async def tail(
+        self,
+        page,
+        baseline: Dict[str, Any] = None,
+        timeout: float = None,
+        poll_interval: float = 0.1,
+        outcome: Optional[TailOutcome] = None
+    ) -> AsyncIterator[str]:
+        """Yield the newest assistant message as it grows, until it stabilizes
+        
+        Chunks are appended text only. When earlier text is rewritten the
+        joined chunks no longer match the page, so callers needing the answer
+        itself read it from outcome.text.
+        """
+        outcome = outcome if outcome is not None else TailOutcome()
+        ceiling = timeout or self.timeout
+        started = time.monotonic()
+        args = {
+            "selectors": ASSISTANT_MESSAGE_SELECTORS,
+            "streamingSelectors": STREAMING_SELECTORS,
+            "baseline": baseline or {"selector": None, "count": 0}
+        }
+        emitted = ""
+        first_text_ms = None
+        last_change = started
+        reason = "timeout"
+
+        while time.monotonic() - started < ceiling:
+            try:
+                state = await page.evaluate(_TAIL_JS, args)
+            except Exception as e:
+                self.metrics.record_error()
+                outcome.reason = "error"
+                logger.debug(f"Completion tailing failed: {e}")
+                raise
+
+            now = time.monotonic()
+            text = (state.get("text") or "").rstrip()
+            if text != emitted:
+                last_change = now
+                if first_text_ms is None and text:
+                    first_text_ms = (now - started) * 1000
+                delta = text[len(emitted):] if text.startswith(emitted) else None
+                emitted = outcome.text = text
+                if delta is not None:
+                    yield delta
+                else:
+                    # Markdown re-rendering rewrote earlier text
+                    outcome.rewritten = True
+                    logger.debug("Assistant message rewritten while streaming")
+            elif text and not state.get("streaming") and (now - last_change) * 1000 >= self.stable_ms:
+                reason = "stable"
+                break
+
+            await asyncio.sleep(poll_interval)
+
+        outcome.reason = reason
+        self.metrics.record(CompletionResult(
+            text=emitted or None,
+            reason=reason,
+            elapsed_ms=(time.monotonic() - started) * 1000,
+            first_text_ms=first_text_ms
+        ))
+
+
+# Instance globale
+completion_detector = CompletionDetector()
@@ -0,0 +1,109 @@
+"""
+Conversation history window for Nexia sessions
+Keeps the most recent turns within a token budget and folds older turns into
+a rolling summary, so multi-turn context stays bounded in size.
+"""
+import hashlib
+import re
+from typing import Dict, Any, List, Tuple
+
+from app.config import settings
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token)"""
+    return max(1, len(text) // 4) if text else 0
+
+
+def _clip(text: str, max_chars: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= max_chars else text[:max_chars].rstrip() + "…"
+
+
+def _first_sentence(text: str, max_chars: int) -> str:
+    text = " ".join(text.split())
+    return _clip(_SENTENCE_END.split(text, maxsplit=1)[0], max_chars)
+
+
+class ConversationHistory:
+    """Ring buffer of turns with a token budget and a rolling summary"""
+
+    def __init__(
+        self,
+        turns: List[Dict[str, str]] = None,
+        summary: str = "",
+        max_turns: int = None,
+        token_budget: int = None,
+        summary_budget: int = None
+    ):
+        self.turns = list(turns or [])
+        self.summary = summary
+        self.max_turns = max_turns or settings.nexia_history_max_turns
+        self.token_budget = token_budget or settings.nexia_history_token_budget
+        self.summary_budget = summary_budget or settings.nexia_history_summary_tokens
+
+    @classmethod
+    def from_context(cls, context: Dict[str, Any]) -> "ConversationHistory":
+        """Load the history stored in a session context"""
+        data = context.get("history") or {}
+        return cls(turns=data.get("turns"), summary=data.get("summary", ""))
+
+    def to_context(self, context: Dict[str, Any]):
+        """Store the history in a session context (JSON-serializable)"""
+        context["history"] = {"turns": self.turns, "summary": self.summary}
+
+    def _turn_tokens(self, turn: Dict[str, str]) -> int:
+        return estimate_tokens(turn["user"]) + estimate_tokens(turn["assistant"])
+
+    def tokens(self) -> int:
+        return estimate_tokens(self.summary) + sum(self._turn_tokens(turn) for turn in self.turns)
+
+    def append(self, user: str, assistant: str):
+        """Add a turn, folding the oldest turns into the summary on overflow"""
+        # A single turn may not take more than half of the budget:
+        # token_budget chars (~budget/4 tokens) per side
+        max_chars = self.token_budget
+        self.turns.append({"user": _clip(user, max_chars), "assistant": _clip(assistant, max_chars)})
+
+        evicted = []
+        while len(self.turns) > 1 and (
+            len(self.turns) > self.max_turns or self.tokens() > self.token_budget
+        ):
+            evicted.append(self.turns.pop(0))
+
+        if evicted:
+            self._summarize(evicted)
+
+    def _summarize(self, evicted: List[Dict[str, str]]):
+        """Incrementally extend the summary with the evicted turns"""
+        lines = self.summary.splitlines() if self.summary else []
+        for turn in evicted:
+            lines.append(
+                f"- {_first_sentence(turn['user'], 120)} → {_first_sentence(turn['assistant'], 160)}"
+            )
+
+        # Oldest summary lines go first once the summary outgrows its budget
+        while len(lines) > 1 and estimate_tokens("\n".join(lines)) > self.summary_budget:
+            lines.pop(0)
+        self.summary = "\n".join(lines)
+
+    def as_pairs(self) -> List[Tuple[str, str]]:
+        """(user, assistant) pairs in chronological order"""
+        return [(turn["user"], turn["assistant"]) for turn in self.turns]
+
+    def render(self) -> str:
+        """Plain-text transcript, for providers that only take a single prompt"""
+        parts = []
+        if self.summary:
+            parts.append(f"Résumé de la conversation :\n{self.summary}")
+        for user, assistant in self.as_pairs():
+            parts.append(f"Utilisateur : {user}\nNexia : {assistant}")
+        return "\n\n".join(parts)
+
+    def fingerprint(self) -> str:
+        """Short digest identifying this exact history (empty when there is none)"""
+        if not self.turns and not self.summary:
+            return ""
+        return hashlib.sha256(self.render().encode("utf-8")).hexdigest()[:16]
@@ -1,19 +1,80 @@
 """
 Database initialization and management
 """
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from collections import deque
+from typing import Dict, Any
+from urllib.parse import urlparse
 import logging
+import time
 
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Hosts of the local development setups, where the database is skipped
+LOCAL_DATABASE_HOSTS = ("localhost", "platform-pool")
+
+
+class PoolMetrics:
+    """Checkout wait times and timeouts of the connection pool"""
+    
+    def __init__(self, window: int = 1000):
+        self.waits = deque(maxlen=window)
+        self.counters = {"checkouts": 0, "timeouts": 0}
+    
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        self.waits.append(seconds)
+        self.counters["timeouts" if timed_out else "checkouts"] += 1
+    
+    def snapshot(self) -> Dict[str, Any]:
+        ordered = sorted(self.waits)
+        
+        def percentile(pct: float) -> float:
+            if not ordered:
+                return 0.0
+            return round(ordered[min(len(ordered) - 1, int(pct * len(ordered)))] * 1000, 2)
+        
+        return {
+            "wait_p50_ms": percentile(0.5),
+            "wait_p99_ms": percentile(0.99),
+            "wait_max_ms": round(ordered[-1] * 1000, 2) if ordered else 0.0,
+            **self.counters
+        }
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection"""
+    
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            pool_metrics.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        pool_metrics.record_wait(time.perf_counter() - started)
+        return connection
+
+
 # Create async engine
 engine = create_async_engine(
     settings.database_url.replace("postgresql://", "postgresql+asyncpg://"),
-    echo=settings.debug,
+    echo=settings.database_echo,
+    poolclass=InstrumentedPool,
+    pool_size=settings.database_pool_size,
+    max_overflow=settings.database_max_overflow,
+    pool_timeout=settings.database_pool_timeout,
+    pool_recycle=settings.database_pool_recycle,
+    pool_pre_ping=settings.database_pool_pre_ping,
+    connect_args={"statement_cache_size": settings.database_statement_cache_size},
     future=True
 )
 
@@ -28,17 +89,26 @@ AsyncSessionLocal = sessionmaker(
 Base = declarative_base()
 
 
+def database_enabled() -> bool:
+    """Whether a database connection is expected (skipped for local development)"""
+    # Match the hostname, so in-cluster hosts like platform-pool-postgres are not skipped
+    return urlparse(settings.database_url).hostname not in LOCAL_DATABASE_HOSTS
+
+
 async def init_db():
     """Initialize database"""
     try:
         # Pour le développement local, on skip la connexion DB
-        if "localhost" in settings.database_url or "platform-pool" in settings.database_url:
+        if not database_enabled():
             logger.info("Skipping database connection for local development")
             return
             
+        # Register the ORM models on Base.metadata
+        from app.models import idea  # noqa: F401
+        
         async with engine.begin() as conn:
             # Create tables if they don't exist
-            # await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(Base.metadata.create_all)
             logger.info("Database initialized successfully")
     except Exception as e:
         logger.error(f"Database initialization failed: {e}")
@@ -49,6 +119,28 @@ async def init_db():
             raise
 
 
+async def ping_db():
+    """Round-trip to the database, opening a pooled connection if needed"""
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Connection pool occupancy and checkout wait metrics"""
+    pool = engine.pool
+    return {
+        "enabled": database_enabled(),
+        "size": pool.size(),
+        "max_overflow": settings.database_max_overflow,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        # Negative until the base pool is full
+        "overflow": max(pool.overflow(), 0),
+        "timeout_seconds": settings.database_pool_timeout,
+        **pool_metrics.snapshot()
+    }
+
+
 async def get_db():
     """Get database session"""
     async with AsyncSessionLocal() as session:
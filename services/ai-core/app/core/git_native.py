@@ -0,0 +1,208 @@
+"""
+In-process git reads for MCPGitServer
+- Pure Python: HEAD, loose and packed refs, branch upstream from .git/config.
+  Enough for the branch name, and for ahead/behind when HEAD and its upstream
+  point at the same commit.
+- pygit2 (libgit2), optional: index/worktree status and ahead/behind without
+  starting a git process. Imported on first use only.
+- porcelain v2 parsing for the `git status` subprocess fallback.
+"""
+import configparser
+import importlib.util
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_pygit2_available: Optional[bool] = None
+
+
+def pygit2_available() -> bool:
+    global _pygit2_available
+    if _pygit2_available is None:
+        _pygit2_available = importlib.util.find_spec("pygit2") is not None
+    return _pygit2_available
+
+
+def find_git_dir(path: str) -> Optional[str]:
+    """The repository's git dir; follows `gitdir:` files (worktrees, submodules)"""
+    dot_git = os.path.join(path, ".git")
+    if os.path.isdir(dot_git):
+        return dot_git
+    if os.path.isfile(dot_git):
+        with open(dot_git, encoding="utf-8") as f:
+            content = f.read().strip()
+        if content.startswith("gitdir:"):
+            return os.path.normpath(os.path.join(path, content[len("gitdir:"):].strip()))
+    return None
+
+
+def _common_dir(git_dir: str) -> str:
+    """Worktrees keep HEAD locally but share refs and config with the main repository"""
+    try:
+        with open(os.path.join(git_dir, "commondir"), encoding="utf-8") as f:
+            return os.path.normpath(os.path.join(git_dir, f.read().strip()))
+    except FileNotFoundError:
+        return git_dir
+
+
+@dataclass
+class RefsSnapshot:
+    """Where HEAD and its upstream point"""
+    branch: str  # empty when HEAD is detached
+    head: Optional[str]  # None on an unborn branch
+    upstream: Optional[str]  # remote-tracking ref, e.g. refs/remotes/origin/main
+    upstream_head: Optional[str]
+
+
+class GitRefs:
+    """Reads refs straight from a git dir"""
+
+    def __init__(self, git_dir: str):
+        self.git_dir = git_dir
+        self.common_dir = _common_dir(git_dir)
+        self._packed: Optional[Dict[str, str]] = None
+
+    def _packed_refs(self) -> Dict[str, str]:
+        if self._packed is None:
+            self._packed = {}
+            try:
+                with open(os.path.join(self.common_dir, "packed-refs"), encoding="utf-8") as f:
+                    for line in f:
+                        if line.startswith(("#", "^")):
+                            continue
+                        sha, _, name = line.strip().partition(" ")
+                        if name:
+                            self._packed[name] = sha
+            except FileNotFoundError:
+                pass
+        return self._packed
+
+    def resolve(self, ref: str, depth: int = 0) -> Optional[str]:
+        """Commit id of a ref, following symbolic refs"""
+        if depth > 5:
+            return None
+        base = self.git_dir if ref == "HEAD" else self.common_dir
+        try:
+            with open(os.path.join(base, ref), encoding="utf-8") as f:
+                value = f.read().strip()
+        except (FileNotFoundError, NotADirectoryError, IsADirectoryError):
+            return self._packed_refs().get(ref)
+        if value.startswith("ref:"):
+            return self.resolve(value[4:].strip(), depth + 1)
+        return value or None
+
+    def head_ref(self) -> Optional[str]:
+        """Symbolic target of HEAD (refs/heads/...), None when detached"""
+        with open(os.path.join(self.git_dir, "HEAD"), encoding="utf-8") as f:
+            value = f.read().strip()
+        return value[4:].strip() if value.startswith("ref:") else None
+
+    def upstream_ref(self, branch: str) -> Optional[str]:
+        """Remote-tracking ref configured for a local branch"""
+        config = configparser.RawConfigParser(strict=False)
+        try:
+            config.read(os.path.join(self.common_dir, "config"), encoding="utf-8")
+        except configparser.Error:
+            return None
+        section = f'branch "{branch}"'
+        if not config.has_section(section):
+            return None
+        remote = config.get(section, "remote", fallback=None)
+        merge = config.get(section, "merge", fallback=None)
+        if not remote or not merge or not merge.startswith("refs/heads/"):
+            return None
+        if remote == ".":
+            return merge
+        return f"refs/remotes/{remote}/{merge[len('refs/heads/'):]}"
+
+    def snapshot(self) -> RefsSnapshot:
+        head_ref = self.head_ref()
+        branch = head_ref[len("refs/heads/"):] if head_ref and head_ref.startswith("refs/heads/") else ""
+        upstream = self.upstream_ref(branch) if branch else None
+        return RefsSnapshot(
+            branch=branch,
+            head=self.resolve("HEAD"),
+            upstream=upstream,
+            upstream_head=self.resolve(upstream) if upstream else None
+        )
+
+
+def parse_porcelain_v2(output: str) -> Dict[str, Any]:
+    """Parse `git status --porcelain=v2 -z [--branch]`"""
+    status: Dict[str, Any] = {
+        "branch": None,
+        "ahead": None,
+        "behind": None,
+        "staged_files": [],
+        "modified_files": [],
+        "untracked_files": []
+    }
+    entries = iter(output.split("\0"))
+    for entry in entries:
+        if not entry:
+            continue
+        kind = entry[0]
+        if kind == "#":
+            key, _, value = entry[2:].partition(" ")
+            if key == "branch.head":
+                status["branch"] = "" if value == "(detached)" else value
+            elif key == "branch.ab":
+                ahead, behind = value.split()
+                status["ahead"], status["behind"] = int(ahead), -int(behind)
+        elif kind in "12u":
+            # Ordinary, renamed/copied (followed by the original path) and unmerged entries
+            fields = entry.split(" ", {"1": 8, "2": 9, "u": 10}[kind])
+            xy, path = fields[1], fields[-1]
+            if kind == "2":
+                next(entries, None)
+            if kind == "u":
+                status["modified_files"].append(path)
+                continue
+            if xy[0] != ".":
+                status["staged_files"].append(path)
+            if xy[1] != ".":
+                status["modified_files"].append(path)
+        elif kind == "?":
+            status["untracked_files"].append(entry[2:])
+    return status
+
+
+def pygit2_files(path: str) -> Dict[str, List[str]]:
+    """Index and worktree status through libgit2 (blocking, run in a thread)"""
+    import pygit2
+
+    index_flags = (
+        pygit2.GIT_STATUS_INDEX_NEW | pygit2.GIT_STATUS_INDEX_MODIFIED | pygit2.GIT_STATUS_INDEX_DELETED
+        | pygit2.GIT_STATUS_INDEX_RENAMED | pygit2.GIT_STATUS_INDEX_TYPECHANGE
+    )
+    worktree_flags = (
+        pygit2.GIT_STATUS_WT_MODIFIED | pygit2.GIT_STATUS_WT_DELETED
+        | pygit2.GIT_STATUS_WT_RENAMED | pygit2.GIT_STATUS_WT_TYPECHANGE
+        | getattr(pygit2, "GIT_STATUS_CONFLICTED", 0)
+    )
+    files = {"staged_files": [], "modified_files": [], "untracked_files": []}
+    for name, flags in sorted(pygit2.Repository(path).status().items()):
+        if flags & pygit2.GIT_STATUS_IGNORED:
+            continue
+        if flags & pygit2.GIT_STATUS_WT_NEW:
+            files["untracked_files"].append(name)
+            continue
+        if flags & index_flags:
+            files["staged_files"].append(name)
+        if flags & worktree_flags:
+            files["modified_files"].append(name)
+    return files
+
+
+def pygit2_ahead_behind(path: str, refs: RefsSnapshot) -> Dict[str, int]:
+    """Commits ahead/behind the upstream through libgit2 (blocking, run in a thread)"""
+    if not refs.head or not refs.upstream_head or refs.head == refs.upstream_head:
+        return {"ahead": 0, "behind": 0}
+    import pygit2
+
+    repo = pygit2.Repository(path)
+    ahead, behind = repo.ahead_behind(pygit2.Oid(hex=refs.head), pygit2.Oid(hex=refs.upstream_head))
+    return {"ahead": ahead, "behind": behind}
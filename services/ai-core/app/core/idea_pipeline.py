@@ -0,0 +1,277 @@
+"""
+Background parking pipeline for ideas detected in chat turns
+The engine enqueues the idea and answers right away; workers compute tags and
+connections to the session's other ideas, then hand the idea to the
+write-behind buffer.
+"""
+import asyncio
+import logging
+import time
+from collections import Counter, OrderedDict, deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.config import settings
+from app.core.idea_search import tfidf_neighbours, top_terms
+from app.core.idea_store import IdeaRepository, IdeaWriteBehind, get_idea_repository, get_idea_write_behind
+from app.models.idea import Idea
+
+logger = logging.getLogger(__name__)
+
+def extract_tags(text: str, max_tags: int = 5) -> List[str]:
+    """Most frequent meaningful words of the idea, in order of first use"""
+    return top_terms([text], max_tags)
+
+
+class IdeaPipeline:
+    """Bounded queue of ideas to enrich and persist off the request path"""
+
+    def __init__(
+        self,
+        write_behind: Optional[IdeaWriteBehind] = None,
+        queue_size: int = None,
+        workers: int = None,
+        enqueue_timeout: float = None
+    ):
+        self.write_behind = write_behind
+        self.queue_size = queue_size or settings.nexia_idea_queue_size
+        self.worker_count = workers or settings.nexia_idea_workers
+        self.enqueue_timeout = enqueue_timeout if enqueue_timeout is not None else settings.nexia_idea_enqueue_timeout
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        # session_id -> recent (idea_id, tags), loaded from the repository on first use
+        self._recent: "OrderedDict[str, deque]" = OrderedDict()
+        self.max_sessions = 1000
+        # Ideas queued or being processed, for read-your-writes checks
+        self._pending_ids: set = set()
+        self._pending_sessions: Counter = Counter()
+        self.counters = {"enqueued": 0, "rejected": 0, "processed": 0, "failed": 0}
+
+    def _ensure_workers(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._workers = [task for task in self._workers if not task.done()]
+        while len(self._workers) < self.worker_count:
+            self._workers.append(asyncio.create_task(self._work()))
+
+    async def submit(self, idea: Idea) -> bool:
+        """Enqueue an idea; waits at most enqueue_timeout when the queue is full"""
+        self._ensure_workers()
+        try:
+            self._queue.put_nowait(idea)
+        except asyncio.QueueFull:
+            # Backpressure: the caller waits a little, then gives up
+            try:
+                await asyncio.wait_for(self._queue.put(idea), timeout=self.enqueue_timeout)
+            except asyncio.TimeoutError:
+                self.counters["rejected"] += 1
+                logger.warning(f"Idea pipeline full ({self.queue_size}), idea {idea.id} not parked")
+                return False
+        self._pending_ids.add(idea.id)
+        self._pending_sessions[idea.session_id] += 1
+        self.counters["enqueued"] += 1
+        return True
+
+    def has_pending(self, session_id: Optional[str] = None, idea_ids: Iterable[str] = ()) -> bool:
+        """Whether ideas of this session, or with these ids, are still on their way"""
+        return self._pending_sessions[session_id] > 0 or any(idea_id in self._pending_ids for idea_id in idea_ids)
+
+    async def _work(self):
+        while True:
+            idea = await self._queue.get()
+            try:
+                await self._process(idea)
+                self.counters["processed"] += 1
+            except Exception as e:
+                self.counters["failed"] += 1
+                logger.error(f"Idea pipeline failed for {idea.id}: {e}")
+            finally:
+                self._pending_ids.discard(idea.id)
+                self._pending_sessions[idea.session_id] -= 1
+                if not self._pending_sessions[idea.session_id]:
+                    del self._pending_sessions[idea.session_id]
+                self._queue.task_done()
+
+    async def _process(self, idea: Idea):
+        tags = extract_tags(idea.content)
+        idea.tags = list(dict.fromkeys(idea.tags + tags))
+        recent = await self._session_recent(idea.session_id)
+        idea.connections = self._connect(idea.tags, recent)
+        recent.appendleft((idea.id, set(idea.tags)))
+        (self.write_behind or get_idea_write_behind()).submit(idea)
+
+    async def _session_recent(self, session_id: str) -> deque:
+        recent = self._recent.get(session_id)
+        if recent is None:
+            recent = deque(maxlen=50)
+            try:
+                ideas, _ = await get_idea_repository().list_session(session_id, recent.maxlen)
+                recent.extend((other.id, set(other.tags)) for other in ideas)
+            except Exception as e:
+                logger.warning(f"Could not load ideas of session {session_id}: {e}")
+            self._recent[session_id] = recent
+            while len(self._recent) > self.max_sessions:
+                self._recent.popitem(last=False)
+        self._recent.move_to_end(session_id)
+        return recent
+
+    def _connect(self, tags: List[str], recent: deque, limit: int = 5) -> List[str]:
+        """Ids of the session's ideas sharing the most tags"""
+        tags = set(tags)
+        if not tags:
+            return []
+        scored: List[Tuple[float, str]] = []
+        for other_id, other_tags in recent:
+            shared = len(tags & other_tags)
+            if shared:
+                scored.append((shared / len(tags | other_tags), other_id))
+        scored.sort(reverse=True)
+        return [other_id for _, other_id in scored[:limit]]
+
+    async def drain(self, timeout: float = 2.0):
+        """Wait (bounded) for queued ideas to reach the write-behind buffer"""
+        if self._queue is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Idea pipeline still has {self._queue.qsize()} ideas queued")
+
+    async def close(self):
+        """Process what is queued, then stop the workers"""
+        await self.drain(timeout=10.0)
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "queue_size": self.queue_size,
+            "workers": self.worker_count,
+            **self.counters
+        }
+
+
+class IdeaConnectionsJob:
+    """Periodically recomputes connections of changed sessions by TF-IDF similarity
+
+    The pipeline links a new idea by shared tags right away; this job refines
+    those links over the whole session so /ideas/{id}/connections is a lookup.
+    """
+
+    def __init__(
+        self,
+        repository: Optional[IdeaRepository] = None,
+        interval: float = None,
+        neighbours: int = None,
+        max_ideas: int = None
+    ):
+        self.repository = repository
+        self.interval = interval if interval is not None else settings.nexia_idea_connections_interval
+        self.neighbours = neighbours or settings.nexia_idea_connections_k
+        self.max_ideas = max_ideas or settings.nexia_idea_connections_max_ideas
+        self._task: Optional[asyncio.Task] = None
+        self.counters = {"runs": 0, "sessions": 0, "updated_ideas": 0, "failures": 0}
+        self.last_run_ms: Optional[float] = None
+
+    def _repository(self) -> IdeaRepository:
+        return self.repository or get_idea_repository()
+
+    async def _session_ideas(self, session_id: str) -> List[Idea]:
+        ideas, cursor = [], None
+        while len(ideas) < self.max_ideas:
+            page, cursor = await self._repository().list_session(
+                session_id, min(200, self.max_ideas - len(ideas)), cursor
+            )
+            ideas.extend(page)
+            if cursor is None:
+                break
+        return ideas
+
+    async def run_once(self) -> int:
+        """Recompute connections of every session changed since the last run"""
+        repository = self._repository()
+        sessions, repository.dirty_sessions = repository.dirty_sessions, set()
+        started = time.monotonic()
+        updated = 0
+        for session_id in sessions:
+            try:
+                ideas = await self._session_ideas(session_id)
+                # CPU-bound, kept off the event loop
+                neighbours = await asyncio.to_thread(
+                    tfidf_neighbours,
+                    {idea.id: " ".join([idea.content, *idea.tags]) for idea in ideas},
+                    k=self.neighbours
+                )
+                changed = {
+                    idea.id: neighbours[idea.id] for idea in ideas
+                    if neighbours[idea.id] != idea.connections
+                }
+                await repository.set_connections(changed)
+                updated += len(changed)
+            except Exception as e:
+                # Retried on the next run
+                repository.dirty_sessions.add(session_id)
+                self.counters["failures"] += 1
+                logger.error(f"Idea connections failed for session {session_id}: {e}")
+        self.counters["runs"] += 1
+        self.counters["sessions"] += len(sessions)
+        self.counters["updated_ideas"] += updated
+        self.last_run_ms = round((time.monotonic() - started) * 1000, 1)
+        return updated
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.run_once()
+
+    def start(self):
+        if self.interval > 0 and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "interval_seconds": self.interval,
+            "running": self._task is not None and not self._task.done(),
+            "pending_sessions": len(self._repository().dirty_sessions),
+            "last_run_ms": self.last_run_ms,
+            **self.counters
+        }
+
+
+idea_pipeline: Optional[IdeaPipeline] = None
+idea_connections_job: Optional[IdeaConnectionsJob] = None
+
+
+def get_idea_pipeline() -> IdeaPipeline:
+    """Get the process-wide idea pipeline"""
+    global idea_pipeline
+    if idea_pipeline is None:
+        idea_pipeline = IdeaPipeline()
+    return idea_pipeline
+
+
+def get_idea_connections_job() -> IdeaConnectionsJob:
+    """Get the process-wide connections job (started by the application lifespan)"""
+    global idea_connections_job
+    if idea_connections_job is None:
+        idea_connections_job = IdeaConnectionsJob()
+    return idea_connections_job
+
+
+async def close_idea_pipeline():
+    """Stop the connections job, drain and stop the idea pipeline"""
+    global idea_pipeline, idea_connections_job
+    if idea_connections_job is not None:
+        await idea_connections_job.stop()
+        idea_connections_job = None
+    if idea_pipeline is not None:
+        await idea_pipeline.close()
+        idea_pipeline = None
@@ -0,0 +1,132 @@
+"""
+Text search helpers for parked ideas
+Tokenizer shared by tagging and search, an in-process inverted index used
+when there is no Postgres full-text index, and TF-IDF nearest neighbours used
+to precompute idea connections.
+"""
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9'-]{2,}")
+
+STOPWORDS = frozenset("""
+les aux ete sera serait alors aussi autre avec avoir bien car cela celle celui ces cette chaque comme comment dans
+des donc elle elles encore est et etre fait faire faut leur leurs mais meme mes moi mon
+nous notre nos par pas peut plus pour pourquoi quand que quel quelle qui quoi sans ses
+son sont sur tes toi ton tous tout tres une vos votre vous idee idees penser pense
+the and for with that this from have what when where which would could should about
+into your you are was were will just like idea ideas think maybe
+""".split())
+
+
+def fold(text: str) -> str:
+    """Lowercase and strip accents so 'Idée' and 'idee' match"""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text: str) -> List[str]:
+    """Meaningful words of a text, folded, in order"""
+    words = (word.strip("'-") for word in _WORD.findall(fold(text)))
+    return [word for word in words if len(word) > 2 and word not in STOPWORDS]
+
+
+class InvertedIndex:
+    """token -> idea ids, ranked with TF-IDF"""
+
+    def __init__(self):
+        self._postings: Dict[str, Set[str]] = defaultdict(set)
+        self._terms: Dict[str, Counter] = {}
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def add(self, doc_id: str, text: str):
+        self.remove(doc_id)
+        terms = Counter(tokenize(text))
+        self._terms[doc_id] = terms
+        for term in terms:
+            self._postings[term].add(doc_id)
+
+    def remove(self, doc_id: str):
+        terms = self._terms.pop(doc_id, None)
+        if not terms:
+            return
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.discard(doc_id)
+                if not postings:
+                    del self._postings[term]
+
+    def search(
+        self,
+        query: str,
+        limit: int = 20,
+        allowed: Optional[Set[str]] = None
+    ) -> List[Tuple[str, float]]:
+        """(doc_id, score) of the documents matching any query term, best first"""
+        total = len(self._terms)
+        scores: Dict[str, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + total / len(postings))
+            for doc_id in postings:
+                if allowed is not None and doc_id not in allowed:
+                    continue
+                terms = self._terms[doc_id]
+                scores[doc_id] += (terms[term] / sum(terms.values())) * idf
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit]
+
+
+def tfidf_neighbours(
+    docs: Dict[str, str],
+    k: int = 5,
+    min_similarity: float = 0.1
+) -> Dict[str, List[str]]:
+    """The k most similar documents of each document (cosine over TF-IDF)"""
+    terms = {doc_id: Counter(tokenize(text)) for doc_id, text in docs.items()}
+    document_frequency = Counter(term for counts in terms.values() for term in counts)
+    total = len(docs)
+
+    vectors: Dict[str, Dict[str, float]] = {}
+    for doc_id, counts in terms.items():
+        vector = {term: count * math.log(1 + total / document_frequency[term]) for term, count in counts.items()}
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        vectors[doc_id] = {term: weight / norm for term, weight in vector.items()} if norm else {}
+
+    # Only documents sharing a term can be similar: accumulate through postings
+    postings: Dict[str, List[Tuple[str, float]]] = defaultdict(list)
+    for doc_id, vector in vectors.items():
+        for term, weight in vector.items():
+            postings[term].append((doc_id, weight))
+
+    neighbours = {}
+    for doc_id, vector in vectors.items():
+        similarities: Dict[str, float] = defaultdict(float)
+        for term, weight in vector.items():
+            for other_id, other_weight in postings[term]:
+                if other_id != doc_id:
+                    similarities[other_id] += weight * other_weight
+        ranked = sorted(
+            (item for item in similarities.items() if item[1] >= min_similarity),
+            key=lambda item: (-item[1], item[0])
+        )
+        neighbours[doc_id] = [other_id for other_id, _ in ranked[:k]]
+    return neighbours
+
+
+def top_terms(texts: Iterable[str], max_terms: int) -> List[str]:
+    """Most frequent tokens, ties broken by first use"""
+    words = [word for text in texts for word in tokenize(text)]
+    counts = Counter(words)
+    first_use = {}
+    for position, word in enumerate(words):
+        first_use.setdefault(word, position)
+    return sorted(counts, key=lambda word: (-counts[word], first_use[word]))[:max_terms]
@@ -0,0 +1,457 @@
+"""
+Idea storage
+SQL repository on the shared async engine, an in-memory repository for local
+development, and a write-behind buffer so parking an idea from a chat turn
+never waits on the database.
+"""
+import asyncio
+import base64
+import logging
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from datetime import datetime
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, func, insert, or_, select, tuple_, update
+from sqlalchemy.exc import DataError, IntegrityError
+
+from app.config import settings
+from app.core.database import AsyncSessionLocal, database_enabled
+from app.core.idea_search import InvertedIndex
+from app.models.idea import SEARCH_CONFIGS, Idea, IdeaRecord, search_query, search_vector
+
+logger = logging.getLogger(__name__)
+
+
+def new_idea(session_id: str, content: str, tags: List[str] = None) -> Idea:
+    """Build a parked idea with a fresh id"""
+    return Idea(
+        id=f"idea_{uuid.uuid4().hex}",
+        content=content,
+        session_id=session_id,
+        created_at=datetime.now(),
+        tags=tags or []
+    )
+
+
+def encode_cursor(idea: Idea) -> str:
+    """Opaque keyset cursor pointing after the given idea"""
+    raw = f"{idea.created_at.isoformat()}|{idea.id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        created_at, idea_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|", 1)
+        return datetime.fromisoformat(created_at), idea_id
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+class IdeaRepository(ABC):
+    """Storage backend for parked ideas"""
+
+    backend = "abstract"
+
+    def __init__(self):
+        # Sessions whose ideas changed since the last connections job run
+        self.dirty_sessions: Set[str] = set()
+
+    @abstractmethod
+    async def add_many(self, ideas: List[Idea]):
+        """Insert ideas"""
+
+    @abstractmethod
+    async def get(self, idea_id: str) -> Optional[Idea]:
+        """Get an idea by id"""
+
+    @abstractmethod
+    async def get_many(self, idea_ids: List[str]) -> List[Idea]:
+        """Get the ideas that exist among idea_ids, in the given order"""
+
+    @abstractmethod
+    async def list_session(
+        self,
+        session_id: str,
+        limit: int,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Idea], Optional[str]]:
+        """A page of a session's ideas, newest first, and the next page's cursor"""
+
+    @abstractmethod
+    async def set_status(self, idea_ids: Iterable[str], status: str) -> int:
+        """Update the status of ideas; returns how many were found"""
+
+    @abstractmethod
+    async def delete(self, idea_id: str) -> bool:
+        """Delete an idea; returns whether it existed"""
+
+    @abstractmethod
+    async def search(self, query: str, session_id: Optional[str] = None, limit: int = 20) -> List[Idea]:
+        """Full-text search, best matches first"""
+
+    @abstractmethod
+    async def set_connections(self, connections: Dict[str, List[str]]):
+        """Replace the connections of several ideas"""
+
+    def _page(self, ideas: List[Idea], limit: int) -> Tuple[List[Idea], Optional[str]]:
+        # One extra row was fetched to know whether another page exists
+        if len(ideas) > limit:
+            ideas = ideas[:limit]
+            return ideas, encode_cursor(ideas[-1])
+        return ideas, None
+
+
+class SqlIdeaRepository(IdeaRepository):
+    """Ideas table on the shared async SQLAlchemy engine"""
+
+    backend = "sql"
+
+    def __init__(self, session_factory=AsyncSessionLocal):
+        super().__init__()
+        self.session_factory = session_factory
+
+    def _to_idea(self, record: IdeaRecord) -> Idea:
+        return Idea(
+            id=record.id,
+            content=record.content,
+            session_id=record.session_id,
+            created_at=record.created_at,
+            status=record.status,
+            tags=record.tags or [],
+            connections=record.connections or []
+        )
+
+    async def add_many(self, ideas: List[Idea]):
+        if not ideas:
+            return
+        now = datetime.now()
+        rows = [
+            {
+                "id": idea.id,
+                "session_id": idea.session_id,
+                "content": idea.content,
+                "status": idea.status,
+                "tags": idea.tags,
+                "connections": idea.connections,
+                "created_at": idea.created_at or now,
+                "updated_at": now
+            }
+            for idea in ideas
+        ]
+        async with self.session_factory() as session:
+            await session.execute(insert(IdeaRecord), rows)
+            await session.commit()
+        self.dirty_sessions.update(idea.session_id for idea in ideas)
+
+    async def get(self, idea_id: str) -> Optional[Idea]:
+        async with self.session_factory() as session:
+            record = await session.get(IdeaRecord, idea_id)
+            return self._to_idea(record) if record else None
+
+    async def get_many(self, idea_ids: List[str]) -> List[Idea]:
+        if not idea_ids:
+            return []
+        async with self.session_factory() as session:
+            records = (await session.execute(
+                select(IdeaRecord).where(IdeaRecord.id.in_(idea_ids))
+            )).scalars().all()
+        found = {record.id: self._to_idea(record) for record in records}
+        return [found[idea_id] for idea_id in idea_ids if idea_id in found]
+
+    async def list_session(
+        self,
+        session_id: str,
+        limit: int,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Idea], Optional[str]]:
+        query = select(IdeaRecord).where(IdeaRecord.session_id == session_id)
+        if cursor:
+            created_at, idea_id = decode_cursor(cursor)
+            query = query.where(tuple_(IdeaRecord.created_at, IdeaRecord.id) < tuple_(created_at, idea_id))
+        query = query.order_by(IdeaRecord.created_at.desc(), IdeaRecord.id.desc()).limit(limit + 1)
+
+        async with self.session_factory() as session:
+            records = (await session.execute(query)).scalars().all()
+        return self._page([self._to_idea(record) for record in records], limit)
+
+    async def set_status(self, idea_ids: Iterable[str], status: str) -> int:
+        idea_ids = list(idea_ids)
+        if not idea_ids:
+            return 0
+        query = (
+            update(IdeaRecord)
+            .where(IdeaRecord.id.in_(idea_ids))
+            .values(status=status, updated_at=datetime.now())
+        )
+        async with self.session_factory() as session:
+            result = await session.execute(query)
+            await session.commit()
+        return result.rowcount
+
+    async def delete(self, idea_id: str) -> bool:
+        async with self.session_factory() as session:
+            result = await session.execute(
+                delete(IdeaRecord).where(IdeaRecord.id == idea_id).returning(IdeaRecord.session_id)
+            )
+            session_id = result.scalar_one_or_none()
+            await session.commit()
+        if session_id is None:
+            return False
+        self.dirty_sessions.add(session_id)
+        return True
+
+    async def search(self, query: str, session_id: Optional[str] = None, limit: int = 20) -> List[Idea]:
+        # One condition per text search configuration, each served by its GIN index
+        vectors = [(search_vector(IdeaRecord.content, config), search_query(query, config))
+                   for config in SEARCH_CONFIGS]
+        rank = func.greatest(*(func.ts_rank(vector, tsquery) for vector, tsquery in vectors))
+        statement = select(IdeaRecord).where(or_(*(vector.op("@@")(tsquery) for vector, tsquery in vectors)))
+        if session_id:
+            statement = statement.where(IdeaRecord.session_id == session_id)
+        statement = statement.order_by(rank.desc(), IdeaRecord.created_at.desc()).limit(limit)
+
+        async with self.session_factory() as session:
+            records = (await session.execute(statement)).scalars().all()
+        return [self._to_idea(record) for record in records]
+
+    async def set_connections(self, connections: Dict[str, List[str]]):
+        if not connections:
+            return
+        rows = [{"id": idea_id, "connections": linked} for idea_id, linked in connections.items()]
+        async with self.session_factory() as session:
+            # Bulk UPDATE by primary key (executemany)
+            await session.execute(update(IdeaRecord), rows)
+            await session.commit()
+
+
+class InMemoryIdeaRepository(IdeaRepository):
+    """Process-local ideas, for development without a database"""
+
+    backend = "memory"
+
+    def __init__(self):
+        super().__init__()
+        self._ideas: Dict[str, Idea] = {}
+        # session_id -> idea ids
+        self._by_session: Dict[str, set] = {}
+        self._index = InvertedIndex()
+
+    async def add_many(self, ideas: List[Idea]):
+        for idea in ideas:
+            self._ideas[idea.id] = idea
+            self._by_session.setdefault(idea.session_id, set()).add(idea.id)
+            self._index.add(idea.id, idea.content)
+            self.dirty_sessions.add(idea.session_id)
+
+    async def get(self, idea_id: str) -> Optional[Idea]:
+        return self._ideas.get(idea_id)
+
+    async def get_many(self, idea_ids: List[str]) -> List[Idea]:
+        return [self._ideas[idea_id] for idea_id in idea_ids if idea_id in self._ideas]
+
+    async def list_session(
+        self,
+        session_id: str,
+        limit: int,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Idea], Optional[str]]:
+        ideas = sorted(
+            (self._ideas[idea_id] for idea_id in self._by_session.get(session_id, ())),
+            key=lambda idea: (idea.created_at, idea.id),
+            reverse=True
+        )
+        if cursor:
+            after = decode_cursor(cursor)
+            ideas = [idea for idea in ideas if (idea.created_at, idea.id) < after]
+        return self._page(ideas[:limit + 1], limit)
+
+    async def set_status(self, idea_ids: Iterable[str], status: str) -> int:
+        updated = 0
+        for idea_id in idea_ids:
+            idea = self._ideas.get(idea_id)
+            if idea is not None:
+                idea.status = status
+                updated += 1
+        return updated
+
+    async def delete(self, idea_id: str) -> bool:
+        idea = self._ideas.pop(idea_id, None)
+        if idea is None:
+            return False
+        self._by_session.get(idea.session_id, set()).discard(idea_id)
+        self._index.remove(idea_id)
+        self.dirty_sessions.add(idea.session_id)
+        return True
+
+    async def search(self, query: str, session_id: Optional[str] = None, limit: int = 20) -> List[Idea]:
+        allowed = self._by_session.get(session_id, set()) if session_id else None
+        return [self._ideas[idea_id] for idea_id, _ in self._index.search(query, limit, allowed)]
+
+    async def set_connections(self, connections: Dict[str, List[str]]):
+        for idea_id, linked in connections.items():
+            idea = self._ideas.get(idea_id)
+            if idea is not None:
+                idea.connections = linked
+
+
+class IdeaWriteBehind:
+    """Buffers idea inserts and writes them to the repository in batches"""
+
+    def __init__(
+        self,
+        repository: IdeaRepository,
+        flush_interval: float = None,
+        batch_size: int = None,
+        max_pending: int = None
+    ):
+        self.repository = repository
+        self.flush_interval = flush_interval or settings.nexia_idea_flush_interval
+        self.batch_size = batch_size or settings.nexia_idea_flush_batch
+        self.max_pending = max_pending or settings.nexia_idea_max_pending
+        self._pending: deque = deque()
+        self._writing: List[Idea] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        # Ideas the database rejects outright, kept for inspection
+        self.dead_letter: deque = deque(maxlen=100)
+        self.counters = {"submitted": 0, "written": 0, "dropped": 0, "failed_flushes": 0, "dead_lettered": 0}
+
+    def _ensure_worker(self):
+        if self._task is None or self._task.done():
+            self._closing = False
+            self._wakeup = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+            self._task = asyncio.create_task(self._run())
+
+    def submit(self, idea: Idea):
+        """Queue an idea for writing; never blocks the caller"""
+        self._ensure_worker()
+        if len(self._pending) >= self.max_pending:
+            # The database is down or far behind: keep the newest ideas
+            self._pending.popleft()
+            self.counters["dropped"] += 1
+            logger.error("Idea write buffer full, dropped the oldest pending idea")
+        self._pending.append(idea)
+        self.counters["submitted"] += 1
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    def has_pending(self, session_id: Optional[str] = None, idea_ids: Iterable[str] = ()) -> bool:
+        """Whether ideas of this session, or with these ids, are not written yet"""
+        idea_ids = set(idea_ids)
+        return any(
+            idea.session_id == session_id or idea.id in idea_ids
+            for idea in (*self._writing, *self._pending)
+        )
+
+    async def _run(self):
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Write every pending idea"""
+        if self._flush_lock is None:
+            return
+        async with self._flush_lock:
+            while self._pending:
+                batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+                self._writing = batch
+                try:
+                    await self._write(batch)
+                except Exception as e:
+                    # Retried on the next flush
+                    self.counters["failed_flushes"] += 1
+                    logger.error(f"Idea write-behind flush failed ({len(batch)} ideas): {e}")
+                    return
+                finally:
+                    self._writing = []
+
+    async def _write(self, batch: List[Idea]):
+        """Insert a batch, bisecting it to isolate ideas the database rejects
+        
+        Whatever is not written when an error escapes, cancellation included,
+        is put back at the head of the buffer in order.
+        """
+        parts = [batch]
+        try:
+            while parts:
+                part = parts[-1]
+                try:
+                    await self.repository.add_many(part)
+                except (IntegrityError, DataError) as e:
+                    parts.pop()
+                    if len(part) > 1:
+                        middle = len(part) // 2
+                        parts.extend((part[middle:], part[:middle]))
+                        continue
+                    # Would fail forever and block everything behind it
+                    self.dead_letter.append(part[0])
+                    self.counters["dead_lettered"] += 1
+                    logger.error(f"Idea {part[0].id} rejected by the database, moved to dead letter: {e}")
+                    continue
+                parts.pop()
+                self.counters["written"] += len(part)
+        except BaseException:
+            for part in parts:
+                self._pending.extendleft(reversed(part))
+            raise
+
+    async def close(self):
+        """Flush what is left and stop the background writer"""
+        if self._task is not None:
+            # Let a running flush finish its insert instead of cancelling it
+            self._closing = True
+            self._wakeup.set()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._pending),
+            "max_pending": self.max_pending,
+            "batch_size": self.batch_size,
+            **self.counters
+        }
+
+
+idea_repository: Optional[IdeaRepository] = None
+idea_write_behind: Optional[IdeaWriteBehind] = None
+
+
+def get_idea_repository() -> IdeaRepository:
+    """Get the repository selected by settings.nexia_idea_store"""
+    global idea_repository
+    if idea_repository is None:
+        backend = settings.nexia_idea_store
+        if backend == "sql" or (backend == "auto" and database_enabled()):
+            idea_repository = SqlIdeaRepository()
+        else:
+            idea_repository = InMemoryIdeaRepository()
+        logger.info(f"Using {idea_repository.backend} idea repository")
+    return idea_repository
+
+
+def get_idea_write_behind() -> IdeaWriteBehind:
+    """Get the process-wide write-behind buffer"""
+    global idea_write_behind
+    if idea_write_behind is None:
+        idea_write_behind = IdeaWriteBehind(get_idea_repository())
+    return idea_write_behind
+
+
+async def close_idea_write_behind():
+    """Flush and stop the write-behind buffer"""
+    global idea_write_behind
+    if idea_write_behind is not None:
+        await idea_write_behind.close()
+        idea_write_behind = None
@@ -3,25 +3,35 @@ LangSmith Integration pour NEXIA AI Engine
 Module séparé pour le tracing et monitoring des agents IA
 """
 
+import importlib.util
 import os
 import logging
 from typing import Dict, Any, Optional
 from datetime import datetime
 from functools import wraps
 
-# Imports conditionels pour éviter erreurs si LangSmith pas installé
-try:
-    from langsmith import Client
-    from langsmith.decorators import traceable
-    from langsmith.run_helpers import trace
-    import langsmith
-    LANGSMITH_AVAILABLE = True
-except ImportError:
-    LANGSMITH_AVAILABLE = False
+# Le SDK LangSmith est coûteux à charger : il n'est importé qu'à la première
+# trace, le tracing reste activé dès qu'il est installé
+LANGSMITH_AVAILABLE = importlib.util.find_spec("langsmith") is not None
+if not LANGSMITH_AVAILABLE:
     logging.warning("LangSmith not available - install with: pip install langsmith")
 
+Client = None
+traceable = None
+trace = None
+
 logger = logging.getLogger(__name__)
 
+
+def _import_langsmith():
+    """Import du SDK à la première trace"""
+    global Client, traceable, trace
+    if traceable is None:
+        from langsmith import Client
+        from langsmith.decorators import traceable
+        from langsmith.run_helpers import trace
+
+
 class NexiaLangSmithTracker:
     """Gestionnaire centralise pour LangSmith tracing dans NEXIA"""
     
@@ -36,26 +46,42 @@ class NexiaLangSmithTracker:
             logger.info("🔄 LangSmith SDK non disponible - tracing désactivé")
             return
             
-        try:
-            # Configuration environnement
-            os.environ.setdefault("LANGSMITH_PROJECT", "nexia-agents")
-            os.environ.setdefault("LANGSMITH_TRACING", "true")
-            
-            # Client pour métriques custom
+        # Configuration environnement
+        os.environ.setdefault("LANGSMITH_PROJECT", "nexia-agents")
+        os.environ.setdefault("LANGSMITH_TRACING", "true")
+        self.enabled = True
+        logger.info("✅ LangSmith configuré - Tracing agents IA activé")
+    
+    def _get_client(self):
+        """Client pour métriques custom, créé à la première utilisation"""
+        if self.client is None:
+            _import_langsmith()
             self.client = Client()
-            self.enabled = True
-            logger.info("✅ LangSmith configuré - Tracing agents IA activé")
-            
-        except Exception as e:
-            logger.warning(f"⚠️ LangSmith configuration échouée: {e}")
-            self.enabled = False
+        return self.client
+    
+    def _traced(self, name: str, wrapper, func):
+        """traceable(name)(wrapper), construit au premier appel pour différer l'import du SDK"""
+        traced = None
+        
+        @wraps(func)
+        async def lazy(*args, **kwargs):
+            nonlocal traced
+            if traced is None:
+                try:
+                    _import_langsmith()
+                    traced = traceable(name=name)(wrapper)
+                except Exception as e:
+                    logger.warning(f"⚠️ LangSmith configuration échouée: {e}")
+                    self.enabled = False
+                    traced = func
+            return await traced(*args, **kwargs)
+        return lazy
     
     def trace_conversation(self, func):
         """Decorator pour tracer les conversations NEXIA"""
         if not self.enabled:
             return func
             
-        @traceable(name="nexia-conversation")
         @wraps(func)
         async def wrapper(self_engine, message: str, session_id: str, context: Dict[str, Any]):
             # Ajout métadonnées conversation
@@ -80,14 +106,13 @@ class NexiaLangSmithTracker:
             await self._log_conversation_metrics(message, result, session_id)
             
             return result
-        return wrapper
+        return self._traced("nexia-conversation", wrapper, func)
     
     def trace_llm_call(self, func):
         """Decorator pour tracer les appels LLM"""
         if not self.enabled:
             return func
             
-        @traceable(name="nexia-llm-call")  
         @wraps(func)
         async def wrapper(self_engine, system_prompt: str, message: str, session_context: Dict[str, Any]):
             start_time = datetime.now()
@@ -123,14 +148,13 @@ class NexiaLangSmithTracker:
                 )
                 
             return response
-        return wrapper
+        return self._traced("nexia-llm-call", wrapper, func)
     
     def trace_mode_processing(self, func):
         """Decorator pour tracer le processing par mode IA"""
         if not self.enabled:
             return func
             
-        @traceable(name="nexia-mode-processing")
         @wraps(func)
         async def wrapper(self_engine, mode, message: str, response: str):
             with trace("mode-actions") as mode_trace:
@@ -158,11 +182,11 @@ class NexiaLangSmithTracker:
                 )
                 
             return actions
-        return wrapper
+        return self._traced("nexia-mode-processing", wrapper, func)
     
     async def _log_conversation_metrics(self, message: str, result, session_id: str):
         """Log métriques business pour analyse"""
-        if not self.enabled or not self.client:
+        if not self.enabled:
             return
             
         try:
@@ -181,7 +205,7 @@ class NexiaLangSmithTracker:
             }
             
             # Create custom run pour business metrics
-            self.client.create_run(
+            self._get_client().create_run(
                 name="nexia-business-metrics",
                 inputs=business_data,
                 run_type="chain",
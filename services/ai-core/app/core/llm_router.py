@@ -0,0 +1,189 @@
+"""
+NEXIA LLM Router - Hedged requests across Claude Bridge and API LLMs
+Starts the primary provider, and if it has not answered within its p95
+latency, races the next provider and keeps whichever answers first.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, Any, List, Optional, Tuple
+
+from app.config import settings
+from app.core.circuit_breaker import ProviderHealthRegistry
+from app.models.conversation import LLMResponse
+
+logger = logging.getLogger(__name__)
+
+ProviderCall = Tuple[str, Callable[[], Awaitable[LLMResponse]]]
+
+
+class FallbackAnswer(Exception):
+    """A provider answered with canned fallback text instead of a real answer"""
+
+    def __init__(self, provider: str, response: LLMResponse):
+        super().__init__(f"{provider} returned a fallback answer")
+        self.response = response
+
+
+class AllProvidersFailed(Exception):
+    """Raised when every provider in a race failed"""
+
+    def __init__(self, message: str, fallback: Optional[LLMResponse] = None):
+        super().__init__(message)
+        # First canned answer a provider produced, if any
+        self.fallback = fallback
+
+
+class LatencyHistogram:
+    """Rolling window of successful call latencies for one provider"""
+
+    def __init__(self, window: int = 200):
+        self.samples = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(round(pct * (len(ordered) - 1))))]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": len(self.samples),
+            "p50_ms": self._ms(self.percentile(0.5)),
+            "p95_ms": self._ms(self.percentile(0.95)),
+            "p99_ms": self._ms(self.percentile(0.99))
+        }
+
+    def _ms(self, seconds: Optional[float]) -> Optional[float]:
+        return round(seconds * 1000, 1) if seconds is not None else None
+
+
+class HedgedRouter:
+    """Runs provider calls with latency-driven hedging"""
+
+    def __init__(
+        self,
+        default_delay: float = None,
+        min_samples: int = None,
+        percentile: float = None,
+        health: Optional[ProviderHealthRegistry] = None
+    ):
+        self.health = health or ProviderHealthRegistry()
+        self.default_delay = default_delay or settings.nexia_hedge_default_delay
+        self.min_samples = min_samples or settings.nexia_hedge_min_samples
+        self.percentile = percentile or settings.nexia_hedge_percentile
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.counters = {"races": 0, "hedged": 0, "hedge_wins": 0}
+
+    def histogram(self, provider: str) -> LatencyHistogram:
+        if provider not in self.histograms:
+            self.histograms[provider] = LatencyHistogram()
+        return self.histograms[provider]
+
+    def hedge_delay(self, provider: str) -> Optional[float]:
+        """How long to wait on a provider before starting the next one"""
+        if not settings.nexia_hedge_enabled:
+            return None
+        histogram = self.histogram(provider)
+        if len(histogram.samples) < self.min_samples:
+            return self.default_delay
+        return histogram.percentile(self.percentile)
+
+    async def _timed(self, provider: str, call: Callable[[], Awaitable[LLMResponse]]) -> LLMResponse:
+        breaker = self.health.get(provider)
+        started = time.monotonic()
+        try:
+            response = await call()
+            if isinstance(response, LLMResponse) and response.is_fallback:
+                raise FallbackAnswer(provider, response)
+        except asyncio.CancelledError:
+            # Losing a race says nothing about the provider's health
+            breaker.release()
+            raise
+        except Exception:
+            breaker.record_failure(time.monotonic() - started)
+            raise
+
+        latency = time.monotonic() - started
+        breaker.record_success(latency)
+        self.histogram(provider).record(latency)
+        return response
+
+    async def race(self, providers: List[ProviderCall]) -> LLMResponse:
+        """Return the first successful answer, hedging slow providers"""
+        self.counters["races"] += 1
+        queue = list(providers)
+        running: Dict[asyncio.Task, str] = {}
+        errors = []
+        fallback = None
+        hedged = False
+
+        def launch() -> Optional[str]:
+            # Providers whose circuit is open are skipped without a call
+            while queue:
+                provider, call = queue.pop(0)
+                if not self.health.get(provider).allow_request():
+                    errors.append(f"{provider}: circuit open")
+                    continue
+                task = asyncio.create_task(self._timed(provider, call))
+                running[task] = provider
+                return provider
+            return None
+
+        primary = launch()
+        if primary is None:
+            raise AllProvidersFailed("; ".join(errors) or "No provider available")
+        try:
+            while running:
+                # Hedge only while a single provider is in flight
+                leader = next(iter(running.values()))
+                timeout = self.hedge_delay(leader) if queue and len(running) == 1 else None
+                done, _ = await asyncio.wait(
+                    running.keys(), timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if not done:
+                    hedge = launch()
+                    if hedge is not None:
+                        hedged = True
+                        self.counters["hedged"] += 1
+                        logger.info(f"{leader} slower than its hedge delay, hedging with {hedge}")
+                    continue
+
+                for task in done:
+                    provider = running.pop(task)
+                    if task.exception() is None:
+                        if hedged and provider != primary:
+                            self.counters["hedge_wins"] += 1
+                        logger.info(f"Response from {provider}")
+                        return task.result()
+                    error = task.exception()
+                    if isinstance(error, FallbackAnswer) and fallback is None:
+                        fallback = error.response
+                    errors.append(f"{provider}: {error}")
+                    logger.warning(f"Provider {provider} failed: {error}")
+
+                # A failure frees a slot, start the next provider right away
+                if queue and not running:
+                    launch()
+        finally:
+            # Cancel the losers; their outcome is intentionally discarded
+            for task in running:
+                task.cancel()
+                task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+        raise AllProvidersFailed("; ".join(errors), fallback)
+
+    def stats(self) -> Dict[str, Any]:
+        providers = {}
+        for provider, histogram in self.histograms.items():
+            delay = self.hedge_delay(provider)
+            providers[provider] = {
+                **histogram.snapshot(),
+                "hedge_delay_ms": round(delay * 1000, 1) if delay is not None else None
+            }
+        return {**self.counters, "providers": providers}
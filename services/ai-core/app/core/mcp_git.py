@@ -9,6 +9,10 @@ import logging
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
 from .mcp_shell import MCPShellServer, ShellResult
+from app.config import settings
+from app.core.git_native import (
+    GitRefs, RefsSnapshot, find_git_dir, parse_porcelain_v2, pygit2_ahead_behind, pygit2_available, pygit2_files
+)
 
 logger = logging.getLogger(__name__)
 
@@ -30,54 +34,82 @@ class MCPGitServer:
         self.shell = shell_server
     
     async def get_status(self, repo_path: str = None) -> GitStatus:
-        """Get git repository status"""
+        """Get git repository status
+        
+        Refs are read in-process. Files and ahead/behind come from libgit2 when
+        pygit2 is installed (NEXIA_GIT_BACKEND), otherwise from a single
+        `git status --porcelain=v2 -z`.
+        """
         work_dir = repo_path or self.shell.current_directory
         
         # Check if it's a git repository
-        if not await self._is_git_repo(work_dir):
+        git_dir = find_git_dir(work_dir)
+        if git_dir is None:
             raise ValueError(f"Directory is not a git repository: {work_dir}")
         
-        # Get current branch
-        branch_result = await self.shell.execute_command('git', ['branch', '--show-current'], cwd=work_dir)
-        current_branch = branch_result.stdout.strip() if branch_result.return_code == 0 else "unknown"
-        
-        # Get status
-        status_result = await self.shell.execute_command('git', ['status', '--porcelain'], cwd=work_dir)
-        
-        staged_files = []
-        modified_files = []
-        untracked_files = []
-        
-        if status_result.return_code == 0:
-            for line in status_result.stdout.strip().split('\n'):
-                if not line:
-                    continue
-                status_code = line[:2]
-                filename = line[3:]
-                
-                if status_code[0] != ' ':  # Staged
-                    staged_files.append(filename)
-                if status_code[1] != ' ':  # Modified
-                    modified_files.append(filename)
-                if status_code == '??':  # Untracked
-                    untracked_files.append(filename)
+        try:
+            refs = await asyncio.to_thread(GitRefs(git_dir).snapshot)
+        except OSError as e:
+            logger.warning(f"Could not read git refs in {work_dir}: {e}")
+            refs = None
+        
+        status = None
+        if refs is not None and self._use_pygit2():
+            try:
+                # Independent queries, each in its own thread
+                files, ahead_behind = await asyncio.gather(
+                    asyncio.to_thread(pygit2_files, work_dir),
+                    asyncio.to_thread(pygit2_ahead_behind, work_dir, refs)
+                )
+                status = {"branch": refs.branch, **files, **ahead_behind}
+            except Exception as e:
+                logger.warning(f"pygit2 status failed, falling back to git: {e}")
+        if status is None:
+            status = await self._porcelain_status(work_dir, refs)
+        
+        staged_files = status["staged_files"]
+        modified_files = status["modified_files"]
+        untracked_files = status["untracked_files"]
         
         # Check if working tree is clean
         is_clean = len(staged_files) == 0 and len(modified_files) == 0 and len(untracked_files) == 0
         
-        # Get ahead/behind info
-        ahead_behind = await self._get_ahead_behind_count(work_dir)
-        
         return GitStatus(
-            branch=current_branch,
+            branch=status["branch"],
             is_clean=is_clean,
             staged_files=staged_files,
             modified_files=modified_files,
             untracked_files=untracked_files,
-            commits_ahead=ahead_behind['ahead'],
-            commits_behind=ahead_behind['behind']
+            commits_ahead=status["ahead"],
+            commits_behind=status["behind"]
         )
     
+    def _use_pygit2(self) -> bool:
+        backend = settings.nexia_git_backend
+        return backend == "pygit2" or (backend == "auto" and pygit2_available())
+    
+    async def _porcelain_status(self, work_dir: str, refs: Optional[RefsSnapshot]) -> Dict[str, Any]:
+        """One `git status` process; ahead/behind is only asked for when the refs can't settle it"""
+        args = ['status', '--porcelain=v2', '-z']
+        settled = refs is not None and (refs.upstream_head is None or refs.head == refs.upstream_head)
+        if not settled:
+            args.append('--branch')
+        
+        result = await self.shell.execute_command('git', args, cwd=work_dir)
+        if result.return_code != 0:
+            logger.warning(f"git status failed in {work_dir}: {result.stderr.strip()}")
+            status = parse_porcelain_v2("")
+        else:
+            status = parse_porcelain_v2(result.stdout)
+        
+        if refs is not None:
+            status["branch"] = refs.branch
+        elif status["branch"] is None:
+            status["branch"] = "unknown"
+        status["ahead"] = status["ahead"] or 0
+        status["behind"] = status["behind"] or 0
+        return status
+    
     async def add_files(self, files: List[str], repo_path: str = None) -> ShellResult:
         """Add files to staging area"""
         work_dir = repo_path or self.shell.current_directory
@@ -176,22 +208,4 @@ class MCPGitServer:
     
     async def _is_git_repo(self, path: str) -> bool:
         """Check if directory is a git repository"""
-        git_dir = os.path.join(path, '.git')
-        return os.path.exists(git_dir)
-    
-    async def _get_ahead_behind_count(self, repo_path: str) -> Dict[str, int]:
-        """Get commits ahead/behind remote"""
-        result = await self.shell.execute_command(
-            'git', 
-            ['rev-list', '--left-right', '--count', 'HEAD...@{upstream}'], 
-            cwd=repo_path
-        )
-        
-        if result.return_code == 0 and result.stdout.strip():
-            try:
-                ahead, behind = map(int, result.stdout.strip().split())
-                return {'ahead': ahead, 'behind': behind}
-            except:
-                pass
-        
-        return {'ahead': 0, 'behind': 0}
\ No newline at end of file
+        return find_git_dir(path) is not None
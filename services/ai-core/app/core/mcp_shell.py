@@ -3,12 +3,19 @@ NEXIA MCP Shell Server - Terminal/shell automation
 Provides secure shell access via MCP protocol
 """
 import asyncio
+import codecs
 import subprocess
 import logging
 import json
 import os
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional, Any
+from dataclasses import dataclass, replace
+from functools import partial
+
+from app.config import settings
+from app.core.command_cache import CommandCache, command_key
+from app.core.shell_scheduler import ExecutionScheduler
+from app.core.shell_workers import ShellWorkerPool, WorkerDied, WorkersBusy, kill_process_group
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +28,40 @@ class ShellResult:
     command: str
     execution_time: float
 
+
+class _BoundedText:
+    """Accumulates output up to nexia_shell_max_output_chars, then drops the rest"""
+    
+    def __init__(self, limit: int = None):
+        self.limit = limit or settings.nexia_shell_max_output_chars
+        self.parts: List[str] = []
+        self.size = 0
+        self.truncated = False
+    
+    def append(self, data: str):
+        room = self.limit - self.size
+        if len(data) > room:
+            data = data[:max(room, 0)]
+            self.truncated = True
+        if data:
+            self.parts.append(data)
+            self.size += len(data)
+    
+    def text(self) -> str:
+        text = "".join(self.parts)
+        return text + "\n[... output truncated]" if self.truncated else text
+
+
+def _exit_event(command: str, return_code: int, execution_time: float, timed_out: bool = False) -> Dict[str, Any]:
+    return {
+        "type": "exit",
+        "command": command,
+        "return_code": return_code,
+        "execution_time": execution_time,
+        "timed_out": timed_out
+    }
+
+
 class MCPShellServer:
     """MCP-compliant shell server for NEXIA"""
     
@@ -52,73 +93,237 @@ class MCPShellServer:
         
         self.current_directory = os.path.expanduser("~")
         self.max_execution_time = 30  # seconds
+        self.scheduler = ExecutionScheduler()
+        self.workers = ShellWorkerPool()
+        self.cache = CommandCache()
     
-    async def execute_command(self, command: str, args: List[str] = None, cwd: str = None) -> ShellResult:
-        """Execute shell command safely"""
-        start_time = asyncio.get_event_loop().time()
+    async def execute_command(
+        self,
+        command: str,
+        args: List[str] = None,
+        cwd: str = None,
+        session_id: Optional[str] = None,
+        priority: str = "interactive"
+    ) -> ShellResult:
+        """Execute shell command safely
         
-        # Security checks
-        if not self._is_command_allowed(command):
-            return ShellResult(
-                stdout="",
-                stderr=f"Command '{command}' is not allowed for security reasons",
-                return_code=1,
-                command=f"{command} {' '.join(args or [])}",
-                execution_time=0
+        With a session_id the command runs in the session's persistent shell
+        (its own cwd, `cd` persists); otherwise it is a buffered wrapper around
+        stream_command. Output is capped at nexia_shell_max_output_chars per
+        stream, and a timeout keeps the output read so far.
+        
+        Read-only commands (see command_cache.READ_ONLY_COMMANDS) are served
+        from a TTL cache, and identical concurrent calls share one execution.
+        """
+        if not self.cache.cacheable(command):
+            return await self._execute(command, args, cwd, session_id, priority)
+        
+        key = command_key(command, args or [], cwd or self.get_current_directory(session_id))
+        result = self.cache.get(key)
+        if result is None:
+            result, shared = await self.cache.inflight.do(
+                key, partial(self._execute, command, args, cwd, session_id, priority)
             )
+            if result.return_code == 0 and not shared:
+                self.cache.set(key, command, result)
+        # Callers may mutate their result
+        return replace(result)
+    
+    async def _execute(
+        self,
+        command: str,
+        args: Optional[List[str]],
+        cwd: Optional[str],
+        session_id: Optional[str],
+        priority: str
+    ) -> ShellResult:
+        if session_id is not None and settings.nexia_shell_workers_enabled and self._is_command_allowed(command):
+            async with self.scheduler.slot(session_id, priority):
+                try:
+                    return await self._execute_in_worker(command, args, cwd, session_id)
+                except WorkersBusy:
+                    # Worker cap reached under load: one-shot process in the session's directory
+                    cwd = cwd or self.workers.cwd(session_id)
         
-        # Prepare command
-        cmd_args = [command] + (args or [])
         work_dir = cwd or self.current_directory
+        output = {"stdout": _BoundedText(), "stderr": _BoundedText()}
+        exit_event: Dict[str, Any] = {}
+        
+        async for event in self.stream_command(
+            command, args, cwd=work_dir, session_id=session_id, priority=priority
+        ):
+            if event["type"] == "exit":
+                exit_event = event
+            else:
+                output[event["type"]].append(event["data"])
+        
+        if exit_event["timed_out"]:
+            output["stderr"].append(f"\nCommand timed out after {self.max_execution_time} seconds")
+        
+        # Update current directory if cd command
+        if command == 'cd' and exit_event["return_code"] == 0:
+            if args:
+                new_dir = os.path.abspath(os.path.join(work_dir, args[0]))
+                if os.path.exists(new_dir):
+                    self.current_directory = new_dir
+        
+        return ShellResult(
+            stdout=output["stdout"].text(),
+            stderr=output["stderr"].text(),
+            return_code=exit_event["return_code"],
+            command=exit_event["command"],
+            execution_time=exit_event["execution_time"]
+        )
+    
+    async def _execute_in_worker(
+        self,
+        command: str,
+        args: Optional[List[str]],
+        cwd: Optional[str],
+        session_id: str
+    ) -> ShellResult:
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
+        cmd_args = [command] + (args or [])
+        output = {"stdout": _BoundedText(), "stderr": _BoundedText()}
         
         try:
-            # Execute with timeout
-            process = await asyncio.create_subprocess_exec(
-                *cmd_args,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                cwd=work_dir
-            )
-            
-            stdout, stderr = await asyncio.wait_for(
-                process.communicate(),
-                timeout=self.max_execution_time
-            )
-            
-            execution_time = asyncio.get_event_loop().time() - start_time
-            
-            # Update current directory if cd command
-            if command == 'cd' and process.returncode == 0:
-                if args:
-                    new_dir = os.path.abspath(os.path.join(work_dir, args[0]))
-                    if os.path.exists(new_dir):
-                        self.current_directory = new_dir
-            
-            return ShellResult(
-                stdout=stdout.decode('utf-8', errors='ignore'),
-                stderr=stderr.decode('utf-8', errors='ignore'),
-                return_code=process.returncode,
-                command=' '.join(cmd_args),
-                execution_time=execution_time
+            result = await self.workers.run(
+                session_id, cmd_args, self.current_directory, self.max_execution_time, cwd=cwd
             )
-            
-        except asyncio.TimeoutError:
-            return ShellResult(
-                stdout="",
-                stderr=f"Command timed out after {self.max_execution_time} seconds",
-                return_code=124,
-                command=' '.join(cmd_args),
-                execution_time=self.max_execution_time
-            )
-        except Exception as e:
-            execution_time = asyncio.get_event_loop().time() - start_time
+        except (OSError, WorkerDied) as e:
             return ShellResult(
                 stdout="",
                 stderr=f"Execution error: {str(e)}",
                 return_code=1,
                 command=' '.join(cmd_args),
-                execution_time=execution_time
+                execution_time=loop.time() - start_time
             )
+        
+        output["stdout"].append(result.stdout.decode('utf-8', errors='ignore'))
+        output["stderr"].append(result.stderr.decode('utf-8', errors='ignore'))
+        output["stdout"].truncated |= result.truncated
+        if result.timed_out:
+            output["stderr"].append(f"\nCommand timed out after {self.max_execution_time} seconds")
+        
+        return ShellResult(
+            stdout=output["stdout"].text(),
+            stderr=output["stderr"].text(),
+            return_code=result.return_code,
+            command=' '.join(cmd_args),
+            execution_time=loop.time() - start_time
+        )
+    
+    async def stream_command(
+        self,
+        command: str,
+        args: List[str] = None,
+        cwd: str = None,
+        timeout: float = None,
+        session_id: Optional[str] = None,
+        priority: str = "interactive"
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Execute a command and yield its output as it is produced
+        
+        Yields {"type": "stdout"|"stderr", "data": ...} chunks, then a single
+        "exit" event. Pipe readers feed a bounded queue: a slow consumer stops
+        the reads and the child blocks on write, instead of output piling up in
+        memory. On timeout the command's process group is killed and the output
+        read so far is still delivered before the exit event.
+        
+        The command first waits for a scheduler slot (raises SchedulerBusy).
+        """
+        loop = asyncio.get_running_loop()
+        cmd_args = [command] + (args or [])
+        command_line = ' '.join(cmd_args)
+        timeout = timeout or self.max_execution_time
+        
+        # Security checks
+        if not self._is_command_allowed(command):
+            yield {"type": "stderr", "data": f"Command '{command}' is not allowed for security reasons"}
+            yield _exit_event(command_line, 1, 0)
+            return
+        
+        async with self.scheduler.slot(session_id, priority):
+            start_time = loop.time()
+            try:
+                # Own process group, so a timeout also kills whatever the command spawned
+                process = await asyncio.create_subprocess_exec(
+                    *cmd_args,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    cwd=cwd or self.current_directory,
+                    start_new_session=True
+                )
+            except Exception as e:
+                yield {"type": "stderr", "data": f"Execution error: {str(e)}"}
+                yield _exit_event(command_line, 1, loop.time() - start_time)
+                return
+            
+            queue: asyncio.Queue = asyncio.Queue(maxsize=settings.nexia_shell_stream_queue_size)
+            readers = [
+                asyncio.create_task(self._pump(process.stdout, "stdout", queue)),
+                asyncio.create_task(self._pump(process.stderr, "stderr", queue))
+            ]
+            deadline = start_time + timeout
+            open_streams = len(readers)
+            timed_out = False
+            finished = False
+            
+            try:
+                while open_streams:
+                    try:
+                        event = await asyncio.wait_for(queue.get(), max(deadline - loop.time(), 0))
+                    except asyncio.TimeoutError:
+                        timed_out = True
+                        break
+                    if event is None:
+                        open_streams -= 1
+                    else:
+                        yield event
+                
+                if not timed_out:
+                    # Pipes closed, the process may still be running (e.g. it closed its stdio)
+                    try:
+                        await asyncio.wait_for(process.wait(), max(deadline - loop.time(), 0))
+                    except asyncio.TimeoutError:
+                        timed_out = True
+                
+                if timed_out:
+                    logger.warning(f"Command timed out after {timeout}s, killing it: {command_line}")
+                    await kill_process_group(process)
+                    # Already read but not yet delivered
+                    while not queue.empty():
+                        event = queue.get_nowait()
+                        if event is not None:
+                            yield event
+                finished = True
+            finally:
+                for reader in readers:
+                    reader.cancel()
+                if not finished:
+                    # Consumer went away (client disconnected): don't leave the command running
+                    await kill_process_group(process)
+            
+            exit_event = _exit_event(
+                command_line,
+                124 if timed_out else process.returncode,
+                loop.time() - start_time,
+                timed_out=timed_out
+            )
+        yield exit_event
+    
+    async def _pump(self, stream: asyncio.StreamReader, name: str, queue: asyncio.Queue):
+        """Copy a pipe into the queue, decoding UTF-8 across chunk boundaries"""
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+        while True:
+            chunk = await stream.read(settings.nexia_shell_stream_chunk_size)
+            data = decoder.decode(chunk, final=not chunk)
+            if data:
+                await queue.put({"type": name, "data": data})
+            if not chunk:
+                break
+        await queue.put(None)
     
     def _is_command_allowed(self, command: str) -> bool:
         """Check if command is allowed"""
@@ -152,24 +357,27 @@ class MCPShellServer:
         return await self.execute_command('ps', ['aux'])
     
     async def get_system_info(self) -> Dict[str, Any]:
-        """Get system information"""
+        """Get system information
+        
+        The probes run concurrently and are cached (uname 1 h, df 30 s, free 5 s).
+        """
         info = {}
         
         # Current directory
         info['current_directory'] = self.current_directory
         
-        # System info
-        uname_result = await self.execute_command('uname', ['-a'])
+        uname_result, df_result, free_result = await asyncio.gather(
+            # System info
+            self.execute_command('uname', ['-a']),
+            # Disk usage
+            self.execute_command('df', ['-h']),
+            # Memory info (if available)
+            self.execute_command('free', ['-h'])
+        )
         if uname_result.return_code == 0:
             info['system'] = uname_result.stdout.strip()
-        
-        # Disk usage
-        df_result = await self.execute_command('df', ['-h'])
         if df_result.return_code == 0:
             info['disk_usage'] = df_result.stdout
-        
-        # Memory info (if available)
-        free_result = await self.execute_command('free', ['-h'])
         if free_result.return_code == 0:
             info['memory'] = free_result.stdout
         
@@ -179,6 +387,12 @@ class MCPShellServer:
         """Get list of allowed commands"""
         return list(self.allowed_commands)
     
-    def get_current_directory(self) -> str:
-        """Get current working directory"""
-        return self.current_directory
\ No newline at end of file
+    def get_current_directory(self, session_id: Optional[str] = None) -> str:
+        """Get current working directory (of the session's shell if it has one)"""
+        if session_id is not None:
+            return self.workers.cwd(session_id) or self.current_directory
+        return self.current_directory
+    
+    async def close(self):
+        """Stop the persistent shell workers"""
+        await self.workers.close()
\ No newline at end of file
@@ -0,0 +1,221 @@
+"""
+Mode registry - Nexia modes loaded from a directory of JSON/YAML files
+Definitions are validated once per change, and the directory is polled so new
+or edited modes go live without restarting workers. Every definition gets a
+content-hash version; recent versions are kept so sessions can stay on the
+version they started with.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import re
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Pattern, Tuple
+
+from app.config import settings
+from app.core.modes import NexiaMode
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+logger = logging.getLogger(__name__)
+
+MODES_DIR = Path(__file__).resolve().parent.parent / "modes"
+
+_MODE_ID = re.compile(r"^[a-z][a-z0-9_]{0,63}$")
+
+ModesListener = Callable[[Dict[str, NexiaMode]], None]
+
+
+class ModeRegistryError(Exception):
+    """A mode definition is missing or invalid"""
+
+
+def _string_list(value: Any, field_name: str, source: str) -> List[str]:
+    if not isinstance(value, list) or not all(isinstance(item, str) and item for item in value):
+        raise ModeRegistryError(f"{source}: '{field_name}' must be a list of non-empty strings")
+    return value
+
+
+def validate_mode(data: Any, source: str) -> NexiaMode:
+    """Build a NexiaMode from a parsed definition, or raise ModeRegistryError"""
+    if not isinstance(data, dict):
+        raise ModeRegistryError(f"{source}: a mode definition must be an object")
+    for field_name in ("id", "name", "description", "system_prompt"):
+        if not isinstance(data.get(field_name), str) or not data[field_name].strip():
+            raise ModeRegistryError(f"{source}: '{field_name}' is required and must be a string")
+    if not _MODE_ID.match(data["id"]):
+        raise ModeRegistryError(f"{source}: invalid mode id '{data['id']}'")
+
+    actions = data.get("actions", {})
+    if not isinstance(actions, dict):
+        raise ModeRegistryError(f"{source}: 'actions' must map action names to keyword lists")
+    for action, keywords in actions.items():
+        _string_list(keywords, f"actions.{action}", source)
+
+    canonical = json.dumps(data, ensure_ascii=False, sort_keys=True)
+    return NexiaMode(
+        id=data["id"],
+        name=data["name"],
+        description=data["description"],
+        capabilities=_string_list(data.get("capabilities", []), "capabilities", source),
+        system_prompt=data["system_prompt"],
+        actions={action: [keyword.lower() for keyword in keywords] for action, keywords in actions.items()},
+        version=hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:12]
+    )
+
+
+def compile_action_matchers(mode: NexiaMode) -> Dict[str, Optional[Pattern]]:
+    """One regex per action over the lowercased message; None means always"""
+    return {
+        action: re.compile("|".join(re.escape(keyword) for keyword in keywords)) if keywords else None
+        for action, keywords in mode.actions.items()
+    }
+
+
+class ModeRegistry:
+    """Current modes plus recently replaced versions"""
+
+    def __init__(self, directory: Optional[Path] = None, history_size: int = 100):
+        self.directory = Path(directory or settings.nexia_modes_dir or MODES_DIR)
+        self.modes: Dict[str, NexiaMode] = {}
+        # (mode_id, version) -> mode, oldest first
+        self._history: "OrderedDict[Tuple[str, str], NexiaMode]" = OrderedDict()
+        self.history_size = history_size
+        self._stamp: Optional[tuple] = None
+        self._listeners: List[ModesListener] = []
+        self._task: Optional[asyncio.Task] = None
+        self.counters = {"reloads": 0, "failed_reloads": 0}
+        self.last_error: Optional[str] = None
+        # Invalid modes at startup are fatal, later they only keep the previous set
+        self._apply(*self._read_all())
+
+    def _scan(self) -> tuple:
+        """Cheap change detector: (name, mtime, size) of every definition file"""
+        entries = []
+        for path in sorted(self.directory.iterdir()):
+            if path.suffix in (".json", ".yaml", ".yml"):
+                stat = path.stat()
+                entries.append((path.name, stat.st_mtime_ns, stat.st_size))
+        return tuple(entries)
+
+    def _parse(self, path: Path) -> Any:
+        text = path.read_text(encoding="utf-8")
+        try:
+            if path.suffix == ".json":
+                return json.loads(text)
+            if yaml is None:
+                raise ModeRegistryError(f"{path.name}: PyYAML is not installed, use JSON")
+            return yaml.safe_load(text)
+        except (ValueError, getattr(yaml, "YAMLError", ValueError)) as e:
+            raise ModeRegistryError(f"{path.name}: {e}") from e
+
+    def _read_all(self) -> Tuple[Dict[str, NexiaMode], tuple]:
+        """Parse and validate the whole directory (all or nothing)"""
+        if not self.directory.is_dir():
+            raise ModeRegistryError(f"Modes directory not found: {self.directory}")
+        stamp = self._scan()
+        modes: Dict[str, NexiaMode] = {}
+        for name, _, _ in stamp:
+            mode = validate_mode(self._parse(self.directory / name), name)
+            if mode.id in modes:
+                raise ModeRegistryError(f"{name}: duplicate mode id '{mode.id}'")
+            modes[mode.id] = mode
+        if settings.nexia_default_mode not in modes:
+            raise ModeRegistryError(f"Default mode '{settings.nexia_default_mode}' is not defined")
+        return modes, stamp
+
+    def _apply(self, modes: Dict[str, NexiaMode], stamp: tuple):
+        changed = [mode_id for mode_id, mode in modes.items()
+                   if mode.version != getattr(self.modes.get(mode_id), "version", None)]
+        removed = set(self.modes) - set(modes)
+        self._stamp = stamp
+        if not changed and not removed:
+            return
+
+        for mode in modes.values():
+            self._history[(mode.id, mode.version)] = mode
+            self._history.move_to_end((mode.id, mode.version))
+        while len(self._history) > self.history_size:
+            self._history.popitem(last=False)
+
+        self.modes = modes
+        logger.info(f"Loaded {len(modes)} modes from {self.directory} "
+                    f"(changed: {', '.join(changed) or '-'}, removed: {', '.join(removed) or '-'})")
+        for listener in list(self._listeners):
+            try:
+                listener(modes)
+            except Exception as e:
+                logger.error(f"Modes listener failed: {e}")
+
+    async def reload(self) -> bool:
+        """Reload if any definition changed; invalid changes keep the current modes"""
+        try:
+            stamp = await asyncio.to_thread(self._scan)
+            if stamp == self._stamp:
+                return False
+            modes, stamp = await asyncio.to_thread(self._read_all)
+        except (ModeRegistryError, OSError) as e:
+            self.counters["failed_reloads"] += 1
+            self.last_error = str(e)
+            logger.error(f"Mode reload rejected, keeping current modes: {e}")
+            return False
+        self.last_error = None
+        self.counters["reloads"] += 1
+        self._apply(modes, stamp)
+        return True
+
+    def get(self, mode_id: str, version: Optional[str] = None) -> Optional[NexiaMode]:
+        """A mode, at a given version if it is still known"""
+        if version is None:
+            return self.modes.get(mode_id)
+        return self._history.get((mode_id, version))
+
+    def subscribe(self, listener: ModesListener):
+        """Call listener(modes) whenever the set of modes changes"""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: ModesListener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    async def _watch(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            await self.reload()
+
+    def start_watching(self, interval: float = None):
+        interval = interval if interval is not None else settings.nexia_modes_reload_interval
+        if interval > 0 and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._watch(interval))
+
+    async def stop_watching(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "directory": str(self.directory),
+            "modes": {mode_id: mode.version for mode_id, mode in self.modes.items()},
+            "versions_kept": len(self._history),
+            "watching": self._task is not None and not self._task.done(),
+            "last_error": self.last_error,
+            **self.counters
+        }
+
+
+mode_registry: Optional[ModeRegistry] = None
+
+
+def get_mode_registry() -> ModeRegistry:
+    """Get the process-wide mode registry, loading it on first use"""
+    global mode_registry
+    if mode_registry is None:
+        mode_registry = ModeRegistry()
+    return mode_registry
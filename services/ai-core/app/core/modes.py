@@ -1,8 +1,10 @@
 """
 Nexia Modes Definition
+Modes are data: one JSON (or YAML) file per mode in app/modes/, loaded and
+hot-reloaded by app.core.mode_registry.
 """
-from dataclasses import dataclass
-from typing import List
+from dataclasses import dataclass, field
+from typing import Dict, List
 
 
 @dataclass
@@ -13,84 +15,7 @@ class NexiaMode:
     description: str
     capabilities: List[str]
     system_prompt: str
-
-
-# Define available modes
-AVAILABLE_MODES = {
-    "focus_guardian": NexiaMode(
-        id="focus_guardian",
-        name="Focus Guardian",
-        description="Mode spécialisé pour la gestion du TDAH et la protection de la concentration",
-        capabilities=[
-            "Protection contre les distractions",
-            "Parking automatique des idées",
-            "Gestion des interruptions",
-            "Rappels de deadlines et priorités",
-            "Techniques de time-boxing"
-        ],
-        system_prompt="""Tu es en mode Focus Guardian. Ton rôle est d'aider l'utilisateur à maintenir sa concentration.
-        - Détecte les distractions et propose de les parquer
-        - Rappelle les objectifs de la session
-        - Utilise des techniques de time-boxing
-        - Sois bref et direct dans tes réponses
-        - Encourage la progression vers l'objectif"""
-    ),
-    
-    "opportunity_hunter": NexiaMode(
-        id="opportunity_hunter",
-        name="Opportunity Hunter",
-        description="Mode business pour détecter et analyser les opportunités",
-        capabilities=[
-            "Scan du marché",
-            "Détection de pain points",
-            "Analyse de gaps concurrentiels",
-            "Suggestions de projets innovants",
-            "Validation d'idées business"
-        ],
-        system_prompt="""Tu es en mode Opportunity Hunter. Ton rôle est de détecter des opportunités business.
-        - Analyse chaque information sous l'angle business
-        - Identifie les pain points et besoins non satisfaits
-        - Propose des angles d'approche innovants
-        - Quantifie le potentiel des opportunités
-        - Connecte les idées entre elles"""
-    ),
-    
-    "project_assistant": NexiaMode(
-        id="project_assistant",
-        name="Project Assistant",
-        description="Assistant opérationnel pour gérer tes projets en cours",
-        capabilities=[
-            "Suivi des projets actifs",
-            "Gestion des tâches et deadlines",
-            "Interface avec Git et CI/CD",
-            "Monitoring des métriques projets",
-            "Aide à la prise de décision technique"
-        ],
-        system_prompt="""Tu es Project Assistant. Ton rôle est d'être opérationnellement utile.
-        - Garde un œil sur les projets en cours
-        - Rappelle les deadlines importantes
-        - Propose des actions concrètes
-        - Aide à prioriser les tâches
-        - Connecte les informations entre projets
-        - Reste pratique et actionnable"""
-    ),
-    
-    "socratic_challenger": NexiaMode(
-        id="socratic_challenger",
-        name="Socratic Challenger",
-        description="Mode de réflexion profonde et de challenge constructif",
-        capabilities=[
-            "Questions challengeantes",
-            "Amplification 10x des idées",
-            "Remise en perspective",
-            "Identification des angles morts",
-            "Validation rigoureuse des concepts"
-        ],
-        system_prompt="""Tu es en mode Socratic Challenger. Ton rôle est de challenger constructivement.
-        - Pose des questions qui font réfléchir
-        - Challenge les assumptions
-        - Pousse à voir plus grand (10x thinking)
-        - Identifie les failles dans le raisonnement
-        - Reste bienveillant et constructif"""
-    )
-}
+    # action name -> trigger keywords (an empty list always triggers)
+    actions: Dict[str, List[str]] = field(default_factory=dict)
+    # Content hash of the definition, sessions stay on the version they started with
+    version: str = ""
@@ -0,0 +1,83 @@
+"""
+System prompt templates for Nexia modes
+The mode part of the prompt is compiled once per mode; only the user context
+section is rendered per message.
+"""
+import json
+from typing import Dict, Any
+
+from app.config import settings
+from app.core.modes import NexiaMode
+
+SYSTEM_PROMPT_TEMPLATE = """Tu es Nexia, un assistant IA spécialisé pour les entrepreneurs TDAH.
+
+Mode actuel: {name}
+Description: {description}
+
+Capacités spécifiques:
+{capabilities}
+
+Instructions: {system_prompt}
+
+Contexte utilisateur: """
+
+MAX_CONTEXT_DEPTH = 4
+MAX_CONTEXT_ITEMS = 25
+MAX_CONTEXT_STRING = 500
+
+# Reused encoder: json.dumps() builds a new JSONEncoder on every call
+_CONTEXT_ENCODER = json.JSONEncoder(ensure_ascii=False, sort_keys=True, default=str)
+
+
+def compile_mode_prompt(mode: NexiaMode) -> str:
+    """Render the static, per-mode part of the system prompt"""
+    return SYSTEM_PROMPT_TEMPLATE.format(
+        name=mode.name,
+        description=mode.description,
+        capabilities="\n".join(f"- {cap}" for cap in mode.capabilities),
+        system_prompt=mode.system_prompt
+    )
+
+
+def compile_mode_prompts(modes: Dict[str, NexiaMode]) -> Dict[str, str]:
+    """Compile the prompt prefix of every mode"""
+    return {mode_id: compile_mode_prompt(mode) for mode_id, mode in modes.items()}
+
+
+def _bound(value: Any, depth: int = 0) -> Any:
+    """Clamp nesting, collection sizes and string lengths of a context value"""
+    if isinstance(value, str):
+        return value if len(value) <= MAX_CONTEXT_STRING else value[:MAX_CONTEXT_STRING] + "…"
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if depth >= MAX_CONTEXT_DEPTH:
+        return "…"
+    if isinstance(value, dict):
+        items = sorted(value.items(), key=lambda item: str(item[0]))[:MAX_CONTEXT_ITEMS]
+        return {str(key): _bound(item, depth + 1) for key, item in items}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = sorted(value, key=str) if isinstance(value, (set, frozenset)) else value
+        return [_bound(item, depth + 1) for item in list(items)[:MAX_CONTEXT_ITEMS]]
+    return _bound(str(value), depth)
+
+
+def render_context(context: Dict[str, Any], max_chars: int = None) -> str:
+    """Serialize the user context deterministically and within a size budget"""
+    if not context:
+        return "{}"
+    max_chars = max_chars or settings.nexia_prompt_context_max_chars
+    try:
+        # Fast path: typical contexts are small, flat and JSON-friendly
+        rendered = _CONTEXT_ENCODER.encode(context)
+    except (TypeError, ValueError):
+        rendered = None
+    if rendered is None or len(rendered) > max_chars:
+        rendered = _CONTEXT_ENCODER.encode(_bound(context))
+    if len(rendered) > max_chars:
+        rendered = rendered[:max_chars] + "…"
+    return rendered
+
+
+def build_system_prompt(prefix: str, context: Dict[str, Any]) -> str:
+    """Append the rendered user context to a compiled mode prompt"""
+    return f"{prefix}{render_context(context)}\n"
@@ -0,0 +1,138 @@
+"""
+Readiness tracking for Kubernetes probes
+Liveness only says the process is up; readiness is granted once a warmup
+stage has primed every dependency, so traffic only reaches instances that
+answer at full speed.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.config import settings
+from app.core import redis_client
+from app.core.database import database_enabled, ping_db
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+WARMING = "warming"
+READY = "ready"
+FAILED = "failed"
+
+
+class Readiness:
+    """Warmup stage and per-dependency check results for one worker"""
+
+    def __init__(self):
+        self.stage = PENDING
+        self.checks: Dict[str, Dict[str, Any]] = {}
+        self.started_at: Optional[datetime] = None
+        self.completed_at: Optional[datetime] = None
+
+    async def _check(
+        self,
+        name: str,
+        check: Callable[[], Awaitable[Any]],
+        required: bool
+    ) -> Dict[str, Any]:
+        """Run one check with a timeout and record its latency"""
+        started = time.monotonic()
+        result = {"ok": False, "required": required}
+        try:
+            detail = await asyncio.wait_for(check(), timeout=settings.nexia_warmup_check_timeout)
+            result["ok"] = True
+            if detail is not None:
+                result["detail"] = detail
+        except asyncio.TimeoutError:
+            result["error"] = f"timed out after {settings.nexia_warmup_check_timeout}s"
+        except Exception as e:
+            result["error"] = str(e)
+        result["latency_ms"] = round((time.monotonic() - started) * 1000, 1)
+
+        if not result["ok"]:
+            log = logger.error if required else logger.warning
+            log(f"Readiness check {name} failed: {result['error']}")
+        self.checks[name] = result
+        return result
+
+    async def _check_database(self):
+        if not database_enabled():
+            return "skipped"
+        # Opens the first pooled connection so requests don't pay for it
+        await ping_db()
+
+    async def _check_redis(self):
+        if redis_client.redis_client is None:
+            if settings.nexia_horizontal_scaling:
+                raise RuntimeError("Redis not connected")
+            return "skipped"
+        await redis_client.redis_client.ping()
+
+    def _database_required(self) -> bool:
+        # init_db tolerates a missing database in development
+        return database_enabled() and settings.environment != "development"
+
+    async def warmup(self, engine) -> bool:
+        """Prime every dependency; the worker is ready when all required checks pass"""
+        self.stage = WARMING
+        self.started_at = datetime.now()
+        logger.info("Readiness warmup started")
+
+        async def browser_pool():
+            if not settings.nexia_warmup_browser:
+                return "skipped"
+            pool = engine.claude_bridge.pool
+            return {"warm_pages": await pool.warmup(), "size": pool.size}
+
+        async def prompts():
+            missing = set(engine.modes) - set(engine.mode_prompts)
+            if missing:
+                raise RuntimeError(f"Prompts not compiled for modes: {', '.join(sorted(missing))}")
+            return {"modes": len(engine.mode_prompts)}
+
+        async def fallback():
+            mode = engine.modes[settings.nexia_default_mode]
+            engine._build_system_prompt(mode, {})
+            if not engine._get_fallback_response("warmup", mode):
+                raise RuntimeError("Empty fallback response")
+
+        await asyncio.gather(
+            self._check("database", self._check_database, self._database_required()),
+            self._check("redis", self._check_redis, settings.nexia_horizontal_scaling),
+            self._check("browser_pool", browser_pool, required=False),
+            self._check("prompts", prompts, required=True),
+            self._check("fallback_response", fallback, required=True)
+        )
+
+        self.completed_at = datetime.now()
+        self.stage = READY if self._required_ok() else FAILED
+        elapsed = (self.completed_at - self.started_at).total_seconds()
+        logger.info(f"Readiness warmup finished in {elapsed:.1f}s: {self.stage}")
+        return self.stage == READY
+
+    def _required_ok(self) -> bool:
+        return all(check["ok"] for check in self.checks.values() if check["required"])
+
+    async def refresh(self) -> bool:
+        """Re-ping the network dependencies once warmup is over"""
+        if self.stage not in (READY, FAILED):
+            return False
+        await asyncio.gather(
+            self._check("database", self._check_database, self._database_required()),
+            self._check("redis", self._check_redis, settings.nexia_horizontal_scaling)
+        )
+        self.stage = READY if self._required_ok() else FAILED
+        return self.stage == READY
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "stage": self.stage,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "completed_at": self.completed_at.isoformat() if self.completed_at else None,
+            "checks": self.checks
+        }
+
+
+readiness = Readiness()
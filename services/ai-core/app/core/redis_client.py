@@ -17,7 +17,7 @@ async def init_redis():
     global redis_client
     try:
         # Pour le développement local, on skip Redis
-        if "platform-pool" in settings.redis_url:
+        if "//platform-pool:" in settings.redis_url:
             logger.info("Skipping Redis connection for local development")
             return
             
@@ -0,0 +1,119 @@
+"""
+Exact-match response cache for NexiaEngine
+Identical prompts (same mode, same system prompt, same normalized message)
+are answered from memory, with an optional shared Redis tier.
+"""
+import hashlib
+import logging
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_message(message: str) -> str:
+    """Normalize a user message so trivially different spellings share a key"""
+    normalized = unicodedata.normalize("NFKC", message).casefold()
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+def make_cache_key(mode_id: str, system_prompt: str, message: str, history: str = "") -> str:
+    """Hash the inputs that fully determine an answer"""
+    digest = hashlib.sha256()
+    for part in (mode_id, system_prompt, normalize_message(message), history):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    """LRU of LLM responses with per-mode TTLs and an optional Redis tier"""
+
+    key_prefix = "nexia:response:"
+
+    def __init__(
+        self,
+        max_entries: int = None,
+        default_ttl: int = None,
+        mode_ttls: Dict[str, int] = None,
+        redis=None
+    ):
+        self.max_entries = max_entries or settings.nexia_response_cache_max_entries
+        self.default_ttl = default_ttl or settings.nexia_response_cache_default_ttl
+        self.mode_ttls = mode_ttls if mode_ttls is not None else settings.nexia_response_cache_ttls
+        self.redis = redis
+        # key -> (expires_at, response), least recently used first
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self.counters = {"hits": 0, "misses": 0, "redis_hits": 0, "stores": 0}
+
+    def ttl_for(self, mode_id: str) -> int:
+        return self.mode_ttls.get(mode_id, self.default_ttl)
+
+    def _remember(self, key: str, response: str, ttl: int):
+        self._entries[key] = (time.monotonic() + ttl, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[str]:
+        """Get a cached response, checking memory then Redis"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, response = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.counters["hits"] += 1
+                return response
+            del self._entries[key]
+
+        if self.redis is not None:
+            try:
+                redis_key = self.key_prefix + key
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    pipe.get(redis_key)
+                    pipe.ttl(redis_key)
+                    response, ttl = await pipe.execute()
+                if response is not None:
+                    self._remember(key, response, max(ttl, 1))
+                    self.counters["hits"] += 1
+                    self.counters["redis_hits"] += 1
+                    return response
+            except Exception as e:
+                logger.warning(f"Response cache Redis read failed: {e}")
+
+        self.counters["misses"] += 1
+        return None
+
+    async def set(self, key: str, response: str, mode_id: str):
+        """Cache a response for its mode's TTL"""
+        ttl = self.ttl_for(mode_id)
+        if ttl <= 0:
+            return
+        self._remember(key, response, ttl)
+        self.counters["stores"] += 1
+
+        if self.redis is not None:
+            try:
+                await self.redis.set(self.key_prefix + key, response, ex=ttl)
+            except Exception as e:
+                logger.warning(f"Response cache Redis write failed: {e}")
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.counters["hits"] + self.counters["misses"]
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "redis_tier": self.redis is not None,
+            "hit_rate": round(self.counters["hits"] / lookups, 3) if lookups else 0.0,
+            **self.counters
+        }
@@ -0,0 +1,213 @@
+"""
+Session storage for NexiaEngine
+In-memory LRU+TTL store for single-process use, Redis store for sharing
+sessions between workers and pods.
+"""
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+
+from app.config import settings
+from app.core import redis_client
+from app.models.conversation import Session
+
+logger = logging.getLogger(__name__)
+
+
+class SessionStore(ABC):
+    """Storage backend for conversation sessions"""
+
+    backend = "abstract"
+
+    def __init__(self, ttl: int = None):
+        self.ttl = ttl or settings.nexia_session_timeout
+
+    @abstractmethod
+    async def get(self, session_id: str) -> Optional[Session]:
+        """Get a session and refresh its expiry"""
+
+    @abstractmethod
+    async def save(self, session: Session):
+        """Create or update a session"""
+
+    @abstractmethod
+    async def delete(self, session_id: str):
+        """Remove a session"""
+
+    @abstractmethod
+    async def set_mode(self, session_id: str, mode: str) -> Optional[str]:
+        """Change only a session's mode; returns the previous mode, None if there is no session"""
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.backend, "ttl": self.ttl}
+
+
+class InMemorySessionStore(SessionStore):
+    """Bounded LRU of sessions with a sliding TTL"""
+
+    backend = "memory"
+
+    def __init__(self, ttl: int = None, max_entries: int = None):
+        super().__init__(ttl)
+        self.max_entries = max_entries or settings.nexia_session_max_entries
+        # session_id -> (expires_at, session), least recently used first.
+        # The TTL slides on every access so this is also expiry order.
+        self._sessions: "OrderedDict[str, Tuple[float, Session]]" = OrderedDict()
+
+    def _purge_expired(self, now: float):
+        while self._sessions:
+            session_id, (expires_at, _) = next(iter(self._sessions.items()))
+            if expires_at > now:
+                break
+            del self._sessions[session_id]
+
+    async def get(self, session_id: str) -> Optional[Session]:
+        now = time.monotonic()
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+        expires_at, session = entry
+        if expires_at <= now:
+            del self._sessions[session_id]
+            return None
+        self._sessions[session_id] = (now + self.ttl, session)
+        self._sessions.move_to_end(session_id)
+        return session
+
+    async def save(self, session: Session):
+        now = time.monotonic()
+        self._sessions[session.id] = (now + self.ttl, session)
+        self._sessions.move_to_end(session.id)
+        self._purge_expired(now)
+        while len(self._sessions) > self.max_entries:
+            self._sessions.popitem(last=False)
+
+    async def delete(self, session_id: str):
+        self._sessions.pop(session_id, None)
+
+    async def set_mode(self, session_id: str, mode: str) -> Optional[str]:
+        session = await self.get(session_id)
+        if session is None:
+            return None
+        previous, session.mode = session.mode, mode
+        session.mode_version = None
+        return previous
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **super().stats(),
+            "sessions": len(self._sessions),
+            "max_entries": self.max_entries
+        }
+
+
+# Atomic: never recreates a session that expired in the meantime
+SET_MODE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return false
+end
+local previous = redis.call('HGET', KEYS[1], 'mode')
+redis.call('HSET', KEYS[1], 'mode', ARGV[1])
+redis.call('HDEL', KEYS[1], 'mode_version')
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return previous
+"""
+
+# Atomic: the mode belongs to set_mode, a save only writes it for a new session
+# and pins mode_version only while the stored mode is still the one it was read with
+SAVE_SCRIPT = """
+redis.call('HSET', KEYS[1], 'id', ARGV[1], 'created_at', ARGV[2], 'context', ARGV[5])
+redis.call('HSETNX', KEYS[1], 'mode', ARGV[3])
+if ARGV[4] ~= '' and redis.call('HGET', KEYS[1], 'mode') == ARGV[3] then
+    redis.call('HSETNX', KEYS[1], 'mode_version', ARGV[4])
+end
+redis.call('EXPIRE', KEYS[1], ARGV[6])
+return 1
+"""
+
+
+class RedisSessionStore(SessionStore):
+    """One Redis hash per session, expiring after the session timeout"""
+
+    backend = "redis"
+    key_prefix = "nexia:session:"
+
+    def __init__(self, client, ttl: int = None):
+        super().__init__(ttl)
+        self.client = client
+        self._set_mode_script = client.register_script(SET_MODE_SCRIPT)
+        self._save_script = client.register_script(SAVE_SCRIPT)
+
+    def _key(self, session_id: str) -> str:
+        return f"{self.key_prefix}{session_id}"
+
+    def _serialize(self, session: Session) -> Dict[str, str]:
+        return {
+            "id": session.id,
+            "created_at": session.created_at.isoformat(),
+            "mode": session.mode,
+            "mode_version": session.mode_version or "",
+            "context": json.dumps(session.context, ensure_ascii=False, default=str)
+        }
+
+    def _deserialize(self, data: Dict[str, str]) -> Session:
+        return Session(
+            id=data["id"],
+            created_at=datetime.fromisoformat(data["created_at"]),
+            mode=data.get("mode") or settings.nexia_default_mode,
+            mode_version=data.get("mode_version") or None,
+            context=json.loads(data.get("context") or "{}")
+        )
+
+    async def get(self, session_id: str) -> Optional[Session]:
+        key = self._key(session_id)
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.hgetall(key)
+            pipe.expire(key, self.ttl)
+            data, _ = await pipe.execute()
+        if not data:
+            return None
+        return self._deserialize(data)
+
+    async def save(self, session: Session):
+        # A turn saves the session it loaded before calling the LLM; a mode
+        # switch made in the meantime must survive it
+        data = self._serialize(session)
+        await self._save_script(
+            keys=[self._key(session.id)],
+            args=[data["id"], data["created_at"], data["mode"], data["mode_version"], data["context"], self.ttl]
+        )
+
+    async def delete(self, session_id: str):
+        await self.client.delete(self._key(session_id))
+
+    async def set_mode(self, session_id: str, mode: str) -> Optional[str]:
+        # Single field update, the context is neither read nor rewritten
+        previous = await self._set_mode_script(keys=[self._key(session_id)], args=[mode, self.ttl])
+        return previous or None
+
+
+session_store: Optional[SessionStore] = None
+
+
+def get_session_store() -> SessionStore:
+    """Get the session store selected by settings.nexia_session_store"""
+    global session_store
+    if session_store is None:
+        backend = settings.nexia_session_store
+        client = redis_client.redis_client
+        if settings.nexia_horizontal_scaling:
+            backend = "redis"
+
+        if backend == "redis" or (backend == "auto" and client is not None):
+            if client is None:
+                raise RuntimeError("nexia_session_store=redis but Redis is not connected")
+            session_store = RedisSessionStore(client)
+        else:
+            session_store = InMemorySessionStore()
+        logger.info(f"Using {session_store.backend} session store")
+    return session_store
@@ -0,0 +1,142 @@
+"""
+Local settings repository (~/.nexia/settings.json)
+The parsed file is cached in memory and only re-read when its mtime changes,
+which is checked at most once per stat_interval.
+Writes go through a temp file + rename off the event loop, and subscribers are
+told which keys changed.
+"""
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Stockage local des clés en développement
+SETTINGS_FILE = Path.home() / ".nexia" / "settings.json"
+
+SettingsListener = Callable[[Set[str]], None]
+
+
+def _changed_keys(old: Dict[str, Any], new: Dict[str, Any]) -> Set[str]:
+    return {key for key in old.keys() | new.keys() if old.get(key) != new.get(key)}
+
+
+class SettingsRepository:
+    """Cached, atomically written view of the local settings file"""
+
+    def __init__(self, path: Path = SETTINGS_FILE, stat_interval: float = 1.0):
+        self.path = path
+        self.stat_interval = stat_interval
+        self._data: Dict[str, Any] = {}
+        # (mtime_ns, size) of the file the cache was loaded from
+        self._stamp: Optional[Tuple[int, int]] = None
+        # monotonic time of the last stat, so load() doesn't hit the disk on every request
+        self._checked_at = 0.0
+        self._loaded = False
+        self._write_lock = asyncio.Lock()
+        self._listeners: List[SettingsListener] = []
+
+    def subscribe(self, listener: SettingsListener):
+        """Call listener(changed_keys) whenever the settings change"""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: SettingsListener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, changed: Set[str]):
+        if not changed:
+            return
+        for listener in list(self._listeners):
+            try:
+                listener(changed)
+            except Exception as e:
+                logger.error(f"Settings listener failed: {e}")
+
+    def _file_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not read {self.path}: {e}")
+            return dict(self._data)
+        return data if isinstance(data, dict) else {}
+
+    def _write(self, data: Dict[str, Any]):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=".settings-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            # The file holds API keys
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+    def _refresh(self, stamp: Optional[Tuple[int, int]], data: Dict[str, Any]):
+        changed = _changed_keys(self._data, data) if self._loaded else set()
+        self._data = data
+        self._stamp = stamp
+        self._checked_at = time.monotonic()
+        self._loaded = True
+        self._notify(changed)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Synchronous read for startup code; served from cache once loaded"""
+        if not self._loaded:
+            stamp = self._file_stamp()
+            self._refresh(stamp, self._read())
+        return dict(self._data)
+
+    async def load(self) -> Dict[str, Any]:
+        """Current settings; the file is only re-read when it changed on disk"""
+        if not self._loaded or time.monotonic() - self._checked_at >= self.stat_interval:
+            await self._reload_if_changed()
+        return dict(self._data)
+
+    async def _reload_if_changed(self):
+        stamp = self._file_stamp()
+        self._checked_at = time.monotonic()
+        if not self._loaded or stamp != self._stamp:
+            data = await asyncio.to_thread(self._read)
+            self._refresh(stamp, data)
+
+    async def update(self, changes: Dict[str, Any]) -> Dict[str, Any]:
+        """Merge changes into the settings and persist them atomically"""
+        async with self._write_lock:
+            # Always stat here, changes must merge into what is on disk
+            await self._reload_if_changed()
+            current = dict(self._data)
+            data = {**current, **changes}
+            changed = _changed_keys(current, data)
+            if changed:
+                await asyncio.to_thread(self._write, data)
+                self._data = data
+                self._stamp = self._file_stamp()
+                self._checked_at = time.monotonic()
+                self._notify(changed)
+            return dict(data)
+
+
+settings_repository = SettingsRepository()
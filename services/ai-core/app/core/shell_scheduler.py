@@ -0,0 +1,140 @@
+"""
+Shell execution scheduler - bounded concurrency for MCP shell commands
+A global limit and a per-session limit on running commands. Commands over the
+limits wait in a priority queue (interactive before background, FIFO within a
+priority) and are rejected once the queue is full.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.core.llm_router import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+PRIORITIES = {"interactive": 0, "background": 1}
+
+
+class SchedulerBusy(Exception):
+    """The command could not get an execution slot (queue full or wait timed out)"""
+
+
+class ExecutionScheduler:
+    """Admission control for shell commands"""
+
+    def __init__(
+        self,
+        max_concurrent: int = None,
+        max_per_session: int = None,
+        max_queued: int = None,
+        queue_timeout: float = None
+    ):
+        self.max_concurrent = max_concurrent or settings.nexia_shell_max_concurrent
+        self.max_per_session = max_per_session or settings.nexia_shell_max_per_session
+        self.max_queued = max_queued if max_queued is not None else settings.nexia_shell_max_queued
+        self.queue_timeout = queue_timeout or settings.nexia_shell_queue_timeout
+        self.running = 0
+        self._per_session: Dict[str, int] = defaultdict(int)
+        # (priority, seq, session_id, future); cancelled entries are skipped lazily
+        self._waiters: List[Tuple[int, int, Optional[str], asyncio.Future]] = []
+        self._queued = 0
+        self._seq = itertools.count()
+        self.wait_times = {name: LatencyHistogram() for name in PRIORITIES}
+        self.counters = {"started": 0, "queued": 0, "rejected": 0, "queue_timeouts": 0}
+
+    def _has_room(self, session_id: Optional[str]) -> bool:
+        if self.running >= self.max_concurrent:
+            return False
+        return session_id is None or self._per_session.get(session_id, 0) < self.max_per_session
+
+    def _take(self, session_id: Optional[str]):
+        self.running += 1
+        if session_id is not None:
+            self._per_session[session_id] += 1
+
+    def _release(self, session_id: Optional[str]):
+        self.running -= 1
+        if session_id is not None:
+            self._per_session[session_id] -= 1
+            if not self._per_session[session_id]:
+                del self._per_session[session_id]
+        self._dispatch()
+
+    def _dispatch(self):
+        """Hand free slots to the best waiters whose session is under its limit"""
+        skipped = []
+        while self._waiters and self.running < self.max_concurrent:
+            entry = heapq.heappop(self._waiters)
+            _, _, session_id, future = entry
+            if future.done():
+                continue
+            if not self._has_room(session_id):
+                skipped.append(entry)
+                continue
+            self._queued -= 1
+            self._take(session_id)
+            future.set_result(None)
+        for entry in skipped:
+            heapq.heappush(self._waiters, entry)
+
+    @asynccontextmanager
+    async def slot(self, session_id: Optional[str] = None, priority: str = "interactive") -> AsyncIterator[None]:
+        """Hold an execution slot for the duration of the block
+
+        Raises SchedulerBusy when the queue is full or the wait exceeds
+        nexia_shell_queue_timeout.
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority}")
+        queued_at = time.monotonic()
+
+        if self._has_room(session_id) and not self._queued:
+            self._take(session_id)
+        else:
+            if self._queued >= self.max_queued:
+                self.counters["rejected"] += 1
+                raise SchedulerBusy(f"Shell queue is full ({self._queued} commands waiting)")
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (PRIORITIES[priority], next(self._seq), session_id, future))
+            self._queued += 1
+            self.counters["queued"] += 1
+            # Other sessions may still have room while the queue head is at its session limit
+            self._dispatch()
+            try:
+                await asyncio.wait_for(future, self.queue_timeout)
+            except BaseException as e:
+                if future.done() and not future.cancelled():
+                    # Granted just as the wait was abandoned: give the slot back
+                    self._release(session_id)
+                else:
+                    future.cancel()
+                    self._queued -= 1
+                if isinstance(e, asyncio.TimeoutError):
+                    self.counters["queue_timeouts"] += 1
+                    raise SchedulerBusy(f"No shell slot within {self.queue_timeout}s") from e
+                raise
+
+        self.wait_times[priority].record(time.monotonic() - queued_at)
+        self.counters["started"] += 1
+        try:
+            yield
+        finally:
+            self._release(session_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "queue_depth": self._queued,
+            "max_concurrent": self.max_concurrent,
+            "max_per_session": self.max_per_session,
+            "max_queued": self.max_queued,
+            "busy_sessions": len(self._per_session),
+            "wait": {name: histogram.snapshot() for name, histogram in self.wait_times.items()},
+            **self.counters
+        }
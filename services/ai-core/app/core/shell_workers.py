@@ -0,0 +1,316 @@
+"""
+Persistent shell workers - one long-lived /bin/sh per session
+Commands are written to the worker's stdin and framed on stdout/stderr by a
+random per-command sentinel, which also carries the exit code and the
+resulting working directory. A session's cwd therefore lives in its own shell,
+and short commands skip the fork/exec of a fresh process tree.
+"""
+import asyncio
+import logging
+import os
+import secrets
+import shlex
+import signal
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+READ_CHUNK = 65536
+
+
+class WorkerDied(Exception):
+    """The worker shell exited while running a command"""
+
+
+class WorkersBusy(Exception):
+    """max_workers is reached and every worker is running a command"""
+
+
+async def kill_process_group(process: asyncio.subprocess.Process):
+    """SIGTERM a process group, SIGKILL it after a grace period, reap the leader"""
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+    except ProcessLookupError:
+        # The whole group is already gone
+        pass
+    else:
+        try:
+            await asyncio.wait_for(process.wait(), settings.nexia_shell_kill_grace)
+        except asyncio.TimeoutError:
+            pass
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+    await process.wait()
+
+
+@dataclass
+class WorkerResult:
+    """Raw output of one command run by a worker"""
+    stdout: bytes
+    stderr: bytes
+    return_code: int
+    timed_out: bool = False
+    truncated: bool = False
+
+
+class _Capture:
+    """Output read so far for one stream, capped, kept on timeout"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.data = bytearray()
+        self.truncated = False
+
+    def add(self, chunk: bytes):
+        room = self.limit - len(self.data)
+        if len(chunk) > room:
+            chunk = chunk[:max(room, 0)]
+            self.truncated = True
+        self.data += chunk
+
+
+def _marker_prefix(data: bytes, marker: bytes) -> int:
+    """Length of the longest suffix of data that is a prefix of marker"""
+    for size in range(min(len(data), len(marker) - 1), 0, -1):
+        if data.endswith(marker[:size]):
+            return size
+    return 0
+
+
+async def _read_frame(stream: asyncio.StreamReader, marker: bytes, capture: _Capture, trailer: bool) -> bytes:
+    """Read a stream up to marker; returns the rest of the marker line if trailer is set"""
+    pending = b""
+    while True:
+        chunk = await stream.read(READ_CHUNK)
+        if not chunk:
+            raise WorkerDied("worker shell exited")
+        data = pending + chunk
+        index = data.find(marker)
+        if index >= 0:
+            capture.add(data[:index])
+            rest = data[index + len(marker):]
+            break
+        # Hold back only a possible start of the marker, the rest is output
+        split = len(data) - _marker_prefix(data, marker)
+        capture.add(data[:split])
+        pending = data[split:]
+
+    while trailer and b"\n" not in rest:
+        chunk = await stream.read(256)
+        if not chunk:
+            raise WorkerDied("worker shell exited")
+        rest += chunk
+    return rest
+
+
+class ShellWorker:
+    """A session's shell; runs one command at a time"""
+
+    def __init__(self, session_id: str, cwd: str):
+        self.session_id = session_id
+        self.cwd = cwd
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+        self.commands = 0
+        # Callers between checkout and the end of their command
+        self.checkouts = 0
+
+    @property
+    def dead(self) -> bool:
+        return self.process is not None and self.process.returncode is not None
+
+    @property
+    def busy(self) -> bool:
+        # A checked-out worker is busy before it takes its lock, so it is never evicted
+        return self.checkouts > 0 or self.lock.locked()
+
+    async def _start(self):
+        self.process = await asyncio.create_subprocess_exec(
+            "/bin/sh",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=self.cwd,
+            # Own process group: a timeout kills the shell and everything it started
+            start_new_session=True
+        )
+
+    def _script(self, cmd_args: List[str], token: str, cwd: Optional[str]) -> bytes:
+        command = shlex.join(cmd_args)
+        if cwd:
+            # One-off directory, the session's cwd is left alone
+            command = f"(cd -- {shlex.quote(cwd)} && {command})"
+        return (
+            f"{command} </dev/null\n"
+            f"__nexia_rc=$?\n"
+            f"printf '\\n%s %d %s\\n' {token} \"$__nexia_rc\" \"$PWD\"\n"
+            f"printf '\\n%s\\n' {token} >&2\n"
+        ).encode("utf-8")
+
+    async def run(self, cmd_args: List[str], timeout: float, cwd: Optional[str] = None) -> WorkerResult:
+        """Run a command in this shell; on timeout the worker is killed"""
+        async with self.lock:
+            if self.process is None:
+                await self._start()
+            if self.dead:
+                raise WorkerDied("worker shell exited")
+
+            token = f"__nexia_{secrets.token_hex(8)}__"
+            limit = settings.nexia_shell_max_output_chars
+            stdout, stderr = _Capture(limit), _Capture(limit)
+            self.commands += 1
+            try:
+                self.process.stdin.write(self._script(cmd_args, token, cwd))
+                await self.process.stdin.drain()
+                trailer, _ = await asyncio.wait_for(
+                    asyncio.gather(
+                        _read_frame(self.process.stdout, f"\n{token} ".encode(), stdout, trailer=True),
+                        _read_frame(self.process.stderr, f"\n{token}\n".encode(), stderr, trailer=False)
+                    ),
+                    timeout
+                )
+            except asyncio.TimeoutError:
+                await self.close()
+                return WorkerResult(bytes(stdout.data), bytes(stderr.data), 124, timed_out=True)
+            except (ConnectionError, WorkerDied) as e:
+                await self.close()
+                raise WorkerDied(str(e)) from e
+            finally:
+                self.last_used = time.monotonic()
+
+            return_code, _, pwd = trailer.decode("utf-8", errors="ignore").rstrip("\n").partition(" ")
+            if pwd:
+                self.cwd = pwd
+            return WorkerResult(
+                bytes(stdout.data),
+                bytes(stderr.data),
+                int(return_code),
+                truncated=stdout.truncated or stderr.truncated
+            )
+
+    async def close(self):
+        if self.process is not None and self.process.returncode is None:
+            await kill_process_group(self.process)
+
+
+class ShellWorkerPool:
+    """Live workers by session, least recently used first"""
+
+    def __init__(self, max_workers: int = None, idle_timeout: float = None):
+        self.max_workers = max_workers or settings.nexia_shell_max_workers
+        self.idle_timeout = idle_timeout or settings.nexia_shell_worker_idle_timeout
+        self.workers: "OrderedDict[str, ShellWorker]" = OrderedDict()
+        self._reaper: Optional[asyncio.Task] = None
+        self.counters = {
+            "spawned": 0, "reused": 0, "evicted": 0, "reaped": 0, "died": 0, "timeouts": 0, "overflow": 0
+        }
+
+    def _ensure_reaper(self):
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._reap_idle())
+
+    def _checkout(self, session_id: str, cwd: str) -> Tuple[ShellWorker, List[ShellWorker]]:
+        """The session's worker (created if needed) and the workers evicted to make room
+        
+        The worker is returned checked out; the caller must release it.
+        Raises WorkersBusy rather than going over max_workers.
+        """
+        worker = self.workers.get(session_id)
+        if worker is not None and not worker.dead:
+            self.workers.move_to_end(session_id)
+            self.counters["reused"] += 1
+            worker.checkouts += 1
+            return worker, []
+
+        if worker is not None:
+            # Respawn in the directory the previous shell was in
+            cwd = worker.cwd
+            del self.workers[session_id]
+        elif len(self.workers) >= self.max_workers and all(victim.busy for victim in self.workers.values()):
+            # Nothing can be evicted; the caller runs the command without a worker
+            self.counters["overflow"] += 1
+            raise WorkersBusy(f"All {self.max_workers} shell workers are busy")
+        evicted = []
+        for victim in list(self.workers.values()):
+            if len(self.workers) < self.max_workers:
+                break
+            if not victim.busy:
+                del self.workers[victim.session_id]
+                evicted.append(victim)
+        self.counters["evicted"] += len(evicted)
+
+        worker = ShellWorker(session_id, cwd)
+        worker.checkouts += 1
+        self.workers[session_id] = worker
+        self.counters["spawned"] += 1
+        return worker, evicted
+
+    async def run(
+        self,
+        session_id: str,
+        cmd_args: List[str],
+        default_cwd: str,
+        timeout: float,
+        cwd: Optional[str] = None
+    ) -> WorkerResult:
+        """Run a command in the session's worker"""
+        self._ensure_reaper()
+        worker, evicted = self._checkout(session_id, default_cwd)
+        try:
+            for victim in evicted:
+                await victim.close()
+            result = await worker.run(cmd_args, timeout, cwd=cwd)
+        except WorkerDied:
+            self.counters["died"] += 1
+            raise
+        finally:
+            worker.checkouts -= 1
+        if result.timed_out:
+            self.counters["timeouts"] += 1
+        return result
+
+    async def discard(self, session_id: str):
+        """Close a session's worker (session ended)"""
+        worker = self.workers.pop(session_id, None)
+        if worker is not None:
+            await worker.close()
+
+    def cwd(self, session_id: str) -> Optional[str]:
+        worker = self.workers.get(session_id)
+        return worker.cwd if worker is not None else None
+
+    async def _reap_idle(self):
+        while True:
+            await asyncio.sleep(max(self.idle_timeout / 2, 1.0))
+            now = time.monotonic()
+            for worker in list(self.workers.values()):
+                if (worker.dead or now - worker.last_used > self.idle_timeout) and not worker.busy:
+                    self.workers.pop(worker.session_id, None)
+                    await worker.close()
+                    self.counters["reaped"] += 1
+
+    async def close(self):
+        """Stop the reaper and every worker shell"""
+        if self._reaper is not None:
+            self._reaper.cancel()
+            await asyncio.gather(self._reaper, return_exceptions=True)
+            self._reaper = None
+        workers, self.workers = list(self.workers.values()), OrderedDict()
+        await asyncio.gather(*(worker.close() for worker in workers), return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self.workers),
+            "busy": sum(1 for worker in self.workers.values() if worker.busy),
+            "max_workers": self.max_workers,
+            "idle_timeout": self.idle_timeout,
+            **self.counters
+        }
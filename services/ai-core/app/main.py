@@ -1,15 +1,21 @@
 """
 Nexia AI Core Service - Main Application
 """
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 import logging
 
 from app.config import settings
 from app.api.v1 import router as api_v1_router
 from app.core.database import init_db
+from app.core import redis_client
 from app.core.redis_client import init_redis
+from app.core.ai_engine import init_engine, shutdown_engine
+from app.core.readiness import readiness
+from app.core.idea_pipeline import get_idea_connections_job
 
 # Configure logging
 logging.basicConfig(
@@ -27,10 +33,28 @@ async def lifespan(app: FastAPI):
     await init_db()
     await init_redis()
     
+    if settings.nexia_horizontal_scaling and redis_client.redis_client is None:
+        # Without Redis each worker would see its own sessions
+        raise RuntimeError("nexia_horizontal_scaling requires a reachable Redis (REDIS_URL)")
+    
+    # Shared resources are created once per worker process
+    engine = init_engine()
+    
+    # Warm dependencies in the background; /readyz reports 503 until done
+    warmup_task = asyncio.create_task(readiness.warmup(engine))
+    
+    # Precomputes idea connections in the background
+    get_idea_connections_job().start()
+    
+    # Picks up added or edited mode definitions without a restart
+    engine.mode_registry.start_watching()
+    
     yield
     
     # Shutdown
     logger.info("Shutting down Nexia AI Core Service...")
+    warmup_task.cancel()
+    await shutdown_engine()
 
 
 # Create FastAPI app
@@ -64,9 +88,25 @@ async def root():
     }
 
 
+@app.get("/livez")
+async def liveness_check():
+    """Liveness probe: the process and its event loop are responsive"""
+    return {"status": "alive", "service": "nexia-ai-core"}
+
+
+@app.get("/readyz")
+async def readiness_check():
+    """Readiness probe: warmup is complete and required dependencies answer"""
+    ready = await readiness.refresh()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "not_ready", **readiness.snapshot()}
+    )
+
+
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
+    """Health check endpoint (kept for existing clients, see /livez and /readyz)"""
     return {
         "status": "healthy",
         "service": "nexia-ai-core",
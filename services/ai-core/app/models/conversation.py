@@ -11,6 +11,7 @@ class Session(BaseModel):
     id: str
     created_at: datetime
     mode: str = "focus_guardian"
+    mode_version: Optional[str] = None  # pinned mode definition, see NexiaEngine._get_session_mode
     context: Dict[str, Any] = {}
 
 
@@ -27,3 +28,16 @@ class ConversationResponse(BaseModel):
     mode: str
     actions: Dict[str, Any] = {}
     metadata: Dict[str, Any] = {}
+
+
+class LLMResponse(str):
+    """LLM response text tagged with the provider that produced it"""
+    
+    def __new__(cls, text: str, provider: str):
+        response = super().__new__(cls, text)
+        response.provider = provider
+        return response
+    
+    @property
+    def is_fallback(self) -> bool:
+        return self.provider == "fallback"
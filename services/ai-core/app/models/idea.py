@@ -0,0 +1,70 @@
+"""
+Idea models
+"""
+from pydantic import BaseModel, Field
+from sqlalchemy import Column, DateTime, Index, JSON, String, Text, func, literal_column
+from typing import List, Optional
+from datetime import datetime
+
+from app.core.database import Base
+
+
+# Text search configurations, each has a GIN index on IdeaRecord
+SEARCH_CONFIGS = ("french", "english")
+
+
+def search_vector(content, config: str):
+    """tsvector of an idea's content; GIN indexes and queries must use this exact expression"""
+    return func.to_tsvector(literal_column(f"'{config}'::regconfig"), content)
+
+
+def search_query(text: str, config: str):
+    """tsquery for a user search, in web search syntax"""
+    return func.websearch_to_tsquery(literal_column(f"'{config}'::regconfig"), text)
+
+
+class IdeaRecord(Base):
+    """Parked idea row"""
+    __tablename__ = "ideas"
+
+    id = Column(String(64), primary_key=True)
+    session_id = Column(String(128), nullable=False)
+    content = Column(Text, nullable=False)
+    status = Column(String(16), nullable=False, default="parked")
+    tags = Column(JSON, nullable=False, default=list)
+    connections = Column(JSON, nullable=False, default=list)
+    created_at = Column(DateTime, nullable=False, default=datetime.now)
+    updated_at = Column(DateTime, nullable=False, default=datetime.now, onupdate=datetime.now)
+
+    __table_args__ = (
+        # Keyset pagination of a session's ideas, newest first
+        Index("ix_ideas_session_created", "session_id", "created_at", "id"),
+        Index("ix_ideas_status", "status"),
+        # Full-text search (GET /ideas/search), one index per configuration
+        Index("ix_ideas_content_fts_french", search_vector(content, "french"), postgresql_using="gin"),
+        Index("ix_ideas_content_fts_english", search_vector(content, "english"), postgresql_using="gin"),
+    )
+
+
+class Idea(BaseModel):
+    id: Optional[str] = None
+    content: str
+    session_id: str
+    created_at: Optional[datetime] = None
+    status: str = "parked"
+    tags: List[str] = []
+    connections: List[str] = []
+
+
+class IdeaParkRequest(BaseModel):
+    session_id: str
+    content: str
+    tags: List[str] = []
+
+
+class IdeaBulkParkRequest(BaseModel):
+    ideas: List[IdeaParkRequest] = Field(..., max_length=500)
+
+
+class IdeaBulkActivateRequest(BaseModel):
+    idea_ids: List[str] = Field(..., max_length=500)
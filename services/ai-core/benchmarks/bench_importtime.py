@@ -0,0 +1,89 @@
+"""
+Startup benchmark: cost of importing the ai-core application
+
+Runs `python -X importtime -c "import app.main"` in fresh interpreters and
+checks that the median import time stays within budget and that the heavy
+optional SDKs (LangChain providers, Playwright, LangSmith) are not loaded at
+import time. Exits with status 1 when either check fails.
+
+    cd services/ai-core && python -m benchmarks.bench_importtime [--budget-ms 1500]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+SERVICE_ROOT = Path(__file__).resolve().parent.parent
+
+BUDGET_MS = 1500
+RUNS = 5
+
+# Must only be imported on first use
+DEFERRED_MODULES = ("langchain", "langchain_core", "langchain_openai", "langchain_anthropic",
+                    "playwright", "langsmith")
+
+PROBE = (
+    "import sys, app.main; "
+    f"print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+)
+
+
+def measure() -> tuple:
+    """One cold import; returns (cumulative µs of app.main and its direct imports, eager modules)"""
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=SERVICE_ROOT, env=env, capture_output=True, text=True, check=True
+    )
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        # Nesting is shown by indentation: " app.main", "   fastapi", ...
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1 or name.strip() == "app.main":
+            modules[name.strip()] = int(cumulative)
+
+    eager = [m for m in result.stdout.strip().split(",") if m]
+    return modules, eager
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=RUNS)
+    args = parser.parse_args()
+
+    totals = []
+    slowest = {}
+    eager = []
+    for _ in range(args.runs):
+        modules, eager = measure()
+        totals.append(modules.get("app.main", 0) / 1000)
+        slowest = modules
+
+    median = statistics.median(totals)
+    print(f"import app.main: median {median:.0f} ms over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+    print("slowest imports of app.main:")
+    slowest.pop("app.main", None)
+    for name, cumulative in sorted(slowest.items(), key=lambda item: -item[1])[:10]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    failed = False
+    if eager:
+        print(f"FAIL: imported eagerly: {', '.join(eager)}")
+        failed = True
+    if median > args.budget_ms:
+        print("FAIL: over budget")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
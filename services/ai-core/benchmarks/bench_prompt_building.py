@@ -0,0 +1,62 @@
+"""
+Micro-benchmark: per-message system prompt building cost
+
+Compares the previous f-string that rebuilt the whole prompt (and repr'd the
+context) on every message with the precompiled mode templates.
+
+    cd services/ai-core && python -m benchmarks.bench_prompt_building
+"""
+import timeit
+import tracemalloc
+
+from app.core.mode_registry import get_mode_registry
+from app.core.prompts import build_system_prompt, compile_mode_prompts
+
+ITERATIONS = 50_000
+
+CONTEXT = {
+    "session_type": "deep_work",
+    "current_project": "nexia",
+    "open_tasks": ["landing page", "pricing", "onboarding emails"],
+    "energy": 7,
+}
+
+MODES = get_mode_registry().modes
+MODE = MODES["focus_guardian"]
+COMPILED = compile_mode_prompts(MODES)
+
+
+def legacy_build(mode=MODE, context=CONTEXT) -> str:
+    return f"""Tu es Nexia, un assistant IA spécialisé pour les entrepreneurs TDAH.
+        
+Mode actuel: {mode.name}
+Description: {mode.description}
+
+Capacités spécifiques:
+{chr(10).join(f"- {cap}" for cap in mode.capabilities)}
+
+Instructions: {mode.system_prompt}
+
+Contexte utilisateur: {context}
+"""
+
+
+def compiled_build(mode=MODE, context=CONTEXT) -> str:
+    return build_system_prompt(COMPILED[mode.id], context)
+
+
+def measure(name: str, func):
+    seconds = min(timeit.repeat(func, number=ITERATIONS, repeat=5))
+    tracemalloc.start()
+    for _ in range(1000):
+        func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<12} {seconds / ITERATIONS * 1e6:8.2f} µs/message   peak {peak / 1024:6.1f} KiB per 1k messages")
+
+
+if __name__ == "__main__":
+    measure("legacy", legacy_build)
+    measure("compiled", compiled_build)
+    measure("legacy/{}", lambda: legacy_build(context={}))
+    measure("compiled/{}", lambda: compiled_build(context={}))
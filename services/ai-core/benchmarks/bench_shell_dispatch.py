@@ -0,0 +1,42 @@
+"""
+Micro-benchmark: per-command dispatch cost of MCP shell commands
+
+Compares a fresh process per command with the session's persistent shell
+worker for a sequence of short commands. The read-only command cache is
+disabled so every command is actually run.
+
+    cd services/ai-core && python -m benchmarks.bench_shell_dispatch
+"""
+import asyncio
+import time
+
+from app.config import settings
+from app.core.mcp_shell import MCPShellServer
+
+ITERATIONS = 300
+COMMANDS = [("pwd", []), ("ls", []), ("uname", ["-s"])]
+
+
+async def measure(name: str, shell: MCPShellServer, session_id=None):
+    # Warm up (spawns the worker shell)
+    await shell.execute_command("pwd", session_id=session_id)
+    start = time.perf_counter()
+    for i in range(ITERATIONS):
+        command, args = COMMANDS[i % len(COMMANDS)]
+        await shell.execute_command(command, args, session_id=session_id)
+    seconds = time.perf_counter() - start
+    print(f"{name:<8} {seconds / ITERATIONS * 1e3:8.3f} ms/command")
+
+
+async def main():
+    settings.nexia_shell_cache_enabled = False
+    shell = MCPShellServer()
+    try:
+        await measure("spawn", shell)
+        await measure("worker", shell, session_id="bench")
+    finally:
+        await shell.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,28 @@
+"""
+Shared fixtures
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.core import session_store
+from app.core.ai_engine import NexiaEngine
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Application client with the lifespan running, without a browser"""
+    monkeypatch.setattr(settings, "nexia_warmup_browser", False)
+    from app.main import app
+
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+async def engine(monkeypatch):
+    # Fresh in-memory sessions for every engine
+    monkeypatch.setattr(session_store, "session_store", session_store.InMemorySessionStore())
+    engine = NexiaEngine()
+    yield engine
+    await engine.close()
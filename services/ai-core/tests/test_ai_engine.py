@@ -0,0 +1,29 @@
+"""
+NexiaEngine.process_message over a stubbed Claude Bridge
+"""
+import sys
+
+from app.models.conversation import LLMResponse
+
+
+async def test_bridge_only_message_does_not_need_langchain(engine, monkeypatch):
+    # A None entry makes any `import langchain...` raise ImportError
+    monkeypatch.setitem(sys.modules, "langchain", None)
+    monkeypatch.setitem(sys.modules, "langchain.schema", None)
+    prompts = []
+
+    async def ask_claude(question, strict=False):
+        prompts.append(question)
+        return LLMResponse("Salut !", "claude_bridge")
+
+    engine.llms = {}
+    engine.claude_bridge.ask_claude = ask_claude
+    engine.claude_bridge.is_connected = lambda: True
+
+    response = await engine.process_message("Bonjour", "s1", {})
+    assert response.response == "Salut !"
+
+    response = await engine.process_message("Et ensuite ?", "s1", {})
+    assert response.response == "Salut !"
+    # The second prompt carries the history window
+    assert "Bonjour" in prompts[-1] and prompts[-1].endswith("Et ensuite ?")
@@ -0,0 +1,58 @@
+"""
+NexiaEngine.stream_message over a stubbed Claude Bridge stream
+"""
+from app.core.claude_bridge import INCOMPLETE_NOTICE
+from app.core.conversation_history import ConversationHistory
+
+
+def _bridge_stream(engine, frames, reason="stable"):
+    """Stub the bridge stream: frames of (full rendered text, yielded chunk)"""
+    async def stream_claude(question, outcome=None):
+        for text, chunk in frames:
+            outcome.rewritten |= not text.startswith(outcome.text or "")
+            outcome.text = text
+            yield chunk
+        outcome.reason = reason
+
+    engine.claude_bridge.stream_claude = stream_claude
+    engine.claude_bridge.is_connected = lambda: True
+
+
+async def _events(engine, session_id="s1"):
+    return [event async for event in engine.stream_message("Bonjour", session_id, {})]
+
+
+async def test_rewritten_answer_uses_final_text(engine):
+    _bridge_stream(engine, [("Hello wor", "Hello wor"), ("Hello, how are you?", " are you?")])
+
+    events = await _events(engine)
+
+    assert "".join(e["content"] for e in events if e["type"] == "token") == "Hello wor are you?"
+    done = events[-1]
+    assert done["type"] == "done"
+    assert done["response"] == "Hello, how are you?"
+
+    session = await engine.session_store.get("s1")
+    assert session.context["last_response"] == "Hello, how are you?"
+    assert ConversationHistory.from_context(session.context).as_pairs()[-1] == ("Bonjour", "Hello, how are you?")
+
+    # Served from the response cache, with the same text
+    events = await _events(engine, "s2")
+    assert events[-1]["metadata"]["cache"] == "hit"
+    assert events[-1]["response"] == "Hello, how are you?"
+
+
+async def test_timed_out_answer_is_labelled_and_not_kept(engine):
+    _bridge_stream(engine, [("Une réponse", "Une réponse")], reason="timeout")
+
+    events = await _events(engine, "t1")
+
+    done = events[-1]
+    assert done["response"] == f"Une réponse{INCOMPLETE_NOTICE}"
+    session = await engine.session_store.get("t1")
+    assert ConversationHistory.from_context(session.context).as_pairs() == []
+
+    _bridge_stream(engine, [("Autre", "Autre")])
+    events = await _events(engine, "t2")
+    assert events[-1]["metadata"]["cache"] == "miss"
+    assert events[-1]["response"] == "Autre"
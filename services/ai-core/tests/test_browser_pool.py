@@ -0,0 +1,104 @@
+"""
+BrowserPool warmup and slot creation with a fake browser
+"""
+import asyncio
+
+import pytest
+
+from app.core.browser_pool import BrowserPool, BrowserPoolError
+
+
+class FakePage:
+    def __init__(self, goto_delay: float = 0, fail: bool = False):
+        self.goto_delay = goto_delay
+        self.fail = fail
+
+    def is_closed(self):
+        return False
+
+    async def evaluate(self, js, *args):
+        return 1
+
+    async def goto(self, url, timeout=None):
+        await asyncio.sleep(self.goto_delay)
+        if self.fail:
+            raise RuntimeError("navigation failed")
+
+    async def wait_for_selector(self, selector, timeout=None):
+        return True
+
+
+class FakeBrowser:
+    def __init__(self, **page_options):
+        self.page_options = page_options
+        self.contexts = []
+
+    def is_connected(self):
+        return True
+
+    async def new_context(self):
+        browser = self
+
+        class Context:
+            closed = False
+
+            async def add_cookies(self, cookies):
+                pass
+
+            async def new_page(self):
+                return FakePage(**browser.page_options)
+
+            async def close(self):
+                self.closed = True
+
+        context = Context()
+        self.contexts.append(context)
+        return context
+
+
+def _pool(tmp_path, size=3, **page_options) -> BrowserPool:
+    pool = BrowserPool(size=size, cookies_file=tmp_path / "cookies.json")
+    pool._browser = FakeBrowser(**page_options)
+
+    async def ensure_browser():
+        return pool._browser
+
+    pool._ensure_browser = ensure_browser
+    return pool
+
+
+async def test_warmup_creates_every_slot(tmp_path):
+    pool = _pool(tmp_path)
+
+    assert await pool.warmup() == 3
+    assert pool.stats()["idle"] == 3
+    assert pool.stats()["created"] == 3
+
+
+async def test_cancelled_warmup_keeps_every_slot(tmp_path):
+    pool = _pool(tmp_path, goto_delay=10)
+
+    task = asyncio.create_task(pool.warmup())
+    await asyncio.sleep(0.05)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert pool.stats()["idle"] == 3
+    # The context opened for the interrupted slot is not leaked
+    assert [context.closed for context in pool._browser.contexts] == [True]
+
+
+async def test_failed_warmup_leaves_slots_for_on_demand_creation(tmp_path):
+    pool = _pool(tmp_path, fail=True)
+
+    assert await pool.warmup() == 0
+    assert pool.stats()["idle"] == 3
+    assert all(context.closed for context in pool._browser.contexts)
+
+
+async def test_create_slot_wraps_errors(tmp_path):
+    pool = _pool(tmp_path, fail=True)
+
+    with pytest.raises(BrowserPoolError):
+        await pool._create_slot()
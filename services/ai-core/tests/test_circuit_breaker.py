@@ -0,0 +1,115 @@
+"""
+Circuit breaker states: threshold, cool-down and half-open probes
+"""
+import pytest
+
+from app.core import circuit_breaker
+from app.core.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, ProviderHealthRegistry
+from app.core.claude_bridge import ClaudeBridge
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now[0])
+    return now
+
+
+def _breaker() -> CircuitBreaker:
+    return CircuitBreaker(
+        "test", window_seconds=60, min_calls=4, error_threshold=0.5, open_seconds=30, slow_call_seconds=10
+    )
+
+
+def _open(breaker: CircuitBreaker):
+    for _ in range(breaker.min_calls):
+        breaker.record_failure(0.1)
+    assert breaker.state == OPEN
+
+
+def test_opens_at_the_error_threshold_once_enough_calls_are_seen(clock):
+    breaker = _breaker()
+    breaker.record_failure(0.1)
+    breaker.record_failure(0.1)
+    breaker.record_failure(0.1)
+    # Below min_calls nothing is decided yet
+    assert breaker.state == CLOSED
+
+    breaker.record_success(0.1)
+    assert breaker.state == CLOSED
+    breaker.record_failure(0.1)
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+    assert breaker.counters["rejected"] == 1
+
+
+def test_low_error_rate_and_old_failures_keep_it_closed(clock):
+    breaker = _breaker()
+    for _ in range(3):
+        breaker.record_failure(0.1)
+    clock[0] += 61
+    for _ in range(3):
+        breaker.record_success(0.1)
+    breaker.record_failure(0.1)
+
+    assert breaker.state == CLOSED
+    assert breaker.error_rate() == 0.25
+
+
+def test_slow_successes_count_as_failures(clock):
+    breaker = _breaker()
+    for _ in range(4):
+        breaker.record_success(11)
+
+    assert breaker.state == OPEN
+
+
+def test_half_open_after_the_cool_down_admits_a_single_probe(clock):
+    breaker = _breaker()
+    _open(breaker)
+
+    clock[0] += 29
+    assert not breaker.is_available()
+    assert not breaker.allow_request()
+
+    clock[0] += 1
+    assert breaker.is_available()
+    assert breaker.allow_request()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow_request()
+    assert not breaker.is_available()
+
+    # A released probe (e.g. a cancelled hedge loser) frees the slot
+    breaker.release()
+    assert breaker.allow_request()
+
+    breaker.record_success(0.1)
+    assert breaker.state == CLOSED
+    assert not breaker.outcomes
+
+
+def test_failed_probe_reopens(clock):
+    breaker = _breaker()
+    _open(breaker)
+    clock[0] += 30
+
+    assert breaker.allow_request()
+    breaker.record_failure(0.1)
+
+    assert breaker.state == OPEN
+    assert breaker.counters["opened"] == 2
+    assert not breaker.allow_request()
+    assert breaker.snapshot()["retry_in_seconds"] == 30
+
+
+def test_bridge_connectivity_follows_its_breaker(clock):
+    breaker = ProviderHealthRegistry().get("claude_bridge")
+    bridge = ClaudeBridge(breaker=breaker)
+    assert bridge.is_connected()
+
+    for _ in range(breaker.min_calls):
+        breaker.record_failure(0.1)
+    assert not bridge.is_connected()
+
+    clock[0] += breaker.open_seconds
+    assert bridge.is_connected()
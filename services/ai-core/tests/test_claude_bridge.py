@@ -0,0 +1,117 @@
+"""
+ClaudeBridge answer formatting and provider tags
+"""
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.core.claude_bridge import INCOMPLETE_NOTICE, ClaudeBridge
+from app.core.completion_detector import CompletionResult
+from app.models.conversation import LLMResponse
+
+
+def _answer(reason: str) -> LLMResponse:
+    return ClaudeBridge()._completion_answer("🤖 ", CompletionResult(text="Réponse", reason=reason, elapsed_ms=10))
+
+
+def test_completed_answer_is_tagged_with_the_bridge():
+    answer = _answer("stable")
+
+    assert answer == "🤖 Réponse"
+    assert isinstance(answer, LLMResponse) and answer.provider == "claude_bridge"
+
+
+def test_timed_out_answer_is_a_labelled_fallback():
+    answer = _answer("timeout")
+
+    assert answer == f"🤖 Réponse{INCOMPLETE_NOTICE}"
+    assert isinstance(answer, LLMResponse) and answer.is_fallback
+
+
+class FakeInput:
+    async def click(self):
+        pass
+
+    async def fill(self, text):
+        pass
+
+    async def clear(self):
+        pass
+
+    async def type(self, text):
+        pass
+
+    async def press(self, key):
+        pass
+
+
+class FakePage:
+    """A claude.ai page whose answer is only found by scraping the page text"""
+
+    def __init__(self, text: str, has_input: bool = True):
+        self.text = text
+        self.has_input = has_input
+
+    async def wait_for_selector(self, selector, timeout=None):
+        pass
+
+    async def query_selector(self, selector):
+        return FakeInput() if self.has_input and "textarea" in selector else None
+
+    async def query_selector_all(self, selector):
+        return []
+
+    async def evaluate(self, script):
+        return self.text
+
+
+class SilentDetector:
+    """The DOM detector never sees an answer"""
+
+    async def snapshot(self, page):
+        return {}
+
+    async def wait_for_completion(self, page, baseline):
+        return CompletionResult(text=None, reason="timeout", elapsed_ms=10)
+
+
+class FakePool:
+    def __init__(self, page):
+        self.page = page
+
+    @asynccontextmanager
+    async def lease(self):
+        yield self.page
+
+
+def _bridge(page: FakePage) -> ClaudeBridge:
+    bridge = ClaudeBridge(pool=FakePool(page), detector=SilentDetector())
+    bridge.page = page
+    return bridge
+
+
+@pytest.mark.parametrize("ask", ["_ask_claude_direct", "_ask_claude_playwright"])
+async def test_scraped_answers_are_tagged_with_the_bridge(ask):
+    page = FakePage("Bonjour Claude\nVoici une réponse suffisamment longue.")
+
+    answer = await getattr(_bridge(page), ask)("Bonjour Claude")
+
+    assert answer.endswith("Voici une réponse suffisamment longue.")
+    assert isinstance(answer, LLMResponse) and answer.provider == "claude_bridge"
+
+
+@pytest.mark.parametrize("ask", ["_ask_claude_direct", "_ask_claude_playwright"])
+async def test_status_messages_are_fallbacks(ask):
+    page = FakePage("", has_input=ask == "_ask_claude_direct")
+
+    answer = await getattr(_bridge(page), ask)("Bonjour Claude")
+
+    assert isinstance(answer, LLMResponse) and answer.is_fallback
+
+
+async def test_ask_claude_keeps_the_provider_tag():
+    bridge = _bridge(FakePage("Bonjour Claude\nVoici une réponse suffisamment longue."))
+
+    answer = await bridge.ask_claude("Bonjour Claude", strict=True)
+
+    assert answer.provider == "claude_bridge"
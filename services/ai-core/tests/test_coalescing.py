@@ -0,0 +1,94 @@
+"""
+SingleFlight and MicroBatcher
+"""
+import asyncio
+import gc
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.coalescing import MicroBatcher, SingleFlight
+
+
+async def test_single_flight_shares_one_execution():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "réponse"
+
+    results = await asyncio.gather(*(flight.do("key", work) for _ in range(3)))
+
+    assert [result for result, _ in results] == ["réponse"] * 3
+    assert sorted(shared for _, shared in results) == [False, True, True]
+    assert len(calls) == 1
+    assert flight.stats() == {"in_flight": 0, "calls": 3, "coalesced": 2}
+
+
+async def test_single_flight_survives_a_cancelled_caller():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.02)
+        return 42
+
+    first = asyncio.create_task(flight.do("key", work))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(flight.do("key", work))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == (42, True)
+
+
+class FakeLLM:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.batches = []
+
+    async def agenerate(self, conversations):
+        self.batches.append(len(conversations))
+        await asyncio.sleep(0.01)
+        # The batch task must survive a collection while it is running
+        gc.collect()
+        if self.fail:
+            raise RuntimeError("provider down")
+        return SimpleNamespace(generations=[[SimpleNamespace(text=f"réponse {c[0]}")] for c in conversations])
+
+
+async def test_micro_batcher_groups_calls():
+    llm = FakeLLM()
+    batcher = MicroBatcher(llm, window_ms=20, max_size=3)
+
+    results = await asyncio.gather(*(batcher.generate([i]) for i in range(4)))
+
+    assert results == [f"réponse {i}" for i in range(4)]
+    # Three sent on reaching max_size, the last one when the window closed
+    assert llm.batches == [3, 1]
+    assert batcher.stats()["largest_batch"] == 3
+    assert not batcher._running
+
+
+async def test_micro_batcher_propagates_failures():
+    batcher = MicroBatcher(FakeLLM(fail=True), window_ms=5, max_size=2)
+
+    results = await asyncio.gather(*(batcher.generate([i]) for i in range(2)), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+async def test_micro_batcher_drops_callers_that_gave_up():
+    llm = FakeLLM()
+    batcher = MicroBatcher(llm, window_ms=20, max_size=10)
+
+    abandoned = asyncio.create_task(batcher.generate(["abandon"]))
+    kept = asyncio.create_task(batcher.generate(["garde"]))
+    await asyncio.sleep(0)
+    abandoned.cancel()
+
+    assert await kept == "réponse garde"
+    with pytest.raises(asyncio.CancelledError):
+        await abandoned
+    assert llm.batches == [1]
@@ -0,0 +1,80 @@
+"""
+CommandCache keys, TTLs and its use by MCPShellServer
+"""
+import os
+
+from app.config import settings
+from app.core import command_cache
+from app.core.command_cache import CommandCache, command_key
+from app.core.mcp_shell import MCPShellServer
+
+
+def test_key_changes_when_an_argument_file_changes(tmp_path):
+    notes = tmp_path / "notes.txt"
+    notes.write_text("v1")
+    key = command_key("cat", ["notes.txt"], str(tmp_path))
+
+    assert command_key("cat", ["notes.txt"], str(tmp_path)) == key
+    notes.write_text("version 2")
+    assert command_key("cat", ["notes.txt"], str(tmp_path)) != key
+
+
+def test_key_changes_when_the_directory_changes(tmp_path):
+    key = command_key("ls", ["-la"], str(tmp_path))
+
+    (tmp_path / "new.txt").write_text("")
+    stat = os.stat(tmp_path)
+    os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert command_key("ls", ["-la"], str(tmp_path)) != key
+
+
+def test_entries_expire_after_the_command_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(command_cache.time, "monotonic", lambda: now[0])
+    cache = CommandCache(max_entries=10, ttls={"df": 30, "uname": 3600})
+
+    cache.set("df-key", "df", "df output")
+    cache.set("uname-key", "uname", "Linux")
+    now[0] += 31
+
+    assert cache.get("df-key") is None
+    assert cache.get("uname-key") == "Linux"
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = CommandCache(max_entries=2, ttls={"ls": 60})
+    cache.set("a", "ls", "A")
+    cache.set("b", "ls", "B")
+    cache.get("a")
+    cache.set("c", "ls", "C")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
+
+
+def test_only_listed_commands_are_cacheable(monkeypatch):
+    cache = CommandCache(ttls={"ls": 5})
+
+    assert cache.cacheable("ls")
+    assert not cache.cacheable("rm")
+    monkeypatch.setattr(settings, "nexia_shell_cache_enabled", False)
+    assert not cache.cacheable("ls")
+
+
+async def test_shell_serves_read_only_commands_from_the_cache(tmp_path):
+    shell = MCPShellServer()
+    (tmp_path / "a.txt").write_text("contenu")
+    try:
+        first = await shell.execute_command("cat", ["a.txt"], cwd=str(tmp_path))
+        second = await shell.execute_command("cat", ["a.txt"], cwd=str(tmp_path))
+        (tmp_path / "a.txt").write_text("contenu modifié")
+        third = await shell.execute_command("cat", ["a.txt"], cwd=str(tmp_path))
+    finally:
+        await shell.close()
+
+    assert first.stdout == second.stdout == "contenu"
+    assert third.stdout == "contenu modifié"
+    assert shell.cache.stats()["hits"] == 1
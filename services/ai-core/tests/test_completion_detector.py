@@ -0,0 +1,59 @@
+"""
+CompletionDetector.tail: deltas, rewritten answers, completion reason
+"""
+from app.core.completion_detector import CompletionDetector, TailOutcome
+
+
+class FakePage:
+    """Replays _TAIL_JS results, repeating the last one"""
+
+    def __init__(self, frames):
+        self.frames = list(frames)
+
+    async def evaluate(self, js, args):
+        if len(self.frames) > 1:
+            return self.frames.pop(0)
+        return self.frames[0]
+
+
+async def _tail(frames, timeout=2.0):
+    detector = CompletionDetector(stable_ms=1, timeout=timeout)
+    outcome = TailOutcome()
+    chunks = [chunk async for chunk in detector.tail(FakePage(frames), poll_interval=0.001, outcome=outcome)]
+    return chunks, outcome
+
+
+async def test_tail_yields_appended_text():
+    chunks, outcome = await _tail([
+        {"text": "Hello", "streaming": True},
+        {"text": "Hello, how", "streaming": True},
+        {"text": "Hello, how are you?", "streaming": False}
+    ])
+
+    assert chunks == ["Hello", ", how", " are you?"]
+    assert outcome.text == "Hello, how are you?"
+    assert outcome.completed
+    assert not outcome.rewritten
+
+
+async def test_tail_reports_rewritten_text():
+    # Markdown re-rendering changed text that was already yielded
+    chunks, outcome = await _tail([
+        {"text": "Hello wor", "streaming": True},
+        {"text": "Hello, how", "streaming": True},
+        {"text": "Hello, how are you?", "streaming": False}
+    ])
+
+    assert "".join(chunks) == "Hello wor are you?"
+    assert outcome.rewritten
+    assert outcome.text == "Hello, how are you?"
+    assert outcome.completed
+
+
+async def test_tail_timeout_is_not_completed():
+    chunks, outcome = await _tail([{"text": "Partial", "streaming": True}], timeout=0.05)
+
+    assert chunks == ["Partial"]
+    assert outcome.text == "Partial"
+    assert outcome.reason == "timeout"
+    assert not outcome.completed
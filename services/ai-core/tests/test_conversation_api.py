@@ -0,0 +1,20 @@
+"""
+Chat WebSocket error handling
+"""
+import pytest
+
+
+@pytest.mark.parametrize("send", [
+    lambda ws: ws.send_text("pas du json"),
+    lambda ws: ws.send_json(["une", "liste"]),
+    lambda ws: ws.send_json("texte"),
+    lambda ws: ws.send_json({"session_id": "s1"})
+])
+def test_malformed_payload_gets_an_error_event(client, send):
+    with client.websocket_connect("/api/v1/conversation/chat/ws") as websocket:
+        send(websocket)
+        assert websocket.receive_json()["type"] == "error"
+
+        # The socket is still usable
+        send(websocket)
+        assert websocket.receive_json()["type"] == "error"
@@ -0,0 +1,65 @@
+"""
+Conversation history window: clipping, eviction and the rolling summary
+"""
+from app.core.conversation_history import ConversationHistory, estimate_tokens
+
+
+def _history(**limits) -> ConversationHistory:
+    options = {"max_turns": 10, "token_budget": 100, "summary_budget": 50}
+    return ConversationHistory(**{**options, **limits})
+
+
+def test_a_turn_takes_at_most_half_the_budget():
+    history = _history()
+    history.append("Bonjour", "Salut !")
+    history.append("u" * 1000, "a" * 1000)
+
+    assert history._turn_tokens(history.turns[-1]) <= history.token_budget // 2 + 1
+    # The previous turn still fits next to the clipped one
+    assert history.as_pairs()[0] == ("Bonjour", "Salut !")
+    assert history.turns[-1]["user"].endswith("…")
+
+
+def test_oldest_turns_are_folded_into_the_summary():
+    history = _history(max_turns=2)
+    history.append("Première question. Avec des détails.", "Première réponse. Et la suite.")
+    history.append("Deuxième question", "Deuxième réponse")
+    history.append("Troisième question", "Troisième réponse")
+
+    assert [user for user, _ in history.as_pairs()] == ["Deuxième question", "Troisième question"]
+    assert history.summary == "- Première question. → Première réponse."
+
+
+def test_token_budget_evicts_turns():
+    history = _history(token_budget=40, summary_budget=500)
+    for i in range(5):
+        history.append(f"question {i} " + "x" * 30, f"réponse {i} " + "y" * 30)
+
+    assert history.tokens() - estimate_tokens(history.summary) <= history.token_budget
+    assert history.as_pairs()[-1][0].startswith("question 4")
+    assert "question 0" in history.summary
+
+
+def test_summary_keeps_its_budget():
+    history = _history(max_turns=1, summary_budget=20)
+    for i in range(10):
+        history.append(f"question numéro {i}", f"réponse numéro {i}")
+
+    assert estimate_tokens(history.summary) <= 20
+    assert "question numéro 8" in history.summary
+    assert "question numéro 0" not in history.summary
+
+
+def test_context_round_trip_and_fingerprint():
+    history = _history()
+    assert history.fingerprint() == ""
+    history.append("Bonjour", "Salut !")
+
+    context = {}
+    history.to_context(context)
+    restored = ConversationHistory.from_context(context)
+
+    assert restored.as_pairs() == history.as_pairs()
+    assert restored.fingerprint() == history.fingerprint() != ""
+    restored.append("Et ensuite ?", "On continue.")
+    assert restored.fingerprint() != history.fingerprint()
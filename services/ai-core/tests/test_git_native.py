@@ -0,0 +1,144 @@
+"""
+In-process git reads: porcelain v2 parsing, refs and MCPGitServer.get_status
+"""
+import shutil
+import subprocess
+
+import pytest
+
+from app.core.git_native import GitRefs, find_git_dir, parse_porcelain_v2
+from app.core.mcp_git import MCPGitServer
+from app.core.mcp_shell import MCPShellServer
+
+HEAD_SHA = "1" * 40
+UPSTREAM_SHA = "2" * 40
+
+
+def test_parse_porcelain_v2():
+    output = "\0".join([
+        "# branch.oid " + HEAD_SHA,
+        "# branch.head main",
+        "# branch.upstream origin/main",
+        "# branch.ab +2 -1",
+        "1 M. N... 100644 100644 100644 aaa bbb staged.py",
+        "1 .M N... 100644 100644 100644 aaa bbb modified.py",
+        "1 MM N... 100644 100644 100644 aaa bbb both.py",
+        "2 R. N... 100644 100644 100644 aaa bbb R100 new name.py",
+        "old name.py",
+        "u UU N... 100644 100644 100644 100644 aaa bbb ccc conflict.py",
+        "? untracked file.txt",
+        ""
+    ])
+
+    assert parse_porcelain_v2(output) == {
+        "branch": "main",
+        "ahead": 2,
+        "behind": 1,
+        "staged_files": ["staged.py", "both.py", "new name.py"],
+        "modified_files": ["modified.py", "both.py", "conflict.py"],
+        "untracked_files": ["untracked file.txt"]
+    }
+
+
+def test_parse_porcelain_v2_detached_without_upstream():
+    status = parse_porcelain_v2("# branch.oid " + HEAD_SHA + "\0# branch.head (detached)\0")
+
+    assert status["branch"] == ""
+    assert status["ahead"] is None and status["behind"] is None
+
+
+def _repository(tmp_path, head="ref: refs/heads/main"):
+    git_dir = tmp_path / ".git"
+    (git_dir / "refs" / "heads").mkdir(parents=True)
+    (git_dir / "HEAD").write_text(head + "\n")
+    (git_dir / "refs" / "heads" / "main").write_text(HEAD_SHA + "\n")
+    (git_dir / "packed-refs").write_text(
+        "# pack-refs with: peeled fully-peeled sorted\n"
+        f"{UPSTREAM_SHA} refs/remotes/origin/main\n"
+        f"^{'3' * 40}\n"
+    )
+    (git_dir / "config").write_text(
+        '[core]\n\tbare = false\n'
+        '[branch "main"]\n\tremote = origin\n\tmerge = refs/heads/main\n'
+    )
+    return git_dir
+
+
+def test_refs_snapshot_with_loose_and_packed_refs(tmp_path):
+    git_dir = _repository(tmp_path)
+
+    snapshot = GitRefs(str(git_dir)).snapshot()
+
+    assert snapshot.branch == "main"
+    assert snapshot.head == HEAD_SHA
+    assert snapshot.upstream == "refs/remotes/origin/main"
+    assert snapshot.upstream_head == UPSTREAM_SHA
+
+
+def test_detached_head(tmp_path):
+    git_dir = _repository(tmp_path, head=UPSTREAM_SHA)
+
+    snapshot = GitRefs(str(git_dir)).snapshot()
+
+    assert snapshot.branch == ""
+    assert snapshot.head == UPSTREAM_SHA
+    assert snapshot.upstream is None
+
+
+def test_unborn_branch(tmp_path):
+    git_dir = _repository(tmp_path, head="ref: refs/heads/feature")
+
+    snapshot = GitRefs(str(git_dir)).snapshot()
+
+    assert snapshot.branch == "feature"
+    assert snapshot.head is None
+    assert snapshot.upstream is None
+
+
+def test_worktree_git_file(tmp_path):
+    main_git_dir = _repository(tmp_path / "main")
+    worktree_git_dir = main_git_dir / "worktrees" / "wt"
+    worktree_git_dir.mkdir(parents=True)
+    (worktree_git_dir / "HEAD").write_text("ref: refs/heads/main\n")
+    (worktree_git_dir / "commondir").write_text("../..\n")
+    worktree = tmp_path / "wt"
+    worktree.mkdir()
+    (worktree / ".git").write_text(f"gitdir: {worktree_git_dir}\n")
+
+    git_dir = find_git_dir(str(worktree))
+    snapshot = GitRefs(git_dir).snapshot()
+
+    assert git_dir == str(worktree_git_dir)
+    assert snapshot.head == HEAD_SHA
+    assert snapshot.upstream_head == UPSTREAM_SHA
+    assert find_git_dir(str(tmp_path)) is None
+
+
+async def test_status_of_a_real_repository(tmp_path):
+    if shutil.which("git") is None:
+        pytest.skip("git is not installed")
+
+    def git(*args):
+        subprocess.run(["git", "-C", str(tmp_path), *args], check=True, capture_output=True)
+
+    git("init", "-q", "-b", "main")
+    git("config", "user.email", "dev@example.com")
+    git("config", "user.name", "Dev")
+    (tmp_path / "tracked.txt").write_text("v1")
+    git("add", "tracked.txt")
+    git("commit", "-q", "-m", "init")
+    (tmp_path / "tracked.txt").write_text("v2")
+    (tmp_path / "staged.txt").write_text("new")
+    git("add", "staged.txt")
+    (tmp_path / "untracked.txt").write_text("")
+
+    shell = MCPShellServer()
+    try:
+        status = await MCPGitServer(shell).get_status(str(tmp_path))
+    finally:
+        await shell.close()
+
+    assert status.branch == "main"
+    assert status.staged_files == ["staged.txt"]
+    assert status.modified_files == ["tracked.txt"]
+    assert status.untracked_files == ["untracked.txt"]
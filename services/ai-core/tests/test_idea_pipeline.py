@@ -0,0 +1,71 @@
+"""
+Idea parking pipeline and read-your-writes on the ideas endpoints
+"""
+import pytest
+from fastapi import Response
+
+from app.api.v1.endpoints import ideas as ideas_endpoints
+from app.core import idea_pipeline as pipeline_module
+from app.core import idea_store as store_module
+from app.core.idea_pipeline import IdeaPipeline, extract_tags
+from app.core.idea_store import IdeaWriteBehind, InMemoryIdeaRepository, new_idea
+
+
+@pytest.fixture
+async def pipeline(monkeypatch):
+    repository = InMemoryIdeaRepository()
+    write_behind = IdeaWriteBehind(repository, flush_interval=60)
+    pipeline = IdeaPipeline(write_behind=write_behind, workers=1)
+    monkeypatch.setattr(store_module, "idea_repository", repository)
+    monkeypatch.setattr(store_module, "idea_write_behind", write_behind)
+    monkeypatch.setattr(pipeline_module, "idea_pipeline", pipeline)
+    yield pipeline
+    await pipeline.close()
+    await write_behind.close()
+
+
+def test_extract_tags_keeps_frequent_words_in_order():
+    tags = extract_tags("Lancer une newsletter, puis une newsletter payante pour le podcast")
+
+    assert tags[0] == "newsletter"
+    assert "podcast" in tags
+    assert "une" not in tags
+
+
+async def test_pipeline_tags_ideas_and_hands_them_to_the_write_behind(pipeline):
+    idea = new_idea("s1", "Créer un podcast sur la productivité")
+
+    assert await pipeline.submit(idea)
+    assert pipeline.has_pending("s1")
+    assert pipeline.has_pending(idea_ids=[idea.id])
+    assert not pipeline.has_pending("s2")
+
+    await pipeline.drain()
+
+    assert not pipeline.has_pending("s1")
+    assert "podcast" in idea.tags
+    assert pipeline.write_behind.has_pending("s1")
+    assert pipeline.write_behind.has_pending(idea_ids=[idea.id])
+
+
+async def test_reads_wait_only_for_their_own_pending_ideas(pipeline, monkeypatch):
+    drains = []
+    drain = pipeline.drain
+
+    async def counting_drain(timeout: float = 2.0):
+        drains.append(timeout)
+        await drain(timeout)
+
+    monkeypatch.setattr(pipeline, "drain", counting_drain)
+    idea = new_idea("s1", "Écrire un livre")
+    await pipeline.submit(idea)
+
+    assert await ideas_endpoints.get_session_ideas("s2", Response(), None, None) == []
+    assert drains == []
+
+    listed = await ideas_endpoints.get_session_ideas("s1", Response(), None, None)
+    assert [listed_idea.id for listed_idea in listed] == [idea.id]
+    assert len(drains) == 1
+
+    assert (await ideas_endpoints.get_idea(idea.id)).id == idea.id
+    assert len(drains) == 1
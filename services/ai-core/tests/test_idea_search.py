@@ -0,0 +1,61 @@
+"""
+Tokenizer, inverted index, TF-IDF neighbours and the connections job
+"""
+from app.core.idea_pipeline import IdeaConnectionsJob
+from app.core.idea_search import InvertedIndex, tfidf_neighbours, tokenize
+from app.core.idea_store import InMemoryIdeaRepository, new_idea
+
+
+def test_tokenize_folds_accents_and_drops_stopwords():
+    assert tokenize("Une Idée pour le Café du quartier") == ["cafe", "quartier"]
+
+
+def test_inverted_index_ranks_and_forgets_documents():
+    index = InvertedIndex()
+    index.add("a", "podcast productivité podcast")
+    index.add("b", "podcast cuisine")
+    index.add("c", "jardinage")
+
+    assert [doc_id for doc_id, _ in index.search("podcast")] == ["a", "b"]
+    assert [doc_id for doc_id, _ in index.search("podcast", allowed={"b"})] == ["b"]
+
+    index.remove("a")
+    assert [doc_id for doc_id, _ in index.search("podcast")] == ["b"]
+    assert len(index) == 2
+
+
+def test_tfidf_neighbours():
+    neighbours = tfidf_neighbours({
+        "python": "python asyncio event loop",
+        "asyncio": "asyncio python coroutines",
+        "pasta": "cooking pasta recipes",
+        "sauce": "pasta sauce recipes"
+    }, k=1)
+
+    assert neighbours == {
+        "python": ["asyncio"],
+        "asyncio": ["python"],
+        "pasta": ["sauce"],
+        "sauce": ["pasta"]
+    }
+
+
+def test_tfidf_neighbours_without_shared_terms():
+    assert tfidf_neighbours({"a": "python", "b": "cuisine", "c": ""}) == {"a": [], "b": [], "c": []}
+
+
+async def test_connections_job_updates_dirty_sessions():
+    repository = InMemoryIdeaRepository()
+    ideas = [
+        new_idea("s1", "podcast productivité"),
+        new_idea("s1", "podcast entrepreneurs"),
+        new_idea("s1", "jardin potager")
+    ]
+    await repository.add_many(ideas)
+    job = IdeaConnectionsJob(repository=repository)
+
+    assert await job.run_once() == 2
+    assert (await repository.get(ideas[0].id)).connections == [ideas[1].id]
+    assert (await repository.get(ideas[2].id)).connections == []
+    # Nothing changed since: nothing to recompute
+    assert await job.run_once() == 0
@@ -0,0 +1,116 @@
+"""
+Idea storage: keyset cursors, in-memory pagination and the write-behind buffer
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.core.idea_store import (
+    IdeaWriteBehind,
+    InMemoryIdeaRepository,
+    decode_cursor,
+    encode_cursor,
+    new_idea
+)
+
+
+def test_cursor_round_trip():
+    idea = new_idea("s1", "Une idée")
+
+    assert decode_cursor(encode_cursor(idea)) == (idea.created_at, idea.id)
+
+
+@pytest.mark.parametrize("cursor", ["not base64!", "bm8gc2VwYXJhdG9y", "bm90LWEtZGF0ZXxpZGVh"])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+async def test_keyset_pagination_walks_every_idea_once():
+    repository = InMemoryIdeaRepository()
+    start = datetime(2026, 10, 1)
+    ideas = [new_idea("s1", f"idée {i}") for i in range(7)]
+    for i, idea in enumerate(ideas):
+        # Two ideas share a timestamp: the id breaks the tie
+        idea.created_at = start + timedelta(minutes=i // 2 * 2)
+    await repository.add_many(ideas + [new_idea("s2", "ailleurs")])
+
+    pages, cursor = [], None
+    while True:
+        page, cursor = await repository.list_session("s1", 3, cursor)
+        pages.append(page)
+        if cursor is None:
+            break
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    listed = [idea.id for page in pages for idea in page]
+    expected = sorted(ideas, key=lambda idea: (idea.created_at, idea.id), reverse=True)
+    assert listed == [idea.id for idea in expected]
+
+
+class FlakyRepository(InMemoryIdeaRepository):
+    """Rejects ideas whose content is 'bad', optionally slow"""
+
+    def __init__(self):
+        super().__init__()
+        self.delay = 0.0
+        self.calls = 0
+
+    async def add_many(self, ideas):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if any(idea.content == "bad" for idea in ideas):
+            raise IntegrityError("INSERT INTO ideas", {}, Exception("constraint violation"))
+        await super().add_many(ideas)
+
+
+async def test_rejected_idea_is_dead_lettered_and_does_not_block_the_rest():
+    repository = FlakyRepository()
+    write_behind = IdeaWriteBehind(repository, flush_interval=60, batch_size=10)
+    for content in ["a", "b", "bad", "c", "d"]:
+        write_behind.submit(new_idea("s1", content))
+
+    await write_behind.flush()
+
+    page, _ = await repository.list_session("s1", 10)
+    assert sorted(idea.content for idea in page) == ["a", "b", "c", "d"]
+    assert [idea.content for idea in write_behind.dead_letter] == ["bad"]
+    assert write_behind.stats()["pending"] == 0
+    assert write_behind.counters["dead_lettered"] == 1
+    await write_behind.close()
+
+
+async def test_cancelled_flush_puts_the_batch_back_in_order():
+    repository = FlakyRepository()
+    repository.delay = 10
+    write_behind = IdeaWriteBehind(repository, flush_interval=60, batch_size=10)
+    ideas = [new_idea("s1", content) for content in ["a", "b", "c"]]
+    for idea in ideas:
+        write_behind.submit(idea)
+
+    flush = asyncio.create_task(write_behind.flush())
+    await asyncio.sleep(0.05)
+    flush.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await flush
+
+    assert list(write_behind._pending) == ideas
+    repository.delay = 0
+    await write_behind.close()
+    assert write_behind.counters["written"] == 3
+
+
+async def test_close_lets_a_running_flush_finish():
+    repository = FlakyRepository()
+    repository.delay = 0.1
+    write_behind = IdeaWriteBehind(repository, flush_interval=0.01, batch_size=10)
+    write_behind.submit(new_idea("s1", "a"))
+    await asyncio.sleep(0.05)  # the background flush is inserting
+
+    await write_behind.close()
+
+    page, _ = await repository.list_session("s1", 10)
+    assert [idea.content for idea in page] == ["a"]
+    assert repository.calls == 1
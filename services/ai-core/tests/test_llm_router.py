@@ -0,0 +1,129 @@
+"""
+HedgedRouter: p95 hedge delays, cancelled losers and fallbacks
+"""
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.core.llm_router import AllProvidersFailed, HedgedRouter, LatencyHistogram
+from app.models.conversation import LLMResponse
+
+
+@pytest.fixture
+def router(monkeypatch):
+    monkeypatch.setattr(settings, "nexia_hedge_enabled", True)
+    return HedgedRouter(default_delay=0.05, min_samples=3, percentile=0.95)
+
+
+class FakeProvider:
+    """Answers after a delay, or raises; records whether it was cancelled"""
+
+    def __init__(self, name: str, delay: float = 0.0, text: str = None, error: Exception = None):
+        self.name = name
+        self.delay = delay
+        self.text = text if text is not None else f"réponse de {name}"
+        self.error = error
+        self.calls = 0
+        self.cancelled = False
+
+    async def __call__(self) -> LLMResponse:
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error is not None:
+            raise self.error
+        return LLMResponse(self.text, self.name)
+
+    @property
+    def entry(self):
+        return self.name, self
+
+
+def test_histogram_percentiles():
+    histogram = LatencyHistogram(window=100)
+    assert histogram.percentile(0.95) is None
+    for ms in range(1, 101):
+        histogram.record(ms / 1000)
+
+    assert histogram.percentile(0.5) == pytest.approx(0.050, abs=0.001)
+    assert histogram.percentile(0.95) == pytest.approx(0.095, abs=0.001)
+    assert histogram.snapshot()["count"] == 100
+
+
+def test_hedge_delay_comes_from_the_provider_p95(router, monkeypatch):
+    assert router.hedge_delay("slow") == 0.05
+    for seconds in [0.1, 0.2, 0.3, 0.4]:
+        router.histogram("slow").record(seconds)
+
+    assert router.hedge_delay("slow") == 0.4
+    monkeypatch.setattr(settings, "nexia_hedge_enabled", False)
+    assert router.hedge_delay("slow") is None
+
+
+async def test_fast_primary_is_not_hedged(router):
+    primary, secondary = FakeProvider("primary", 0.0), FakeProvider("secondary")
+
+    response = await router.race([primary.entry, secondary.entry])
+
+    assert response.provider == "primary"
+    assert secondary.calls == 0
+    assert router.counters["hedged"] == 0
+
+
+async def test_slow_primary_is_hedged_and_the_loser_cancelled(router):
+    primary, secondary = FakeProvider("primary", 1.0), FakeProvider("secondary", 0.0)
+
+    response = await router.race([primary.entry, secondary.entry])
+    await asyncio.sleep(0)
+
+    assert response == "réponse de secondary"
+    assert primary.cancelled
+    assert router.counters["hedged"] == 1 and router.counters["hedge_wins"] == 1
+    # Losing the race doesn't count against the primary
+    assert router.health.get("primary").counters["failures"] == 0
+    assert router.histogram("secondary").samples
+
+
+async def test_primary_error_falls_back_without_waiting(router):
+    router.default_delay = 10
+    primary = FakeProvider("primary", error=RuntimeError("boom"))
+    secondary = FakeProvider("secondary")
+
+    response = await asyncio.wait_for(router.race([primary.entry, secondary.entry]), 1)
+
+    assert response.provider == "secondary"
+    assert router.health.get("primary").counters["failures"] == 1
+
+
+async def test_fallback_answers_are_not_winners(router):
+    canned_response = LLMResponse("Désolé", "fallback")
+
+    async def fallback_call():
+        return canned_response
+
+    response = await router.race([("primary", fallback_call), FakeProvider("secondary").entry])
+    assert response.provider == "secondary"
+
+    with pytest.raises(AllProvidersFailed) as failed:
+        await router.race([("primary", fallback_call)])
+    assert failed.value.fallback is canned_response
+    assert router.health.get("primary").counters["failures"] == 2
+
+
+async def test_open_circuits_are_skipped(router):
+    breaker = router.health.get("primary")
+    for _ in range(breaker.min_calls):
+        breaker.record_failure(0.1)
+    primary, secondary = FakeProvider("primary"), FakeProvider("secondary")
+
+    response = await router.race([primary.entry, secondary.entry])
+
+    assert response.provider == "secondary"
+    assert primary.calls == 0
+
+    with pytest.raises(AllProvidersFailed, match="circuit open"):
+        await router.race([primary.entry])
@@ -0,0 +1,21 @@
+"""
+Shell stream WebSocket error handling
+"""
+
+
+def test_shell_stream_websocket_survives_malformed_payloads(client, tmp_path):
+    with client.websocket_connect("/api/v1/mcp/shell/stream") as websocket:
+        websocket.send_text("pas du json")
+        assert websocket.receive_json()["type"] == "error"
+        websocket.send_json(["pwd"])
+        assert websocket.receive_json()["type"] == "error"
+        websocket.send_json({"command": "pwd", "timeout": -1})
+        assert websocket.receive_json()["type"] == "error"
+
+        websocket.send_json({"command": "pwd", "cwd": str(tmp_path)})
+        events = [websocket.receive_json()]
+        while events[-1]["type"] != "exit":
+            events.append(websocket.receive_json())
+
+    assert "".join(event.get("data", "") for event in events if event["type"] == "stdout").strip() == str(tmp_path)
+    assert events[-1]["return_code"] == 0
@@ -0,0 +1,106 @@
+"""
+Mode definitions: validation, reload and version pinning
+"""
+import json
+import shutil
+
+import pytest
+
+from app.core.mode_registry import (
+    MODES_DIR,
+    ModeRegistry,
+    ModeRegistryError,
+    compile_action_matchers,
+    validate_mode
+)
+
+
+def _definition(**overrides) -> dict:
+    return {
+        "id": "focus_guardian",
+        "name": "Focus Guardian",
+        "description": "Concentration",
+        "system_prompt": "Tu es en mode Focus Guardian.",
+        "actions": {"park_idea": ["Idée", "et si"], "summary": []},
+        **overrides
+    }
+
+
+@pytest.fixture
+def modes_dir(tmp_path):
+    directory = tmp_path / "modes"
+    shutil.copytree(MODES_DIR, directory)
+    return directory
+
+
+def _write(directory, definition: dict):
+    (directory / f"{definition['id']}.json").write_text(json.dumps(definition, ensure_ascii=False), encoding="utf-8")
+
+
+def test_version_is_a_content_hash():
+    mode = validate_mode(_definition(), "test")
+
+    assert mode.version == validate_mode(_definition(), "test").version
+    assert mode.version != validate_mode(_definition(system_prompt="Autre prompt"), "test").version
+    # Keywords are matched on the lowercased message
+    assert mode.actions["park_idea"] == ["idée", "et si"]
+
+
+@pytest.mark.parametrize("definition", [
+    [],
+    _definition(id="Focus Guardian"),
+    _definition(name=""),
+    _definition(actions=["park_idea"]),
+    _definition(actions={"park_idea": "idée"}),
+    _definition(capabilities=[""])
+])
+def test_invalid_definitions(definition):
+    with pytest.raises(ModeRegistryError):
+        validate_mode(definition, "test")
+
+
+def test_action_matchers():
+    matchers = compile_action_matchers(validate_mode(_definition(), "test"))
+
+    assert matchers["park_idea"].search("une idée : et si on lançait un podcast ?")
+    assert not matchers["park_idea"].search("on continue")
+    assert matchers["summary"] is None
+
+
+async def test_reload_applies_changes_and_keeps_old_versions(modes_dir):
+    registry = ModeRegistry(modes_dir)
+    seen = []
+    registry.subscribe(seen.append)
+    original = registry.get("focus_guardian")
+
+    assert not await registry.reload()
+
+    _write(modes_dir, _definition(system_prompt="Nouveau prompt, bien plus long que l'ancien."))
+    assert await registry.reload()
+
+    current = registry.get("focus_guardian")
+    assert current.system_prompt.startswith("Nouveau prompt")
+    assert current.version != original.version
+    # Sessions pinned to the previous version still get it
+    assert registry.get("focus_guardian", original.version) == original
+    assert registry.get("focus_guardian", "unknown") is None
+    assert len(seen) == 1 and seen[0]["focus_guardian"] == current
+
+
+async def test_invalid_reload_keeps_current_modes(modes_dir):
+    registry = ModeRegistry(modes_dir)
+    before = dict(registry.modes)
+
+    (modes_dir / "broken.json").write_text("{not json", encoding="utf-8")
+
+    assert not await registry.reload()
+    assert registry.modes == before
+    assert registry.stats()["failed_reloads"] == 1
+    assert "broken.json" in registry.stats()["last_error"]
+
+
+def test_default_mode_is_required(modes_dir):
+    (modes_dir / "focus_guardian.json").unlink()
+
+    with pytest.raises(ModeRegistryError):
+        ModeRegistry(modes_dir)
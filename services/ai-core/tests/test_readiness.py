@@ -0,0 +1,74 @@
+"""
+Liveness and readiness probes
+"""
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.config import settings
+from app.core.readiness import FAILED, PENDING, READY, WARMING, Readiness
+
+
+@pytest.fixture
+def fresh_readiness(monkeypatch):
+    readiness = Readiness()
+    monkeypatch.setattr(main, "readiness", readiness)
+    return readiness
+
+
+def test_not_ready_until_warmup_has_run(fresh_readiness):
+    # Without the lifespan, warmup never starts
+    client = TestClient(main.app)
+
+    assert client.get("/livez").status_code == 200
+    response = client.get("/readyz")
+    assert response.status_code == 503
+    assert response.json()["status"] == "not_ready"
+    assert response.json()["stage"] == PENDING
+
+
+def test_ready_once_warmup_is_done(fresh_readiness, client):
+    for _ in range(100):
+        if fresh_readiness.stage not in (PENDING, WARMING):
+            break
+        client.portal.call(asyncio.sleep, 0.01)
+
+    response = client.get("/readyz")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["stage"] == READY
+    assert body["checks"]["prompts"]["ok"]
+    assert body["checks"]["browser_pool"]["detail"] == "skipped"
+
+
+async def test_failed_required_check_is_not_ready(engine, monkeypatch):
+    readiness = Readiness()
+    monkeypatch.setattr(settings, "nexia_warmup_browser", False)
+    monkeypatch.setattr(settings, "nexia_horizontal_scaling", True)
+
+    assert not await readiness.warmup(engine)
+    assert readiness.stage == FAILED
+    assert readiness.checks["redis"] == {
+        "ok": False, "required": True, "error": "Redis not connected",
+        "latency_ms": readiness.checks["redis"]["latency_ms"]
+    }
+
+    # The next probe picks up the recovered dependency
+    monkeypatch.setattr(settings, "nexia_horizontal_scaling", False)
+    assert await readiness.refresh()
+    assert readiness.stage == READY
+
+
+async def test_optional_check_failure_keeps_the_worker_ready(engine, monkeypatch):
+    readiness = Readiness()
+    monkeypatch.setattr(settings, "nexia_warmup_browser", True)
+
+    async def warmup():
+        raise RuntimeError("no browser")
+
+    monkeypatch.setattr(engine.claude_bridge.pool, "warmup", warmup)
+
+    assert await readiness.warmup(engine)
+    assert readiness.checks["browser_pool"]["error"] == "no browser"
@@ -0,0 +1,81 @@
+"""
+Response cache keys, TTLs and eviction, and which answers the engine stores
+"""
+import pytest
+
+from app.core import response_cache
+from app.core.response_cache import ResponseCache, make_cache_key
+from app.models.conversation import LLMResponse
+
+
+def test_key_covers_mode_prompt_message_and_history():
+    key = make_cache_key("focus_guardian", "prompt", "Bonjour", "abc")
+
+    # Case and whitespace differences share a key
+    assert make_cache_key("focus_guardian", "prompt", "  BONJOUR ", "abc") == key
+    assert make_cache_key("other_mode", "prompt", "Bonjour", "abc") != key
+    assert make_cache_key("focus_guardian", "autre prompt", "Bonjour", "abc") != key
+    assert make_cache_key("focus_guardian", "prompt", "Bonsoir", "abc") != key
+    assert make_cache_key("focus_guardian", "prompt", "Bonjour", "") != key
+    # Parts are delimited, not simply concatenated
+    assert make_cache_key("a", "bc", "d") != make_cache_key("ab", "c", "d")
+
+
+async def test_entries_expire_after_their_mode_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, "monotonic", lambda: now[0])
+    cache = ResponseCache(max_entries=10, default_ttl=60, mode_ttls={"short": 5, "never": 0})
+
+    await cache.set("a", "réponse courte", "short")
+    await cache.set("b", "réponse par défaut", "other")
+    await cache.set("c", "jamais stockée", "never")
+    now[0] += 6
+
+    assert await cache.get("a") is None
+    assert await cache.get("b") == "réponse par défaut"
+    assert await cache.get("c") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["stores"] == 2
+
+
+async def test_least_recently_used_entries_are_evicted():
+    cache = ResponseCache(max_entries=2, default_ttl=60, mode_ttls={})
+    await cache.set("a", "A", "m")
+    await cache.set("b", "B", "m")
+    await cache.get("a")
+    await cache.set("c", "C", "m")
+
+    assert await cache.get("b") is None
+    assert await cache.get("a") == "A"
+    assert await cache.get("c") == "C"
+
+
+async def test_redis_tier_is_shared():
+    fakeredis = pytest.importorskip("fakeredis.aioredis")
+    client = fakeredis.FakeRedis(decode_responses=True)
+    try:
+        await ResponseCache(default_ttl=60, mode_ttls={}, redis=client).set("k", "partagée", "m")
+        other = ResponseCache(default_ttl=60, mode_ttls={}, redis=client)
+
+        assert await other.get("k") == "partagée"
+        assert other.stats()["redis_hits"] == 1
+    finally:
+        await client.aclose()
+
+
+async def test_engine_never_stores_fallback_answers(engine):
+    answers = [LLMResponse("Désolé, une erreur s'est produite.", "fallback"), LLMResponse("Salut !", "claude_bridge")]
+
+    async def ask_claude(question, strict=False):
+        return answers.pop(0) if answers else LLMResponse("Salut !", "claude_bridge")
+
+    engine.llms = {}
+    engine.claude_bridge.ask_claude = ask_claude
+    engine.claude_bridge.is_connected = lambda: True
+
+    first = await engine.process_message("Bonjour", "s1", {})
+    second = await engine.process_message("Bonjour", "s2", {})
+    third = await engine.process_message("Bonjour", "s3", {})
+
+    assert first.metadata["cache"] == "miss"
+    assert second.metadata["cache"] == "miss" and second.response == "Salut !"
+    assert third.metadata["cache"] == "hit" and third.response == "Salut !"
@@ -0,0 +1,90 @@
+"""
+Session stores: serialization, mode switches and turn saves
+"""
+from datetime import datetime
+
+import pytest
+
+from app.core.session_store import InMemorySessionStore, RedisSessionStore
+from app.models.conversation import Session
+
+
+class ScriptlessClient:
+    """Enough of a Redis client to build the store without a server"""
+
+    def register_script(self, script):
+        return None
+
+
+def _session(**fields) -> Session:
+    return Session(
+        id=fields.pop("id", "s1"),
+        created_at=datetime(2026, 10, 1, 12, 30),
+        mode=fields.pop("mode", "focus_guardian"),
+        **fields
+    )
+
+
+def test_redis_serialization_round_trip():
+    store = RedisSessionStore(ScriptlessClient())
+    session = _session(mode_version="abc123", context={"last_message": "Salut", "n": 2})
+
+    data = store._serialize(session)
+    assert all(isinstance(value, str) for value in data.values())
+    assert store._deserialize(data) == session
+
+
+def test_redis_deserialization_defaults():
+    store = RedisSessionStore(ScriptlessClient())
+
+    session = store._deserialize({"id": "s1", "created_at": "2026-10-01T12:30:00"})
+
+    assert session.mode_version is None
+    assert session.context == {}
+    assert session.mode
+
+
+async def test_in_memory_set_mode_drops_the_version_pin():
+    store = InMemorySessionStore()
+    await store.save(_session(mode_version="abc123"))
+
+    assert await store.set_mode("s1", "socratic_challenger") == "focus_guardian"
+    session = await store.get("s1")
+    assert (session.mode, session.mode_version) == ("socratic_challenger", None)
+    assert await store.set_mode("missing", "socratic_challenger") is None
+
+
+@pytest.fixture
+async def redis_store():
+    fakeredis = pytest.importorskip("fakeredis.aioredis")
+    pytest.importorskip("lupa")  # Lua scripting in fakeredis
+    client = fakeredis.FakeRedis(decode_responses=True)
+    yield RedisSessionStore(client, ttl=60)
+    await client.aclose()
+
+
+async def test_redis_turn_save_keeps_a_concurrent_mode_switch(redis_store):
+    await redis_store.save(_session())
+    # A turn loads the session, then the mode is switched during the LLM call
+    turn = await redis_store.get("s1")
+    turn.mode_version = "abc123"
+    await redis_store.set_mode("s1", "socratic_challenger")
+
+    turn.context["last_response"] = "Réponse"
+    await redis_store.save(turn)
+
+    session = await redis_store.get("s1")
+    assert session.mode == "socratic_challenger"
+    assert session.mode_version is None
+    assert session.context == {"last_response": "Réponse"}
+
+
+async def test_redis_save_pins_the_mode_version(redis_store):
+    await redis_store.save(_session())
+    turn = await redis_store.get("s1")
+    turn.mode_version = "abc123"
+
+    await redis_store.save(turn)
+
+    assert (await redis_store.get("s1")).mode_version == "abc123"
+    assert 0 < await redis_store.client.ttl("nexia:session:s1") <= 60
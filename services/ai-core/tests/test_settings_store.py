@@ -0,0 +1,42 @@
+"""
+Settings repository caching and API key hot-reload
+"""
+import json
+
+from app.config import settings
+from app.core import ai_engine
+from app.core.settings_store import SettingsRepository
+
+
+async def test_load_stats_the_file_at_most_once_per_interval(tmp_path, monkeypatch):
+    path = tmp_path / "settings.json"
+    path.write_text(json.dumps({"openai_api_key": "k1"}))
+    repository = SettingsRepository(path, stat_interval=60)
+    stats = []
+    file_stamp = repository._file_stamp
+    monkeypatch.setattr(repository, "_file_stamp", lambda: stats.append(1) or file_stamp())
+
+    assert (await repository.load())["openai_api_key"] == "k1"
+    path.write_text(json.dumps({"openai_api_key": "k2-longer"}))
+    assert (await repository.load())["openai_api_key"] == "k1"
+    assert len(stats) == 1
+
+    # Updates always merge into the file on disk
+    assert await repository.update({"anthropic_api_key": "a1"}) == {
+        "openai_api_key": "k2-longer", "anthropic_api_key": "a1"
+    }
+
+
+async def test_cleared_key_is_not_kept(tmp_path, monkeypatch):
+    repository = SettingsRepository(tmp_path / "settings.json")
+    monkeypatch.setattr(ai_engine, "settings_repository", repository)
+    monkeypatch.setattr(settings, "openai_api_key", None)
+    await repository.update({"openai_api_key": "sk-old"})
+
+    engine = ai_engine.NexiaEngine()
+    try:
+        assert settings.openai_api_key == "sk-old"
+        await repository.update({"openai_api_key": ""})
+        assert settings.openai_api_key is None
+    finally:
+        await engine.close()
@@ -0,0 +1,123 @@
+"""
+ExecutionScheduler admission control and priorities
+"""
+import asyncio
+
+import pytest
+
+from app.core.shell_scheduler import ExecutionScheduler, SchedulerBusy
+
+
+def _scheduler(**limits) -> ExecutionScheduler:
+    options = {"max_concurrent": 2, "max_per_session": 2, "max_queued": 10, "queue_timeout": 5.0}
+    return ExecutionScheduler(**{**options, **limits})
+
+
+async def _hold(scheduler, session_id, release: asyncio.Event, log: list, name: str, priority="interactive"):
+    async with scheduler.slot(session_id, priority):
+        log.append(name)
+        await release.wait()
+
+
+async def test_global_limit():
+    scheduler = _scheduler()
+    release, log = asyncio.Event(), []
+
+    tasks = [asyncio.create_task(_hold(scheduler, f"s{i}", release, log, f"c{i}")) for i in range(3)]
+    await asyncio.sleep(0.01)
+    assert log == ["c0", "c1"]
+    assert scheduler.stats()["running"] == 2
+    assert scheduler.stats()["queue_depth"] == 1
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert log == ["c0", "c1", "c2"]
+    assert scheduler.stats()["running"] == 0
+
+
+async def test_per_session_limit_lets_other_sessions_through():
+    scheduler = _scheduler(max_concurrent=3, max_per_session=1)
+    release, log = asyncio.Event(), []
+
+    tasks = [
+        asyncio.create_task(_hold(scheduler, "a", release, log, "a1")),
+        asyncio.create_task(_hold(scheduler, "a", release, log, "a2")),
+        asyncio.create_task(_hold(scheduler, "b", release, log, "b1"))
+    ]
+    await asyncio.sleep(0.01)
+    # a2 waits for a1 while b1, queued behind it, already runs
+    assert log == ["a1", "b1"]
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert log == ["a1", "b1", "a2"]
+
+
+async def test_interactive_commands_go_before_background_ones():
+    scheduler = _scheduler(max_concurrent=1)
+    release, log = asyncio.Event(), []
+    order = []
+
+    async def queued(name, priority):
+        async with scheduler.slot(None, priority):
+            order.append(name)
+
+    holder = asyncio.create_task(_hold(scheduler, None, release, log, "holder"))
+    await asyncio.sleep(0.01)
+    tasks = [
+        asyncio.create_task(queued("background-1", "background")),
+        asyncio.create_task(queued("interactive-1", "interactive")),
+        asyncio.create_task(queued("background-2", "background")),
+        asyncio.create_task(queued("interactive-2", "interactive"))
+    ]
+    await asyncio.sleep(0.01)
+
+    release.set()
+    await asyncio.gather(holder, *tasks)
+    assert order == ["interactive-1", "interactive-2", "background-1", "background-2"]
+
+
+async def test_full_queue_is_rejected():
+    scheduler = _scheduler(max_concurrent=1, max_queued=1)
+    release, log = asyncio.Event(), []
+
+    holder = asyncio.create_task(_hold(scheduler, None, release, log, "holder"))
+    waiter = asyncio.create_task(_hold(scheduler, None, release, log, "waiter"))
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(SchedulerBusy):
+        async with scheduler.slot():
+            pass
+    assert scheduler.stats()["rejected"] == 1
+
+    release.set()
+    await asyncio.gather(holder, waiter)
+
+
+async def test_queue_timeout_and_cancellation_free_the_queue():
+    scheduler = _scheduler(max_concurrent=1, queue_timeout=0.02)
+    release, log = asyncio.Event(), []
+    holder = asyncio.create_task(_hold(scheduler, None, release, log, "holder"))
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(SchedulerBusy):
+        async with scheduler.slot():
+            pass
+    assert scheduler.stats()["queue_timeouts"] == 1
+
+    cancelled = asyncio.create_task(_hold(scheduler, None, release, log, "cancelled"))
+    await asyncio.sleep(0.005)
+    cancelled.cancel()
+    await asyncio.gather(cancelled, return_exceptions=True)
+    assert scheduler.stats()["queue_depth"] == 0
+
+    release.set()
+    await holder
+    assert log == ["holder"]
+    assert scheduler.stats()["running"] == 0
+
+
+async def test_unknown_priority():
+    with pytest.raises(ValueError):
+        async with _scheduler().slot(None, "urgent"):
+            pass
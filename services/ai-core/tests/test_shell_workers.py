@@ -0,0 +1,139 @@
+"""
+Persistent shell workers: framing, session state, timeouts and the worker cap
+"""
+import asyncio
+import sys
+
+import pytest
+
+from app.core.mcp_shell import MCPShellServer
+from app.core.shell_workers import (
+    ShellWorkerPool,
+    WorkersBusy,
+    _Capture,
+    _marker_prefix,
+    _read_frame
+)
+
+MARKER = b"\n__nexia_token__ "
+
+
+def test_marker_prefix():
+    assert _marker_prefix(b"output\n__nexia", MARKER) == len(b"\n__nexia")
+    assert _marker_prefix(b"output", MARKER) == 0
+    assert _marker_prefix(b"output\n", MARKER) == 1
+
+
+async def test_read_frame_across_chunks():
+    stream = asyncio.StreamReader()
+    for chunk in [b"hello\n__nex", b"ia_tok", b"en__ 0 /tmp\n"]:
+        stream.feed_data(chunk)
+    capture = _Capture(limit=1000)
+
+    rest = await _read_frame(stream, MARKER, capture, trailer=True)
+
+    assert bytes(capture.data) == b"hello"
+    assert rest == b"0 /tmp\n"
+
+
+async def test_capture_is_capped():
+    capture = _Capture(limit=4)
+    capture.add(b"abcdef")
+
+    assert bytes(capture.data) == b"abcd"
+    assert capture.truncated
+
+
+@pytest.fixture
+async def pool():
+    pool = ShellWorkerPool(max_workers=2, idle_timeout=60)
+    yield pool
+    await pool.close()
+
+
+async def test_worker_keeps_the_session_directory(pool, tmp_path):
+    (tmp_path / "sub").mkdir()
+
+    result = await pool.run("s1", ["cd", "sub"], str(tmp_path), timeout=5)
+    assert result.return_code == 0
+    assert pool.cwd("s1") == str(tmp_path / "sub")
+
+    result = await pool.run("s1", ["pwd"], str(tmp_path), timeout=5)
+    assert result.stdout.decode().strip() == str(tmp_path / "sub")
+    assert pool.stats()["spawned"] == 1
+
+
+async def test_worker_reports_exit_code_and_stderr(pool, tmp_path):
+    result = await pool.run("s1", [sys.executable, "-c", "import sys; sys.stderr.write('oops'); sys.exit(3)"],
+                            str(tmp_path), timeout=5)
+
+    assert result.return_code == 3
+    assert result.stderr == b"oops"
+
+
+async def test_timed_out_worker_is_replaced(pool, tmp_path):
+    result = await pool.run("s1", [sys.executable, "-c", "import time; time.sleep(10)"], str(tmp_path), timeout=0.2)
+    assert result.timed_out
+
+    result = await pool.run("s1", ["pwd"], str(tmp_path), timeout=5)
+    assert result.return_code == 0
+    assert pool.stats()["spawned"] == 2
+
+
+async def test_cap_is_enforced_when_every_worker_is_busy(pool, tmp_path):
+    sleep = [sys.executable, "-c", "import time; time.sleep(0.3)"]
+    busy = [asyncio.create_task(pool.run(f"s{i}", sleep, str(tmp_path), timeout=5)) for i in range(2)]
+    await asyncio.sleep(0.05)
+
+    with pytest.raises(WorkersBusy):
+        await pool.run("s3", ["pwd"], str(tmp_path), timeout=5)
+    assert len(pool.workers) == 2
+
+    await asyncio.gather(*busy)
+    # Idle workers are evicted to make room again
+    result = await pool.run("s3", ["pwd"], str(tmp_path), timeout=5)
+    assert result.return_code == 0
+    assert len(pool.workers) == 2
+    assert pool.stats()["evicted"] == 1
+
+
+async def test_execute_command_falls_back_to_a_process_at_the_cap():
+    shell = MCPShellServer()
+    shell.workers.max_workers = 1
+    command = ["-c", "import time; time.sleep(0.2); print('ok')"]
+    try:
+        results = await asyncio.gather(*(
+            shell.execute_command("python3", command, session_id=f"s{i}") for i in range(2)
+        ))
+    finally:
+        await shell.close()
+
+    assert [result.stdout.strip() for result in results] == ["ok", "ok"]
+    assert shell.workers.stats()["overflow"] == 1
+
+
+async def test_checked_out_worker_is_not_evicted(tmp_path, monkeypatch):
+    pool = ShellWorkerPool(max_workers=1, idle_timeout=60)
+    created = []
+    checkout = pool._checkout
+
+    def tracking_checkout(session_id, cwd):
+        worker, evicted = checkout(session_id, cwd)
+        created.append(worker)
+        return worker, evicted
+
+    monkeypatch.setattr(pool, "_checkout", tracking_checkout)
+    try:
+        await pool.run("x", ["pwd"], str(tmp_path), timeout=5)
+        # "a" evicts "x" and awaits its close; "b" must not evict "a" meanwhile
+        results = await asyncio.gather(
+            pool.run("a", ["pwd"], str(tmp_path), timeout=5),
+            pool.run("b", ["pwd"], str(tmp_path), timeout=5),
+            return_exceptions=True
+        )
+    finally:
+        await pool.close()
+
+    assert results[0].return_code == 0
+    assert isinstance(results[1], WorkersBusy)
+    assert all(worker.process.returncode is not None for worker in created if worker.process)